@@ -0,0 +1,48 @@
+"""
+Benchmark the batched all-pairs OLS (regression.all_pairs_ols()) against fitting every metric pair with a
+statsmodels OLS loop, which is what plotly's trendline="ols" runs for one pair.
+Run from the repository root: python benchmarks/bench_all_pairs_ols.py
+"""
+import itertools
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import correlation as corr  # noqa: E402
+import regression as reg  # noqa: E402
+
+
+def synthetic_metrics(metrics: int, days: int = 365, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    values = rng.normal(50, 10, (days, metrics)) + rng.normal(0, 5, (days, 1))  # shared component
+    dataset = pd.DataFrame(values, columns=[f"Metric {column}" for column in range(metrics)])
+    return dataset.mask(rng.random(dataset.shape) < 0.1)
+
+
+def statsmodels_loop(dataset: pd.DataFrame) -> pd.DataFrame:
+    fits = []
+    for x, y in itertools.product(dataset.columns, repeat=2):
+        pair = dataset[[x, y]].dropna() if x != y else dataset[[x]].dropna().assign(**{'__y': dataset[x]})
+        result = sm.OLS(pair.iloc[:, 1], sm.add_constant(pair.iloc[:, 0])).fit()
+        fits.append((x, y, result.params.iloc[1], result.params.iloc[0], result.rsquared, result.pvalues.iloc[1],
+                     int(result.nobs)))
+    return pd.DataFrame(fits, columns=reg.FIT_COLUMNS)
+
+
+def batched(dataset: pd.DataFrame) -> pd.DataFrame:
+    corr._engines.clear()  # time the sufficient statistics too, not only the cached engine
+    return reg.all_pairs_ols(dataset)
+
+
+if __name__ == '__main__':
+    print(f"{'metrics':>7} {'pairs':>6} {'statsmodels (s)':>16} {'batched (s)':>12} {'speedup':>8}")
+    for metrics in [10, 24, 50]:
+        dataset = synthetic_metrics(metrics)
+        looped = min(timeit.repeat(lambda: statsmodels_loop(dataset), number=1, repeat=3))
+        vectorized = min(timeit.repeat(lambda: batched(dataset), number=1, repeat=3))
+        print(f"{metrics:>7} {metrics ** 2:>6} {looped:>16.3f} {vectorized:>12.4f} {looped / vectorized:>7.0f}x")
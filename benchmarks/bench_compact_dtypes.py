@@ -0,0 +1,52 @@
+"""
+Benchmark the compact loader schema (DatetimeIndex of days, float32 scores, categorical fast bins) against the
+previous schema (python date object index, float64 scores): memory of the loaded frames, and the time of the
+date join in utilities.create_metrics_dataset().
+Run from the repository root: python benchmarks/bench_compact_dtypes.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import utilities as util  # noqa: E402
+import zero as zo  # noqa: E402
+from bench_fast_days import synthetic_fasts  # noqa: E402
+
+
+def synthetic_scores(days: int, first_date: str = '1800-01-01') -> (pd.DataFrame, pd.DataFrame, pd.DataFrame):
+    """Compact sleep, metabolic, and fasting scores as returned by the loaders, one row per day."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(first_date, periods=days, freq='1D')
+    sleep_scores = pd.DataFrame(rng.uniform(0, 100, (days, 4)), index=dates,
+                                columns=['Strain', 'Recovery', 'Sleep Score', 'Sleep (hours)']).astype(np.float32)
+    metabolic_scores = pd.DataFrame({'Metabolic Score': rng.uniform(0, 100, days)}, index=dates).astype(np.float32)
+    fasting_scores = zo.all_fasts_stats(synthetic_fasts(days, first_date=first_date))
+    return sleep_scores, metabolic_scores, fasting_scores
+
+
+def previous_schema(scores: pd.DataFrame) -> pd.DataFrame:
+    previous = scores.astype({column: np.float64 for column in scores.select_dtypes('number')})
+    previous.index = scores.index.date
+    return previous
+
+
+def megabytes(frames) -> float:
+    return sum(frame.memory_usage(index=True, deep=True).sum() for frame in frames) / 1024 ** 2
+
+
+if __name__ == '__main__':
+    print(f"{'years':>5} {'previous (MB)':>14} {'compact (MB)':>13} {'previous join (s)':>18} "
+          f"{'compact join (s)':>17} {'speedup':>8}")
+    for years in [3, 10, 50]:
+        compact = synthetic_scores(years * 365)
+        previous = tuple(previous_schema(scores) for scores in compact)
+        timings = []
+        for frames in [previous, compact]:
+            timings.append(min(timeit.repeat(lambda: util.create_metrics_dataset(*frames), number=1, repeat=5)))
+        print(f"{years:>5} {megabytes(previous):>14.2f} {megabytes(compact):>13.2f} {timings[0]:>18.4f} "
+              f"{timings[1]:>17.4f} {timings[0] / timings[1]:>7.1f}x")
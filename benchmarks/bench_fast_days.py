@@ -0,0 +1,55 @@
+"""
+Benchmark zero.fast_cumulative_consecutive() (groupby over start and end dates) against the original
+iterrows() accumulation on synthetic multi-year Zero Fasting logs.
+Run from the repository root: python benchmarks/bench_fast_days.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import zero as zo  # noqa: E402
+
+
+def looped_cumulative_consecutive(details: pd.DataFrame) -> pd.DataFrame:
+    first_date = details.start_dt[0].date()
+    last_date = details.end_dt.iat[-1].date()
+    all_fast_dates = pd.date_range(start=first_date, end=last_date, freq='1D').date
+    stats = pd.DataFrame({'Fast (cumulative hours)': 0, 'Fast (consecutive hours)': 0}, index=all_fast_dates,
+                         dtype=float)
+    for index, fast in details.iterrows():
+        start_date = fast["start_dt"].date()
+        end_date = fast["end_dt"].date()
+        stats.at[start_date, 'Fast (cumulative hours)'] += fast['start_hours']
+        stats.at[start_date, 'Fast (consecutive hours)'] = max(fast['start_hours'],
+                                                               stats.at[start_date, 'Fast (consecutive hours)'])
+        stats.at[end_date, 'Fast (cumulative hours)'] += fast['end_hours']
+        stats.at[end_date, 'Fast (consecutive hours)'] = max(fast['total_hours'],
+                                                             stats.at[end_date, 'Fast (consecutive hours)'])
+    return stats
+
+
+def synthetic_fasts(count: int, first_date: str = '2010-01-01') -> pd.DataFrame:
+    """One fast per day, starting in the evening and lasting 8 to 22 hours."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(first_date, periods=count, freq='1D')
+    start = dates + pd.to_timedelta(rng.integers(17 * 60, 24 * 60, count), 'min')
+    hours = rng.uniform(8, 22, count).round(2)
+    end = start + pd.to_timedelta(hours * 60, 'min').round('min')
+    return pd.DataFrame({'Date': dates,
+                         'Start': start.strftime('%H:%M'),
+                         'End': end.strftime('%H:%M'),
+                         'Hours': hours,
+                         'Night Eating': 'No'})
+
+
+if __name__ == '__main__':
+    print(f"{'fasts':>6} {'iterrows (s)':>13} {'groupby (s)':>12} {'speedup':>8}")
+    for count in [365, 3 * 365, 10 * 365]:
+        details = zo.fasts_details(synthetic_fasts(count))
+        looped = min(timeit.repeat(lambda: looped_cumulative_consecutive(details), number=1, repeat=3))
+        grouped = min(timeit.repeat(lambda: zo.fast_cumulative_consecutive(details), number=1, repeat=3))
+        print(f"{count:>6} {looped:>13.3f} {grouped:>12.4f} {looped / grouped:>7.1f}x")
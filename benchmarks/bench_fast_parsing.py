@@ -0,0 +1,37 @@
+"""
+Micro-benchmark zero.fasts_start_end() and zero.date_durations() against the original strftime round-trip parsing.
+Run from the repository root: python benchmarks/bench_fast_parsing.py
+"""
+import pathlib
+import sys
+import timeit
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import zero as zo  # noqa: E402
+from bench_fast_days import synthetic_fasts  # noqa: E402
+
+
+def strftime_details(fasts: pd.DataFrame) -> pd.DataFrame:
+    start_times_duration = pd.to_timedelta(pd.to_datetime(fasts['Start']).dt.strftime('%H:%M:%S'))
+    end_times_duration = pd.to_timedelta(pd.to_datetime(fasts['End']).dt.strftime('%H:%M:%S'))
+    start_dt = (fasts.Date + start_times_duration).rename('start_dt')
+    end_dates = (start_dt + pd.to_timedelta(fasts.Hours, 'h')).dt.date
+    end_dt = (pd.to_datetime(end_dates) + end_times_duration).rename('end_dt')
+    start_hours = (pd.Timedelta(24, 'h') - pd.to_timedelta(start_dt.dt.strftime('%H:%M:%S'))) / pd.Timedelta(1, 'h')
+    end_hours = pd.to_timedelta(end_dt.dt.strftime('%H:%M:%S')) / pd.Timedelta(1, 'h')
+    total_hours = (end_dt - start_dt) / pd.Timedelta(1, 'h')
+    return pd.concat([start_dt, end_dt, start_hours, end_hours, total_hours], axis=1)
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore')  # format inference warnings of the strftime path
+    print(f"{'fasts':>7} {'strftime (s)':>13} {'vectorized (s)':>15} {'speedup':>8}")
+    for count in [10000, 100000]:
+        fasts = synthetic_fasts(count, first_date='1700-01-01')  # 100k daily fasts span 274 years
+        round_trip = min(timeit.repeat(lambda: strftime_details(fasts), number=1, repeat=3))
+        vectorized = min(timeit.repeat(lambda: zo.fasts_details(fasts), number=1, repeat=3))
+        print(f"{count:>7} {round_trip:>13.3f} {vectorized:>15.3f} {round_trip / vectorized:>7.1f}x")
@@ -0,0 +1,68 @@
+"""
+Benchmark the server-side construction of the scatter and trend figures on every rerun: the previous figures
+(Plotly Express scatter with an OLS trendline, make_subplots with a full update_layout) against the figures built on
+the cached layouts of plot.layout_template() (with WebGL traces above plot.WEBGL_THRESHOLD points).
+Times include serializing the figure to JSON, as Streamlit does to send it.
+Run from the repository root: python benchmarks/bench_figure_construction.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import plot  # noqa: E402
+
+
+def previous_scatter(dataset: pd.DataFrame, x_selection: str, y_selection: str, color: str) -> go.Figure:
+    fig = px.scatter(dataset, x=x_selection, y=y_selection, color_continuous_scale='Blues', color=color,
+                     trendline='ols', hover_data=['Date'])
+    fig.update_traces(marker=dict(line=dict(width=1, color='DarkSlateGrey')))
+    fig.update_layout(title=dict(text=f"Scatter Analysis: {x_selection} vs. {y_selection}", x=0.5))
+    return fig
+
+
+def previous_line(dataset: pd.DataFrame, x_selection: str, y_selection: str) -> go.Figure:
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Scatter(x=dataset.Date, y=dataset[x_selection], mode='lines+markers', name=x_selection),
+                  secondary_y=False)
+    fig.add_trace(go.Scatter(x=dataset.Date, y=dataset[y_selection], mode='lines+markers', name=y_selection),
+                  secondary_y=True)
+    fig.update_layout(xaxis=plot.date_xaxis(), yaxis=dict(showgrid=True, title=x_selection),
+                      yaxis2=dict(showgrid=False, title=y_selection), title=dict(text='Metrics Trends', x=0.5),
+                      legend=dict(orientation="h"))
+    return fig
+
+
+def synthetic_dataset(days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dataset = pd.DataFrame({'Date': pd.date_range('2000-01-01', periods=days, freq='1D'),
+                            'Sleep Score': rng.uniform(40, 100, days).round(2),
+                            'Metabolic Score': rng.uniform(40, 100, days).round(2)})
+    dataset['Fast'] = np.where(rng.random(days) < 0.3, 'Yes', 'No')
+    return dataset
+
+
+def timed(build) -> float:
+    return min(timeit.repeat(lambda: build().to_json(), number=1, repeat=5))
+
+
+if __name__ == '__main__':
+    print(f"{'rows':>6} {'view':>8} {'previous (ms)':>14} {'cached layout (ms)':>19} {'speedup':>8} {'trace':>10}")
+    for days in [111, 1_000, 10_000]:
+        dataset = synthetic_dataset(days)
+        scatter = plot.plotly_scatter(dataset, 'Sleep Score', 'Metabolic Score', 'Fast', hover=['Date'])
+        line = plot.plotly_line(dataset, 'Sleep Score', 'Metabolic Score')
+        rows = [('scatter', lambda: previous_scatter(dataset, 'Sleep Score', 'Metabolic Score', 'Fast'),
+                 lambda: plot.plotly_scatter(dataset, 'Sleep Score', 'Metabolic Score', 'Fast', hover=['Date']),
+                 scatter.data[0].type),
+                ('line', lambda: previous_line(dataset, 'Sleep Score', 'Metabolic Score'),
+                 lambda: plot.plotly_line(dataset, 'Sleep Score', 'Metabolic Score'), line.data[0].type)]
+        for view, previous, cached, trace in rows:
+            before, after = timed(previous), timed(cached)
+            print(f"{days:>6} {view:>8} {before * 1e3:>14.1f} {after * 1e3:>19.1f} {before / after:>7.1f}x {trace:>10}")
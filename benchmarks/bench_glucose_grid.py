@@ -0,0 +1,49 @@
+"""
+Benchmark locating the glucose of every sleep period on a fixed glucose grid
+(glucose_grid.GlucoseGrid.offsets(), O(1) per window) against a boolean comparison of the whole irregular index per
+window, and the sorted interval join (glucose.window_offsets()).
+Run from the repository root: python benchmarks/bench_glucose_grid.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import glucose as gc  # noqa: E402
+import glucose_grid as gg  # noqa: E402
+from bench_sleep_groups import synthetic_data  # noqa: E402
+
+
+def jittered(glucose: pd.Series, seed: int = 0) -> pd.Series:
+    """LibreLink-like cadence: 15 minutes with up to a minute of jitter, and 5% of the samples missing."""
+    rng = np.random.default_rng(seed)
+    index = glucose.index + pd.to_timedelta(rng.integers(-60, 60, len(glucose)), 's')
+    return glucose.set_axis(index)[rng.random(len(glucose)) > 0.05]
+
+
+def masked_offsets(glucose: pd.Series, start: pd.Series, end: pd.Series) -> list:
+    offsets = []
+    for window_start, window_end in zip(start, end):
+        positions = np.flatnonzero((glucose.index >= window_start) & (glucose.index <= window_end))
+        offsets.append((positions[0], positions[-1] + 1) if len(positions) else (0, 0))
+    return offsets
+
+
+if __name__ == '__main__':
+    print(f"{'years':>5} {'windows':>8} {'masking (s)':>12} {'interval join (s)':>18} {'grid (s)':>9} "
+          f"{'grid build (s)':>15} {'series (MB)':>12} {'grid (MB)':>10}")
+    for years in [1, 3, 10]:
+        glucose, sleep = synthetic_data(years)
+        glucose = jittered(glucose)
+        start, end = sleep['Sleep Start'], sleep['Sleep End']
+        build = min(timeit.repeat(lambda: gg.GlucoseGrid.from_series(glucose), number=1, repeat=3))
+        grid = gg.GlucoseGrid.from_series(glucose)
+        masked = min(timeit.repeat(lambda: masked_offsets(glucose, start, end), number=1, repeat=3))
+        joined = min(timeit.repeat(lambda: gc.window_offsets(glucose, start=start, end=end), number=1, repeat=3))
+        gridded = min(timeit.repeat(lambda: grid.offsets(start, end), number=1, repeat=3))
+        print(f"{years:>5} {len(sleep):>8} {masked:>12.3f} {joined:>18.5f} {gridded:>9.5f} {build:>15.3f} "
+              f"{glucose.memory_usage(index=True) / 1024 ** 2:>12.2f} {grid.values.nbytes / 1024 ** 2:>10.2f}")
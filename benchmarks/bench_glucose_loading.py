@@ -0,0 +1,85 @@
+"""
+Compare peak memory (RSS) and time of glucose.load_glucose_data() reading a whole LibreLink export at once
+against the streaming, chunked mode. Each mode runs in a fresh process so peak RSS is not shared.
+Peak RSS is reported as the increase over the process baseline after imports.
+Run from the repository root: python benchmarks/bench_glucose_loading.py [years]
+"""
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC_PATH = pathlib.Path(__file__).resolve().parents[1] / 'src'
+sys.path.insert(0, str(SRC_PATH))
+
+LIBRELINK_COLUMNS = ['Device', 'Serial Number', 'Device Timestamp', 'Record Type', 'Historic Glucose mg/dL',
+                     'Scan Glucose mg/dL', 'Non-numeric Rapid-Acting Insulin', 'Rapid-Acting Insulin (units)',
+                     'Non-numeric Food', 'Carbohydrates (grams)', 'Carbohydrates (servings)',
+                     'Non-numeric Long-Acting Insulin', 'Long-Acting Insulin (units)', 'Notes',
+                     'Strip Glucose mg/dL', 'Ketone mmol/L', 'Meal Insulin (units)', 'Correction Insulin (units)',
+                     'User Change Insulin (units)']
+
+
+def write_export(path: pathlib.Path, years: int):
+    """Write a LibreLink-like export: 15 minute historic records, plus scan records with notes."""
+    rng = np.random.default_rng(0)
+    historic = pd.date_range('2015-01-01', periods=years * 365 * 96, freq='15min', tz='UTC').tz_convert('US/Eastern')
+    scans = historic[rng.random(len(historic)) < 0.5] + pd.Timedelta(minutes=7)
+    timestamps = historic.append(scans)
+    record_type = np.r_[np.zeros(len(historic), int), np.ones(len(scans), int)]
+    export = pd.DataFrame({column: '' for column in LIBRELINK_COLUMNS}, index=range(len(timestamps)))
+    export['Device'] = 'FreeStyle LibreLink'
+    export['Serial Number'] = 'A1B2C3D4-E5F6-7890-ABCD-EF1234567890'
+    export['Device Timestamp'] = timestamps.strftime('%m-%d-%Y %I:%M %p')
+    export['Record Type'] = record_type
+    export['Historic Glucose mg/dL'] = np.where(record_type == 0, rng.normal(100, 15, len(timestamps)).round(), np.nan)
+    export['Scan Glucose mg/dL'] = np.where(record_type == 1, rng.normal(100, 15, len(timestamps)).round(), np.nan)
+    export['Notes'] = np.where(record_type == 1, 'scan after lunch, walked 20 minutes', '')
+    with open(path, 'w') as file:
+        file.write('Glucose Data,Generated on,01-01-2021 12:00 AM,Generated by,Benchmark\n')
+        export.to_csv(file, index=False)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process. VmHWM is reset on exec, unlike ru_maxrss."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kilobytes on Linux
+
+
+def measure(path: str, chunksize: int):
+    import glucose as gc
+    baseline_mb = peak_rss_mb()
+    start = time.perf_counter()
+    glucose = gc.load_glucose_data(path, timezone='US/Eastern', chunksize=chunksize or None)
+    seconds = time.perf_counter() - start
+    peak_mb = peak_rss_mb() - baseline_mb
+    print(f"{len(glucose)} {seconds:.2f} {peak_mb:.0f} {glucose.memory_usage(deep=True) / 1024 ** 2:.1f}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--measure']:
+        measure(sys.argv[2], int(sys.argv[3]))
+        sys.exit()
+
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as directory:
+        export_path = pathlib.Path(directory) / 'librelink.csv'
+        write_export(export_path, years)
+        print(f"{years} years, {export_path.stat().st_size / 1024 ** 2:.0f} MB export")
+        print(f"{'mode':>22} {'samples':>9} {'time (s)':>9} {'peak RSS increase (MB)':>23} {'result (MB)':>12}")
+        for mode, chunksize in [('read_csv', 0), ('chunked (100k rows)', 100000), ('chunked (20k rows)', 20000)]:
+            output = subprocess.run([sys.executable, __file__, '--measure', str(export_path), str(chunksize)],
+                                    capture_output=True, text=True, check=True).stdout.split()
+            samples, seconds, peak_mb, result_mb = output
+            print(f"{mode:>22} {samples:>9} {seconds:>9} {peak_mb:>23} {result_mb:>12}")
@@ -0,0 +1,39 @@
+"""
+Benchmark the single-pass groupby statistics (glucose.day_glucose_stats(), glucose.sleep_glucose_stats())
+against calling glucose.glucose_stats() once per group of a dictionary.
+Run from the repository root: python benchmarks/bench_grouped_stats.py
+"""
+import pathlib
+import sys
+import timeit
+
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import glucose as gc  # noqa: E402
+from bench_sleep_groups import synthetic_data  # noqa: E402
+
+
+def dict_stats(groups: dict, time_label: str) -> pd.DataFrame:
+    all_stats = {key: gc.glucose_stats(glucose=glucose, time_label=time_label) for key, glucose in groups.items()}
+    return pd.DataFrame.from_dict(all_stats, orient='index')
+
+
+def dict_path(glucose: pd.Series, sleep: pd.DataFrame):
+    dict_stats(gc.create_glucose_sleep_groups(glucose=glucose, sleep=sleep), time_label='Sleep')
+    dict_stats(gc.create_glucose_day_groups(glucose=glucose), time_label='Day')
+
+
+def groupby_path(glucose: pd.Series, sleep: pd.DataFrame):
+    gc.sleep_glucose_stats(glucose=glucose, sleep=sleep, time_label='Sleep')
+    gc.day_glucose_stats(glucose=glucose, time_label='Day')
+
+
+if __name__ == '__main__':
+    print(f"{'years':>5} {'dict loop (s)':>14} {'groupby (s)':>12} {'speedup':>8}")
+    for years in [1, 3, 10]:
+        glucose, sleep = synthetic_data(years)
+        looped = min(timeit.repeat(lambda: dict_path(glucose, sleep), number=1, repeat=3))
+        grouped = min(timeit.repeat(lambda: groupby_path(glucose, sleep), number=1, repeat=3))
+        print(f"{years:>5} {looped:>14.3f} {grouped:>12.3f} {looped / grouped:>7.1f}x")
@@ -0,0 +1,34 @@
+"""
+Benchmark the clustered correlation heatmap and the index of the strongest pairs on wide datasets: time of the first
+request (clustering and indexing) and of repeated requests (cached with the correlation engine of the dataset's
+fingerprint), and the size of the heatmap figure sent to the browser, full against reduced to
+utilities.HEATMAP_MAX_COLUMNS columns.
+Run from the repository root: python benchmarks/bench_heatmap_index.py
+"""
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import correlation as corr  # noqa: E402
+import plot  # noqa: E402
+import utilities as util  # noqa: E402
+from bench_all_pairs_ols import synthetic_metrics  # noqa: E402
+
+
+def first_request(dataset):
+    corr._engines.clear()
+    return util.clustered_corr_matrix(dataset), util.top_correlated_pairs(dataset)
+
+
+if __name__ == '__main__':
+    print(f"{'metrics':>7} {'first (ms)':>11} {'cached (ms)':>12} {'full heatmap (KB)':>18} {'reduced (KB)':>13}")
+    for metrics in [24, 60, 120]:
+        dataset = synthetic_metrics(metrics)
+        first = min(timeit.repeat(lambda: first_request(dataset), number=1, repeat=3))
+        cached = min(timeit.repeat(lambda: (util.clustered_corr_matrix(dataset.copy()),
+                                            util.top_correlated_pairs(dataset.copy())), number=1, repeat=3))
+        full = len(plot.plotly_heatmap(util.corr_matrix(dataset).round(2)).to_json()) / 1024
+        reduced = len(plot.plotly_heatmap(util.clustered_corr_matrix(dataset).round(2)).to_json()) / 1024
+        print(f"{metrics:>7} {first * 1e3:>11.1f} {cached * 1e3:>12.1f} {full:>18.1f} {reduced:>13.1f}")
@@ -0,0 +1,40 @@
+"""
+Measure the import time of the compute modules with python -X importtime, and list the slowest imports.
+Run from the repository root: python benchmarks/bench_import_time.py
+"""
+import pathlib
+import subprocess
+import sys
+
+SRC_PATH = pathlib.Path(__file__).resolve().parents[1] / 'src'
+COMPUTE_MODULES = ['glucose', 'levels', 'whoop', 'zero', 'utilities']
+
+
+def import_times(modules: [str]) -> dict:
+    """
+    Import modules in a fresh interpreter with -X importtime.
+
+    Returns: Dictionary of every imported module and its cumulative import time in microseconds.
+
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+                            cwd=SRC_PATH, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+if __name__ == '__main__':
+    times = import_times(COMPUTE_MODULES)
+    print(f"{'module':>12} {'cumulative (ms)':>16}")
+    for module in COMPUTE_MODULES:
+        print(f"{module:>12} {times[module] / 1000:>16.1f}")
+    print(f"\nstreamlit imported: {'streamlit' in times}, pandas_profiling imported: {'pandas_profiling' in times}")
+    print("\nslowest top-level imports:")
+    top_level = {module: time for module, time in times.items() if '.' not in module}
+    for module, time in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"{module:>24} {time / 1000:>8.1f} ms")
@@ -0,0 +1,33 @@
+"""
+Benchmark the FFT lagged correlations (correlation.lagged_correlations()) against shifting the dataset and
+running pandas DataFrame.corr() once per lag.
+Run from the repository root: python benchmarks/bench_lagged_correlation.py
+"""
+import pathlib
+import sys
+import timeit
+
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import correlation as corr  # noqa: E402
+from bench_all_pairs_ols import synthetic_metrics  # noqa: E402
+
+
+def shifted_corr(dataset: pd.DataFrame, max_lag: int = corr.MAX_LAG) -> pd.DataFrame:
+    correlations = []
+    for lag in range(-max_lag, max_lag + 1):
+        shifted = pd.concat([dataset.shift(lag).add_prefix('x: '), dataset], axis=1)
+        matrix = shifted.corr().iloc[:dataset.shape[1], dataset.shape[1]:]
+        correlations.append(matrix.stack().rename('correlation').reset_index().assign(lag=lag))
+    return pd.concat(correlations, ignore_index=True)
+
+
+if __name__ == '__main__':
+    print(f"{'metrics':>7} {'days':>5} {'shift + corr (s)':>17} {'fft (s)':>8} {'speedup':>8}")
+    for metrics, days in [(10, 365), (24, 365), (24, 3 * 365)]:
+        dataset = synthetic_metrics(metrics, days=days).set_index(pd.date_range('2020-01-01', periods=days))
+        looped = min(timeit.repeat(lambda: shifted_corr(dataset), number=1, repeat=3))
+        fft = min(timeit.repeat(lambda: corr.lagged_correlations(dataset), number=1, repeat=3))
+        print(f"{metrics:>7} {days:>5} {looped:>17.3f} {fft:>8.3f} {looped / fft:>7.1f}x")
@@ -0,0 +1,43 @@
+"""
+Benchmark meal_response.response_curves() (one search of the glucose index for all events x offsets) on thousands
+of meals, against slicing and interpolating the glucose data once per meal (timed on a subset of the meals and
+extrapolated).
+Run from the repository root: python benchmarks/bench_meal_response.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import meal_response as mr  # noqa: E402
+
+SLICED_MEALS = 200
+
+
+def sliced_curves(glucose: pd.Series, events: pd.Series) -> pd.DataFrame:
+    offsets = pd.to_timedelta(np.arange(0, mr.RESPONSE_MINUTES + 1, mr.RESPONSE_STEP_MINUTES), 'min')
+    gap = pd.Timedelta(mr.RESPONSE_MAX_GAP)
+    curves = {}
+    for key, event in events.items():
+        window = glucose[event - gap:event + offsets[-1] + gap]
+        targets = event + offsets
+        curve = window.reindex(window.index.union(targets)).interpolate(method='time', limit_area='inside')
+        curves[key] = curve.reindex(targets).to_numpy()
+    return pd.DataFrame.from_dict(curves, orient='index')
+
+
+if __name__ == '__main__':
+    print(f"{'samples':>9} {'meals':>7} {'sliced, est. (s)':>17} {'batched (s)':>12} {'speedup':>8}")
+    rng = np.random.default_rng(0)
+    for days, meals in [(365, 1_000), (3650, 10_000)]:
+        index = pd.date_range('2010-01-01', periods=days * 96, freq='15min', name='Timestamp')
+        glucose = pd.Series(rng.normal(100, 15, len(index)).astype(np.float32), index=index, name='Glucose (mg/dL)')
+        events = pd.Series(index[0] + pd.to_timedelta(np.sort(rng.uniform(0, days * 24 * 60, meals)), 'min'))
+        sliced = min(timeit.repeat(lambda: sliced_curves(glucose, events.iloc[:SLICED_MEALS]), number=1, repeat=1))
+        sliced *= meals / SLICED_MEALS
+        batched = min(timeit.repeat(lambda: mr.response_metrics(mr.response_curves(glucose, events)),
+                                    number=1, repeat=3))
+        print(f"{len(glucose):>9} {meals:>7} {sliced:>17.2f} {batched:>12.4f} {sliced / batched:>7.0f}x")
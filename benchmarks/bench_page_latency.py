@@ -0,0 +1,71 @@
+"""
+Benchmark the static asset work of one app rerun per page. Before: the sample dataset and data dictionary were parsed
+at module level on every rerun, images were opened and decoded by every rerun of their page, and markdown went through
+st.cache (a lookup hashing the file name and, to detect mutation, the returned text). After: assets are loaded once
+per process (assets module). The assets of each page are read from the page functions of app.py, the sidebar assets
+are part of every rerun. Streamlit is not needed, only the asset loading is timed (not the rendering).
+Run from the repository root: python benchmarks/bench_page_latency.py
+"""
+import ast
+import hashlib
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import assets  # noqa: E402
+import sample_artifact as sa  # noqa: E402
+import utilities as util  # noqa: E402
+
+APP_PATH = util.SRC_PATH / 'app.py'
+
+
+def asset_calls(node) -> list:
+    """The (function, argument) of every assets.<function>(...) call under an ast node."""
+    calls = []
+    for call in ast.walk(node):
+        if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and \
+                isinstance(call.func.value, ast.Name) and call.func.value.id == 'assets':
+            argument = call.args[0].value if call.args else None
+            calls.append((call.func.attr, argument))
+    return calls
+
+
+def page_assets() -> dict:
+    """Assets used by each page function of app.py, and by the sidebar ('Sidebar')."""
+    tree = ast.parse(APP_PATH.read_text())
+    pages = {node.name: asset_calls(node) for node in tree.body if isinstance(node, ast.FunctionDef)}
+    pages['Sidebar'] = [call for node in tree.body if not isinstance(node, ast.FunctionDef)
+                        for call in asset_calls(node)]
+    return pages
+
+
+def load_before(calls: list) -> None:
+    assets.data_dictionary.__wrapped__()
+    sa.parse_sample()
+    for function, argument in calls:
+        if function == 'image':
+            assets.image.__wrapped__(argument)
+        elif function == 'markdown':
+            hashlib.md5(argument.encode()).hexdigest()
+            hashlib.md5(util.read_markdown_file(argument).encode()).hexdigest()
+
+
+def load_after(calls: list) -> None:
+    for function, argument in calls:
+        getattr(assets, function)(*([argument] if argument is not None else []))
+
+
+if __name__ == '__main__':
+    pages = page_assets()
+    sidebar = pages.pop('Sidebar')
+    print(f"{'page':>24} {'images':>7} {'markdown':>9} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+    for page, calls in pages.items():
+        calls = sidebar + calls
+        load_after(calls)  # warm the process caches, as after the first rerun
+        before = min(timeit.repeat(lambda: load_before(calls), number=1, repeat=5))
+        after = min(timeit.repeat(lambda: load_after(calls), number=1, repeat=5))
+        images = sum(function == 'image' for function, _ in calls)
+        markdown = sum(function == 'markdown' for function, _ in calls)
+        print(f"{page:>24} {images:>7} {markdown:>9} {before * 1e3:>12.2f} {after * 1e3:>11.3f} "
+              f"{before / after:>7.0f}x")
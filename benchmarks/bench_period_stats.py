@@ -0,0 +1,43 @@
+"""
+Benchmark glucose.period_glucose_stats() (one sorted interval join, one aggregation) on tens of thousands of
+overlapping windows over millions of samples, against masking the glucose index once per window
+(timed on a subset of the windows and extrapolated).
+Run from the repository root: python benchmarks/bench_period_stats.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import glucose as gc  # noqa: E402
+
+MASKED_WINDOWS = 200
+
+
+def synthetic_windows(glucose: pd.Series, count: int, seed: int = 0) -> pd.DataFrame:
+    """Windows of 1 to 36 hours starting anywhere in the data, so many of them overlap."""
+    rng = np.random.default_rng(seed)
+    start = glucose.index[0] + pd.to_timedelta(rng.uniform(0, 1, count) * (glucose.index[-1] - glucose.index[0]))
+    return pd.DataFrame({'start_dt': start, 'end_dt': start + pd.to_timedelta(rng.integers(60, 36 * 60, count), 'min')})
+
+
+def masked_stats(glucose: pd.Series, windows: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({key: gc.glucose_stats(glucose[(glucose.index >= window.start_dt) &
+                                                       (glucose.index <= window.end_dt)])
+                         for key, window in windows.iterrows()}).T
+
+
+if __name__ == '__main__':
+    print(f"{'samples':>9} {'windows':>8} {'masking, est. (s)':>18} {'interval join (s)':>18} {'speedup':>8}")
+    rng = np.random.default_rng(0)
+    for samples, count in [(1_000_000, 10_000), (3_000_000, 50_000)]:
+        index = pd.date_range('2000-01-01', periods=samples, freq='5min', name='Timestamp')
+        glucose = pd.Series(rng.normal(100, 15, samples).astype(np.float32), index=index, name='Glucose (mg/dL)')
+        windows = synthetic_windows(glucose, count)
+        masked = min(timeit.repeat(lambda: masked_stats(glucose, windows.iloc[:MASKED_WINDOWS]), number=1, repeat=1))
+        masked *= count / MASKED_WINDOWS
+        joined = min(timeit.repeat(lambda: gc.period_glucose_stats(glucose, windows), number=1, repeat=3))
+        print(f"{samples:>9} {count:>8} {masked:>18.1f} {joined:>18.3f} {masked / joined:>7.0f}x")
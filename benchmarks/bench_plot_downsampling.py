@@ -0,0 +1,38 @@
+"""
+Benchmark the payload of a raw glucose trend (plot.plotly_glucose()) with every point, as plotly_line sent it before,
+against the trace downsampled to downsample.MAX_POINTS: size of the figure JSON sent to the browser, and the server
+time to build and serialize the figure. Browser render time scales with the number of points drawn (reported).
+Run from the repository root: python benchmarks/bench_plot_downsampling.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import downsample as ds  # noqa: E402
+import plot  # noqa: E402
+
+
+def figure_json(glucose: pd.Series, max_points: int, date_range: tuple = None) -> str:
+    return plot.plotly_glucose(glucose, max_points=max_points, date_range=date_range).to_json()
+
+
+if __name__ == '__main__':
+    print(f"{'glucose (5 min)':>15} {'points':>8} {'full (MB)':>10} {'full (s)':>9} "
+          f"{'downsampled (MB)':>17} {'downsampled (s)':>16} {'zoom 1 week (s)':>16}")
+    rng = np.random.default_rng(0)
+    for label, days in [('3 months', 91), ('1 year', 365), ('3 years', 3 * 365)]:
+        index = pd.date_range('2018-01-01', periods=days * 288, freq='5min', name='Timestamp')
+        glucose = pd.Series(np.cumsum(rng.normal(0, 2, len(index))).astype(np.float32) % 150 + 60, index=index,
+                            name='Glucose (mg/dL)')
+        week = (index[len(index) // 2], index[len(index) // 2] + pd.Timedelta(days=7))
+        full = min(timeit.repeat(lambda: figure_json(glucose, len(glucose)), number=1, repeat=3))
+        reduced = min(timeit.repeat(lambda: figure_json(glucose, ds.MAX_POINTS), number=1, repeat=3))
+        zoomed = min(timeit.repeat(lambda: figure_json(glucose, ds.MAX_POINTS, week), number=1, repeat=3))
+        full_mb = len(figure_json(glucose, len(glucose))) / 1024 ** 2
+        reduced_mb = len(figure_json(glucose, ds.MAX_POINTS)) / 1024 ** 2
+        print(f"{label:>15} {len(glucose):>8} {full_mb:>10.2f} {full:>9.3f} {reduced_mb:>17.3f} {reduced:>16.3f} "
+              f"{zoomed:>16.3f}")
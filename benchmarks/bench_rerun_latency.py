@@ -0,0 +1,84 @@
+"""
+Benchmark the cache lookups of one app rerun on multi-year uploads: every cached step hashes its pandas arguments
+(and, for Streamlit's st.cache, the cached output to detect mutation). Compares hashing the full content on every
+rerun (the previous hash_funcs, and the result cache keys) with the fingerprints attached at load time
+(fingerprint.fingerprint()). Streamlit is not needed, its memo lookup is emulated with the same hash function.
+Run from the repository root: python benchmarks/bench_rerun_latency.py
+"""
+import pathlib
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import correlation as corr  # noqa: E402
+import fingerprint as fp  # noqa: E402
+import levels as lv  # noqa: E402
+import regression as reg  # noqa: E402
+import utilities as util  # noqa: E402
+import whoop as wp  # noqa: E402
+import zero as zo  # noqa: E402
+from bench_fast_days import synthetic_fasts  # noqa: E402
+
+
+def load_uploads(directory: pathlib.Path, days: int) -> dict:
+    """Write synthetic exports of the given number of days, and load them with the app's loaders."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2010-01-01', periods=days, freq='1D')
+    sleep_start = dates - pd.Timedelta(hours=1)
+    whoop = pd.DataFrame({'Date': dates, 'Sleep Start': sleep_start, 'Sleep End': sleep_start + pd.Timedelta(hours=8)})
+    for column in ['Strain', 'Recovery', 'Sleep Score', 'RHR', 'Average HR', 'Max HR', 'Respiratory Rate',
+                   'HRV (ms)', 'Sleep (hr)']:
+        whoop[column] = rng.uniform(0, 100, days).round(1)
+    whoop.to_csv(directory / 'whoop.csv', index=False)
+    pd.DataFrame({'Date': dates, 'Metabolic Score': rng.uniform(0, 100, days).round(1)}).to_csv(
+        directory / 'levels.csv', index=False)
+    fasts = synthetic_fasts(days)
+    fasts.assign(Date=fasts.Date.dt.strftime('%m/%d/%y')).iloc[::-1].to_csv(directory / 'zero.csv', index=False)
+    index = pd.date_range(dates[0], periods=days * 96, freq='15min', name='Timestamp')
+    glucose = pd.Series(rng.normal(100, 15, len(index)).astype(np.float32), index=index, name='Glucose (mg/dL)')
+    return {'whoop': wp.load_whoop_data(directory / 'whoop.csv'),
+            'levels': lv.load_levels_data(directory / 'levels.csv'),
+            'zero': zo.load_zero_data(directory / 'zero.csv'),
+            'glucose': fp.attach(glucose)}  # as returned by glucose.load_glucose_data()
+
+
+def rerun_steps(uploads: dict) -> list:
+    """The cached steps of a rerun: (arguments, output), output is None for the result cache (no mutation check)."""
+    sleep_scores = wp.sleep_metrics(uploads['whoop'])
+    fasting_scores = zo.all_fasts_stats(uploads['zero'])
+    metrics = util.create_metrics_dataset(sleep_scores, uploads['levels'], fasting_scores)
+    raw = util.create_raw_analysis_dataset(uploads['whoop'], uploads['glucose'])
+    return [([uploads['whoop']], sleep_scores),
+            ([uploads['zero']], fasting_scores),
+            ([sleep_scores, uploads['levels'], fasting_scores], None),
+            ([uploads['whoop'], uploads['glucose']], None),
+            ([metrics, 'Date'], util.corr_matrix(metrics, date_column='Date')),
+            ([metrics, 'Date'], reg.all_pairs_ols(metrics, date_column='Date')),
+            ([metrics, 'Date'], corr.lagged_correlations(metrics, date_column='Date')),
+            ([raw, 'Date'], util.corr_matrix(raw, date_column='Date'))]
+
+
+def rerun(steps: list, hash_function) -> None:
+    for arguments, output in steps:
+        for argument in arguments:
+            if isinstance(argument, (pd.DataFrame, pd.Series)):
+                hash_function(argument)
+        if output is not None:
+            hash_function(output)
+
+
+if __name__ == '__main__':
+    print(f"{'years':>5} {'glucose rows':>13} {'content hashing (ms)':>21} {'fingerprints (ms)':>18} {'speedup':>8}")
+    for years in [1, 5, 10]:
+        with tempfile.TemporaryDirectory() as directory:
+            uploads = load_uploads(pathlib.Path(directory), years * 365)
+        steps = rerun_steps(uploads)
+        hashed = min(timeit.repeat(lambda: rerun(steps, fp.content_fingerprint), number=1, repeat=5))
+        fingerprinted = min(timeit.repeat(lambda: rerun(steps, fp.fingerprint), number=1, repeat=5))
+        print(f"{years:>5} {len(uploads['glucose']):>13} {hashed * 1e3:>21.1f} {fingerprinted * 1e3:>18.2f} "
+              f"{hashed / fingerprinted:>7.0f}x")
@@ -0,0 +1,47 @@
+"""
+Benchmark the cold start of the sample pages (Data and Analysis) in a new app process: parsing sample.csv, the
+analysis (clustered correlation matrix, strongest pairs, all-pairs regression fits, lagged correlations), and the
+figures of the default selections, against one memory-mapped read of the prebuilt artifact (sample_artifact.load())
+and decoding its figures. The process caches (correlation engines, figure layouts) are cleared before every run.
+Run from the repository root: python benchmarks/bench_sample_artifact.py
+"""
+import pathlib
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import correlation as corr  # noqa: E402
+import plot  # noqa: E402
+import sample_artifact as sa  # noqa: E402
+
+
+def clear_process_caches() -> None:
+    corr._engines.clear()
+    plot.layout_template.cache_clear()
+
+
+def cold_start_csv() -> None:
+    clear_process_caches()
+    analysis = sa.analyze(sa.parse_sample(), figures=False)
+    sa.default_figures(analysis)
+
+
+def cold_start_artifact(path: pathlib.Path) -> None:
+    clear_process_caches()
+    artifact = sa.load(path)
+    for figure in artifact['figures'].values():
+        sa.decode_figure(figure)
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        path = sa.build(pathlib.Path(directory) / 'sample.pickle')
+        size = path.stat().st_size
+        csv = min(timeit.repeat(cold_start_csv, number=1, repeat=5))
+        load = min(timeit.repeat(lambda: sa.load(path), number=1, repeat=5))
+        artifact = min(timeit.repeat(lambda: cold_start_artifact(path), number=1, repeat=5))
+    print(f"{'artifact (KiB)':>15} {'csv + analysis (ms)':>20} {'artifact load (ms)':>19} "
+          f"{'load + figures (ms)':>20} {'speedup':>8}")
+    print(f"{size / 1024:>15.1f} {csv * 1e3:>20.1f} {load * 1e3:>19.2f} {artifact * 1e3:>20.1f} "
+          f"{csv / artifact:>7.0f}x")
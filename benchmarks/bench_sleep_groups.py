@@ -0,0 +1,43 @@
+"""
+Benchmark glucose.create_glucose_sleep_groups() (sorted interval join) against the original per-day boolean masking.
+Run from the repository root: python benchmarks/bench_sleep_groups.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+import glucose as gc  # noqa: E402
+
+
+def masked_sleep_groups(glucose: pd.Series, sleep: pd.DataFrame) -> dict:
+    groups = {}
+    for day in sleep.index[sleep.index.isin(glucose.index.floor('D'))]:
+        period = (glucose.index >= sleep.loc[day]['Sleep Start']) & (glucose.index <= sleep.loc[day]['Sleep End'])
+        if period.any():
+            groups[day] = glucose[period]
+    return groups
+
+
+def synthetic_data(years: int) -> (pd.Series, pd.DataFrame):
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2015-01-01', periods=years * 365 * 96, freq='15min', name='Timestamp')
+    glucose = pd.Series(rng.normal(100, 15, len(index)), index=index, name='Glucose (mg/dL)')
+    dates = pd.date_range('2015-01-01', periods=years * 365, freq='1D')
+    sleep_start = dates - pd.Timedelta(hours=1) + pd.to_timedelta(rng.integers(0, 120, len(dates)), 'min')
+    sleep = pd.DataFrame({'Sleep Start': sleep_start,
+                          'Sleep End': sleep_start + pd.Timedelta(hours=7.5)},
+                         index=dates)
+    return glucose, sleep
+
+
+if __name__ == '__main__':
+    print(f"{'years':>5} {'samples':>9} {'masking (s)':>12} {'interval join (s)':>18} {'speedup':>8}")
+    for years in [1, 3, 10]:
+        glucose, sleep = synthetic_data(years)
+        masked = min(timeit.repeat(lambda: masked_sleep_groups(glucose, sleep), number=1, repeat=3))
+        joined = min(timeit.repeat(lambda: gc.create_glucose_sleep_groups(glucose, sleep), number=1, repeat=3))
+        print(f"{years:>5} {len(glucose):>9} {masked:>12.3f} {joined:>18.3f} {masked / joined:>7.1f}x")
@@ -0,0 +1,69 @@
+"""
+Benchmark the vectorized glycemic variability metrics (variability.day_variability()) against calculating the
+metrics with one Python call per day (pandas per-window statistics, and MAGE by sequential excursion removal).
+Run from the repository root: python benchmarks/bench_variability.py
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import glucose as gc  # noqa: E402
+import variability as vb  # noqa: E402
+from bench_sleep_groups import synthetic_data  # noqa: E402
+
+
+def sequential_mage(values: np.ndarray) -> float:
+    std = values.std(ddof=1)
+    changes = np.diff(values)
+    steps = np.flatnonzero(changes)
+    peaks = [values[0]] + [values[b] for a, b in zip(steps[:-1], steps[1:])
+                           if np.sign(changes[a]) != np.sign(changes[b])] + [values[-1]]
+    while True:
+        amplitudes = np.abs(np.diff(peaks))
+        if len(amplitudes) == 0 or amplitudes.min() >= std:
+            break
+        k = int(amplitudes.argmin())
+        if k == 0:
+            del peaks[0]
+        elif k + 2 == len(peaks):
+            del peaks[-1]
+        else:
+            extreme, opposite = (min, max) if peaks[k + 1] < peaks[k] else (max, min)
+            peaks[k - 1] = extreme(peaks[k - 1], peaks[k + 1])
+            peaks[k + 2] = opposite(peaks[k + 2], peaks[k])
+            del peaks[k:k + 2]
+    return np.abs(np.diff(peaks)).mean() if len(peaks) > 1 else np.nan
+
+
+def window_metrics(window: pd.Series) -> pd.Series:
+    earlier = window.reindex(window.index - pd.Timedelta('1h'))
+    risk = 1.509 * (np.log(window) ** 1.084 - 5.381)
+    return pd.Series({'Glucose CV (%)': window.std() / window.mean() * 100,
+                      'Time in Range (%)': window.between(70, 180).mean() * 100,
+                      'Time Above Range (%)': (window > 180).mean() * 100,
+                      'Time Below Range (%)': (window < 70).mean() * 100,
+                      'GMI (%)': 3.31 + 0.02392 * window.mean(),
+                      'MAGE (mg/dL)': sequential_mage(window.values),
+                      'CONGA (mg/dL)': (window.values - earlier.values)[earlier.notna()].std(ddof=1),
+                      'LBGI': (10 * risk ** 2).where(risk < 0, 0).mean(),
+                      'HBGI': (10 * risk ** 2).where(risk > 0, 0).mean()})
+
+
+def per_window(glucose: pd.Series) -> pd.DataFrame:
+    days = gc.day_offsets(glucose)
+    return pd.DataFrame({day: window_metrics(glucose.iloc[left:right]) for day, (left, right) in days.iterrows()}).T
+
+
+if __name__ == '__main__':
+    print(f"{'years':>5} {'days':>5} {'per window (s)':>15} {'vectorized (s)':>15} {'speedup':>8}")
+    for years in [1, 3, 10]:
+        glucose, _ = synthetic_data(years)
+        glucose = glucose.rolling(8, min_periods=1).mean()  # smoother, CGM-like traces
+        looped = min(timeit.repeat(lambda: per_window(glucose), number=1, repeat=1))
+        vectorized = min(timeit.repeat(lambda: vb.day_variability(glucose), number=1, repeat=3))
+        print(f"{years:>5} {len(glucose) // 96:>5} {looped:>15.3f} {vectorized:>15.3f} {looped / vectorized:>7.1f}x")
@@ -0,0 +1,183 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+import glucose as gc
+
+AGGREGATE_COLUMNS = ['count', 'sum', 'sum_sq', 'min', 'max']
+SCOPES = ['Day', 'Sleep']
+
+
+def sample_hashes(glucose: pd.Series) -> np.ndarray:
+    """
+    Hash every glucose sample (timestamp and value).
+    Args:
+        glucose: pandas Series of glucose data.
+
+    Returns: numpy array of uint64 hashes.
+
+    """
+    return pd.util.hash_pandas_object(glucose, index=True).values
+
+
+def window_hashes(hashes: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Combine the sample hashes of every window by summation (modulo 2^64), from a cumulative sum of the hashes.
+    Args:
+        hashes: uint64 hashes of the samples, see aggregate_store.sample_hashes().
+        left: Start offset (inclusive) of each window.
+        right: End offset (exclusive) of each window.
+
+    Returns: numpy array of uint64 window hashes.
+
+    """
+    cumulative = np.concatenate([np.zeros(1, dtype=np.uint64), np.cumsum(hashes, dtype=np.uint64)])
+    return cumulative[right] - cumulative[left]
+
+
+def window_aggregates(glucose: pd.Series, left: np.ndarray, right: np.ndarray, keys) -> pd.DataFrame:
+    """
+    Calculate the sufficient statistics (count, sum, sum of squares, min, max) of glucose windows given as offsets
+    (see glucose.window_offsets()). Windows must contain at least one sample.
+    Args:
+        glucose: pandas Series of glucose data, the offsets refer to.
+        left: Start offset (inclusive) of each window.
+        right: End offset (exclusive) of each window.
+        keys: Index values of the returned DataFrame, one per window.
+
+    Returns: A pandas DataFrame of aggregates, one row per window.
+
+    """
+    positions, codes = gc.segment_positions(left=left, right=right)
+    values = glucose.values[positions].astype(np.float64)
+    window_starts = np.cumsum(right - left) - (right - left)
+    aggregates = pd.DataFrame({'count': right - left,
+                               'sum': np.add.reduceat(values, window_starts),
+                               'sum_sq': np.add.reduceat(values ** 2, window_starts),
+                               'min': np.minimum.reduceat(values, window_starts),
+                               'max': np.maximum.reduceat(values, window_starts)},
+                              index=pd.Index(keys))
+    return aggregates
+
+
+def aggregates_stats(aggregates: pd.DataFrame, time_label: str = None) -> pd.DataFrame:
+    """
+    Calculate the default glucose statistics (glucose.GLUCOSE_STATISTICS) from stored aggregates.
+    Args:
+        aggregates: A pandas DataFrame of aggregates, see aggregate_store.window_aggregates().
+        time_label: Optional label.
+
+    Returns: A pandas DataFrame of glucose statistics, same columns as glucose.grouped_glucose_stats().
+
+    """
+    count = aggregates['count'].astype(float)
+    mean = aggregates['sum'] / count
+    variance = ((aggregates['sum_sq'] - aggregates['sum'] * mean) / (count - 1)).clip(lower=0)
+    variance[count < 2] = np.nan
+    labels = list(gc.statistic_labels(time_label=time_label))
+    stats = pd.DataFrame({labels[0]: mean,
+                          labels[1]: np.sqrt(variance),
+                          labels[2]: aggregates['min'].astype(float),
+                          labels[3]: aggregates['max'].astype(float)})
+    return stats
+
+
+class AggregateStore:
+    """
+    Persistent store of per-day and per-sleep-period glucose aggregates (count, sum, sum of squares, min, max).
+    New uploads only aggregate the days and sleep periods which are new or changed (detected by a hash of their
+    samples), so the daily and sleep statistics are rebuilt from the store in O(days) instead of O(samples).
+    The latest upload is authoritative for every day and sleep period it fully covers. A day or sleep period cut by the
+    start or end of an upload (i.e. a re-upload starting mid-day) only replaces the stored one if it has at least as
+    many samples, so overlapping uploads never overwrite a complete window with a partial one.
+    """
+
+    def __init__(self, path: pathlib.Path = None):
+        self.path = pathlib.Path(path) if path else None
+        self.aggregates = {}
+        for scope in SCOPES:
+            self.aggregates[scope] = self._read(scope) if self.path else None
+            if self.aggregates[scope] is None:
+                self.aggregates[scope] = pd.DataFrame(columns=AGGREGATE_COLUMNS + ['hash'])
+
+    def update(self, glucose: pd.Series, sleep: pd.DataFrame) -> dict:
+        """
+        Merge an upload of glucose and sleep data into the store, and persist the store if it has a path.
+        Stored days and sleep periods only partly covered by the upload are kept unless the upload has as many samples.
+        Args:
+            glucose: pandas Series of glucose data.
+            sleep: pandas DataFrame containing sleep data. Required date index, and 'Sleep Start' and 'Sleep End'
+                   columns.
+
+        Returns: Dictionary of the number of days and sleep periods (re)aggregated.
+
+        """
+        glucose = glucose.sort_index(kind='mergesort')
+        hashes = sample_hashes(glucose)
+
+        days = gc.day_offsets(glucose)
+        day_left, day_right = days.left.values, days.right.values
+
+        offsets = gc.sleep_period_offsets(glucose=glucose, sleep=sleep)
+        period_hashes = pd.util.hash_pandas_object(sleep.loc[offsets.index, ['Sleep Start', 'Sleep End']],
+                                                   index=False).values
+        # windows whose whole span lies inside the time range of the upload
+        first, last = (glucose.index[0], glucose.index[-1]) if len(glucose) else (pd.NaT, pd.NaT)
+        day_covered = np.asarray((days.index >= first) & (days.index + pd.Timedelta(days=1) <= last))
+        periods = sleep.loc[offsets.index]
+        period_covered = np.asarray((periods['Sleep Start'] >= first) & (periods['Sleep End'] <= last))
+        windows = {'Day': (days.index, day_left, day_right, window_hashes(hashes, day_left, day_right), day_covered),
+                   'Sleep': (offsets.index, offsets.left.values, offsets.right.values,
+                             window_hashes(hashes, offsets.left.values, offsets.right.values) + period_hashes,
+                             period_covered)}
+
+        updated = {}
+        for scope, (keys, left, right, upload_hashes, covered) in windows.items():
+            stored = self.aggregates[scope]
+            positions = stored.index.get_indexer(keys)
+            stored_hashes = stored['hash'].values.astype(np.uint64)[positions] if len(stored) else upload_hashes
+            stored_counts = stored['count'].values.astype(np.int64)[positions] if len(stored) else right - left
+            changed = (positions < 0) | ((stored_hashes != upload_hashes) & (covered | (right - left >= stored_counts)))
+            updated[scope] = int(changed.sum())
+            if not updated[scope]:
+                continue
+            new_aggregates = window_aggregates(glucose, left[changed], right[changed], keys[changed])
+            new_aggregates['hash'] = upload_hashes[changed]
+            kept = stored.drop(index=new_aggregates.index, errors='ignore')
+            self.aggregates[scope] = pd.concat([kept, new_aggregates]).sort_index() if len(kept) else new_aggregates
+
+        if self.path:
+            self.save()
+        return updated
+
+    def stats(self, scope: str, time_label: str = None) -> pd.DataFrame:
+        """
+        Get the glucose statistics of a scope, rebuilt from the stored aggregates.
+        Args:
+            scope: 'Day' or 'Sleep'.
+            time_label: Optional label, defaults to the scope.
+
+        Returns: A pandas DataFrame of glucose statistics, indexed on date.
+
+        """
+        return aggregates_stats(self.aggregates[scope], time_label=time_label or scope)
+
+    def save(self):
+        """
+        Persist the aggregates as Feather files in the store path.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        for scope, aggregates in self.aggregates.items():
+            table = pa.Table.from_pandas(aggregates, preserve_index=True)
+            feather.write_feather(table, str(self.path / f"{scope.lower()}.feather"))
+
+    def _read(self, scope: str):
+        file = self.path / f"{scope.lower()}.feather"
+        if not file.exists():
+            return None
+        aggregates = feather.read_table(str(file), memory_map=True).to_pandas()
+        aggregates.index = pd.DatetimeIndex(aggregates.index)  # stores written before days were datetime64
+        return aggregates
@@ -1,228 +1,218 @@
 import streamlit as st
 import streamlit.components.v1 as components
 # from streamlit_pandas_profiling import st_profile_report
-import utilities as util
 import plot
-import pandas as pd
-from PIL import Image
+import assets
 import levels as lv
 import whoop as wp
 import zero as zo
+import app_adapter as adapter
+import regression as reg
+import sample_artifact as sa
 
-sample_file_path = util.SRC_PATH / 'sample.csv'
-analysis_gif_path = util.SRC_PATH / 'content/analysis.gif'
-data_dictionary_path = util.SRC_PATH / 'content' / 'metrics_data_dictionary.csv'
-data_dictionary = pd.read_csv(data_dictionary_path, index_col='Label')
 
-sample = pd.read_csv(sample_file_path, parse_dates=['Date'], index_col=0).round(2)
-sample['Date'] = sample.Date.dt.date
-
-st.set_page_config(page_title='Metabolic Health',
-                   page_icon='🔎',
-                   layout='centered',
-                   initial_sidebar_state='expanded')
-st.sidebar.subheader("Application Pages:")
-st.markdown("""
-# Metabolic Health Analysis 
-An application to cross analyze your metabolic health and lifestyle metrics.
-""")
-welcome_sb = st.sidebar.checkbox(
-    "Welcome", value=True)
-lifestyle_sb = st.sidebar.checkbox(
-    "Metabolism & Lifestyle", value=False)
-data_sb = st.sidebar.checkbox(
-    "Data", value=False)
-example_analysis_sb = st.sidebar.checkbox(
-    "Analysis", value=False)
-analyze_data_sb = st.sidebar.checkbox(
-    "Analyze Your Data", value=False
-)
-more_info_sb = st.sidebar.checkbox(
-    "Additional Information", value=False
-)
-
-st.sidebar.write("")
-st.sidebar.write("")
-st.sidebar.write("")
-
-with st.sidebar.beta_expander("Meet the Developer"):
-    me = Image.open(util.SRC_PATH / 'content/me.jpeg')
-    st.image(me, use_column_width=True,
-             )
-    meet_developer_file = util.read_markdown_file("meet_developer.md")
-    st.markdown(meet_developer_file, unsafe_allow_html=True)
-
-if welcome_sb:
+def welcome_page():
+    """
+    Welcome page: introduction and limitations of the analysis.
+    """
     st.write("")
     with st.beta_expander("Welcome!", expanded=True):
-        welcome_file = util.read_markdown_file("welcome.md")
+        welcome_file = assets.markdown("welcome.md")
         st.markdown(welcome_file, unsafe_allow_html=True)
         st.image('https://raw.githubusercontent.com/jbpauly/glucose-sleep-analysis/main/src/content/analysis.gif',
                  use_column_width=True, )
         st.write("")
-        limitations_file = util.read_markdown_file("limitations.md")
+        limitations_file = assets.markdown("limitations.md")
         st.markdown(limitations_file, unsafe_allow_html=True)
 
-if lifestyle_sb:
+
+def lifestyle_page():
+    """
+    Metabolism & Lifestyle page: research on sleep, fasting, and exercise.
+    """
     st.write("")
     st.markdown("## Metabolism & Lifestyle")
     st.write("")
-    research_intro_file = util.read_markdown_file("research/research_intro.md")
+    research_intro_file = assets.markdown("research/research_intro.md")
     st.markdown(research_intro_file, unsafe_allow_html=True)
 
     st.markdown("### Sleep")
     st.write("")
     with st.beta_expander("Sleep Overview", expanded=True):
-        sleep_intro_file = util.read_markdown_file("research/sleep.md")
+        sleep_intro_file = assets.markdown("research/sleep.md")
         st.markdown(sleep_intro_file, unsafe_allow_html=True)
-        ideal_sleep = Image.open(util.SRC_PATH / 'content/research/sleep_diabetes.jpg')
+        ideal_sleep = assets.image('research/sleep_diabetes.jpg')
         st.image(ideal_sleep, use_column_width=True, )
     with st.beta_expander("Additional Sleep & Metabolism Studies", expanded=False):
-        sleep_summaries_file = util.read_markdown_file("research/sleep_summaries.md")
+        sleep_summaries_file = assets.markdown("research/sleep_summaries.md")
         st.markdown(sleep_summaries_file, unsafe_allow_html=True)
 
     st.write("")
     st.markdown("### Fasting")
     st.write("")
     with st.beta_expander("Fasting Overview", expanded=True):
-        fasting_intro_file = util.read_markdown_file("research/fasting.md")
+        fasting_intro_file = assets.markdown("research/fasting.md")
         st.markdown(fasting_intro_file, unsafe_allow_html=True)
-        fast_phase_1 = Image.open(util.SRC_PATH / 'content/research/fasting_01.jpg')
+        fast_phase_1 = assets.image('research/fasting_01.jpg')
         st.image(fast_phase_1, use_column_width=True, )
-        fast_phase_2 = Image.open(util.SRC_PATH / 'content/research/fasting_02.jpg')
+        fast_phase_2 = assets.image('research/fasting_02.jpg')
         st.image(fast_phase_2, use_column_width=True, )
-        fast_phase_3 = Image.open(util.SRC_PATH / 'content/research/fasting_03.jpg')
+        fast_phase_3 = assets.image('research/fasting_03.jpg')
         st.image(fast_phase_3, use_column_width=True, )
-        fast_phase_4 = Image.open(util.SRC_PATH / 'content/research/fasting_04.jpg')
+        fast_phase_4 = assets.image('research/fasting_04.jpg')
         st.image(fast_phase_4, use_column_width=True, )
-        fast_phase_5 = Image.open(util.SRC_PATH / 'content/research/fasting_05.jpg')
+        fast_phase_5 = assets.image('research/fasting_05.jpg')
         st.image(fast_phase_5, use_column_width=True, )
     with st.beta_expander("Additional Fasting & Metabolism Studies", expanded=False):
-        fasting_summaries_file = util.read_markdown_file("research/fasting_summaries.md")
+        fasting_summaries_file = assets.markdown("research/fasting_summaries.md")
         st.markdown(fasting_summaries_file, unsafe_allow_html=True)
 
     st.write("")
     st.markdown("### Exercise")
     st.write("")
     with st.beta_expander("Exercise Overview", expanded=True):
-        exercise_intro_file = util.read_markdown_file("research/exercise.md")
+        exercise_intro_file = assets.markdown("research/exercise.md")
         st.markdown(exercise_intro_file, unsafe_allow_html=True)
-        glucose_walk = Image.open(util.SRC_PATH / 'content/research/glucose_walk.jpg')
+        glucose_walk = assets.image('research/glucose_walk.jpg')
         st.image(glucose_walk, use_column_width=True, )
     with st.beta_expander("Additional Exercise & Metabolism Studies", expanded=False):
-        exercise_summaries_file = util.read_markdown_file("research/exercise_summaries.md")
+        exercise_summaries_file = assets.markdown("research/exercise_summaries.md")
         st.markdown(exercise_summaries_file, unsafe_allow_html=True)
 
-if data_sb:
+
+def data_page():
+    """
+    Data page: the sample dataset and the definitions of the metrics.
+    """
     st.write("")
     st.markdown("## Data")
     st.write("")
-    data_overview_file = util.read_markdown_file("data/data_overview.md")
+    data_overview_file = assets.markdown("data/data_overview.md")
     st.markdown(data_overview_file, unsafe_allow_html=True)
-    st.write(sample[0:4])
+    st.write(assets.sample_dataset()[0:4])
     st.markdown("""
     Below is additional information on the logs and metrics: data sources, insights into the calculations, etc.
     """)
     with st.beta_expander("Metabolic Score", expanded=True):
-        ms_file = util.read_markdown_file("data/metabolic_score.md")
+        ms_file = assets.markdown("data/metabolic_score.md")
         st.markdown(ms_file, unsafe_allow_html=True)
     with st.beta_expander("Fast (cumulative and consecutive hours)", expanded=True):
-        fast_cc_file = util.read_markdown_file("data/fast_cc.md")
+        fast_cc_file = assets.markdown("data/fast_cc.md")
         st.markdown(fast_cc_file, unsafe_allow_html=True)
-        fast_example = Image.open(util.SRC_PATH / 'content/data/fast_breakdown.jpg')
+        fast_example = assets.image('data/fast_breakdown.jpg')
         st.image(fast_example, use_column_width=True, )
     with st.beta_expander("Fast Binned (cumulative and consecutive hours)", expanded=False):
-        fast_binned_file = util.read_markdown_file("data/fast_binned.md")
+        fast_binned_file = assets.markdown("data/fast_binned.md")
         st.markdown(fast_binned_file, unsafe_allow_html=True)
     with st.beta_expander("Fast", expanded=False):
-        fast_file = util.read_markdown_file("data/fast.md")
+        fast_file = assets.markdown("data/fast.md")
         st.markdown(fast_file, unsafe_allow_html=True)
     with st.beta_expander("Strain", expanded=False):
-        strain_file = util.read_markdown_file("data/strain.md")
+        strain_file = assets.markdown("data/strain.md")
         st.markdown(strain_file, unsafe_allow_html=True)
     with st.beta_expander("Recovery", expanded=False):
-        recovery_file = util.read_markdown_file("data/recovery.md")
+        recovery_file = assets.markdown("data/recovery.md")
         st.markdown(recovery_file, unsafe_allow_html=True)
     with st.beta_expander("Sleep Score", expanded=False):
-        sleep_score_file = util.read_markdown_file("data/sleep_score.md")
+        sleep_score_file = assets.markdown("data/sleep_score.md")
         st.markdown(sleep_score_file, unsafe_allow_html=True)
     with st.beta_expander("Strain", expanded=False):
-        sleep_file = util.read_markdown_file("data/sleep.md")
+        sleep_file = assets.markdown("data/sleep.md")
         st.markdown(sleep_file, unsafe_allow_html=True)
 
-if example_analysis_sb:
+
+def analysis_page():
+    """
+    Analysis page: correlation and regression of the sample dataset.
+    """
     st.write("")
     st.markdown("## Analysis")
     st.write("")
-    analysis_file = util.read_markdown_file("analysis/analysis.md")
+    analysis_file = assets.markdown("analysis/analysis.md")
     st.markdown(analysis_file, unsafe_allow_html=True)
     with st.beta_expander("View Information on Pearson's Correlation Coefficient"):
-        sample_pc = util.read_markdown_file("analysis/pearson_corr.md")
+        sample_pc = assets.markdown("analysis/pearson_corr.md")
         st.markdown(sample_pc, unsafe_allow_html=True)
     with st.beta_expander("View Information on Ordinary Least Squares (OLS) Regression"):
-        sample_ols = util.read_markdown_file("analysis/ols.md")
+        sample_ols = assets.markdown("analysis/ols.md")
         st.markdown(sample_ols, unsafe_allow_html=True)
     with st.beta_expander("View Information on Coefficient of Determination"):
-        sample_rsquared = util.read_markdown_file("analysis/rsquared.md")
+        sample_rsquared = assets.markdown("analysis/rsquared.md")
         st.markdown(sample_rsquared, unsafe_allow_html=True)
 
     st.write("")
     st.markdown("### Sample Dataset Analysis")
     st.write("")
     with st.beta_expander("View Data Dictionary"):
-        st.table(data_dictionary)
-    sample_dataset = sample
-    sample_corr = util.corr_matrix(sample_dataset, date_column='Date').round(2)
-    sample_heatmap = plot.plotly_heatmap(sample_corr)
+        st.table(assets.data_dictionary())
+    sample_analysis = assets.sample_analysis()
+    sample_dataset = sample_analysis['sample']
+    # figures of the default selections are prebuilt by the sample artifact, the others are built on demand
+    sample_heatmap = assets.sample_figure('heatmap') or plot.plotly_heatmap(sample_analysis['corr_matrix'])
     st.plotly_chart(sample_heatmap, use_container_width=True)
 
-    x_selection_sample, y_selection_sample, color_selection_sample = util.variables_for_plot(sample_dataset,
-                                                                                             date_col='Date',
-                                                                                             default_x='Sleep Score',
-                                                                                             default_y='Metabolic Score',
-                                                                                             default_c='Fast',
-                                                                                             app_section='sample')
+    sample_top_x, sample_top_y = adapter.top_pair_selection(sample_analysis['top_pairs'], app_section='sample')
+    x_selection_sample, y_selection_sample, color_selection_sample = adapter.variables_for_plot(
+        sample_dataset,
+        date_col=sa.DATE_COLUMN,
+        default_x=sample_top_x or sa.DEFAULT_X,
+        default_y=sample_top_y or sa.DEFAULT_Y,
+        default_c=sa.DEFAULT_COLOR,
+        app_section='sample')
+    sample_fits = sample_analysis['fits']
+    with st.beta_expander("View Linear Regression of All Metric Pairs"):
+        st.dataframe(sample_fits[sample_fits.x != sample_fits.y].sort_values('r_squared', ascending=False))
     if x_selection_sample != '<select>' and y_selection_sample != '<select>':
-        sample_scatter = plot.plotly_scatter(dataset=sample_dataset,
-                                             x_selection=x_selection_sample,
-                                             y_selection=y_selection_sample,
-                                             color_selection=color_selection_sample,
-                                             hover=['Date'])
-        sample_line = plot.plotly_line(sample_dataset, x_selection_sample, y_selection_sample, 'Date')
+        sample_scatter = assets.sample_figure('scatter', x_selection_sample, y_selection_sample,
+                                              color_selection_sample) or \
+            plot.plotly_scatter(dataset=sample_dataset,
+                                x_selection=x_selection_sample,
+                                y_selection=y_selection_sample,
+                                color_selection=color_selection_sample,
+                                hover=[sa.DATE_COLUMN],
+                                fit=reg.pair_fit(sample_fits, x_selection_sample, y_selection_sample))
+        sample_line = assets.sample_figure('line', x_selection_sample, y_selection_sample) or \
+            plot.plotly_line(sample_dataset, x_selection_sample, y_selection_sample, sa.DATE_COLUMN)
         st.plotly_chart(sample_scatter, use_container_width=True)
         st.plotly_chart(sample_line, use_container_width=True)
-
+        sample_lag_heatmap = assets.sample_figure('lag', y_selection_sample) or \
+            plot.plotly_lag_heatmap(sample_analysis['lagged'], y_selection_sample)
+        st.plotly_chart(sample_lag_heatmap, use_container_width=True)
     # sample_report = st.checkbox("Generate Pandas Profile Report", key='sample')
     # if sample_report:
-    #     sample_pr = util.profile_report(sample_dataset)
+    #     sample_pr = adapter.profile_report(sample_dataset)
     #     st_profile_report(sample_pr)
 
-sleep_scores = None
-metabolic_scores = None
-fasting_scores = None
-if analyze_data_sb:
+
+def analyze_your_data_page():
+    """
+    Analyze Your Data page: upload and analyze your own exports.
+    """
+    sleep_scores = None
+    metabolic_scores = None
+    fasting_scores = None
     st.write("")
     st.markdown("## Analyze Your Data")
     st.write("")
     with st.beta_expander("Gather Data", expanded=True):
-        get_started_file = util.read_markdown_file("instructions/get_started.md")
+        get_started_file = assets.markdown("instructions/get_started.md")
         st.markdown(get_started_file, unsafe_allow_html=True)
 
-        levels_instruction_file = util.read_markdown_file("instructions/levels_instruction.md")
-        levels_instruction_img = Image.open(util.SRC_PATH / 'content/instructions/levels_log.jpg')
+        levels_instruction_file = assets.markdown("instructions/levels_instruction.md")
+        levels_instruction_img = assets.image('instructions/levels_log.jpg')
         st.markdown(levels_instruction_file, unsafe_allow_html=True)
         st.image(levels_instruction_img, use_column_width=True, )
 
-        zero_instruction_file = util.read_markdown_file("instructions/zero_instruction.md")
-        zero_instruction_img = Image.open(util.SRC_PATH / 'content/instructions/zero_export.jpg')
+        zero_instruction_file = assets.markdown("instructions/zero_instruction.md")
+        zero_instruction_img = assets.image('instructions/zero_export.jpg')
         st.markdown(zero_instruction_file, unsafe_allow_html=True)
         st.image(zero_instruction_img, use_column_width=True, )
 
-        whoop_instruction_file = util.read_markdown_file("instructions/whoop_instruction.md")
+        whoop_instruction_file = assets.markdown("instructions/whoop_instruction.md")
         st.markdown(whoop_instruction_file, unsafe_allow_html=True)
         components.iframe("https://www.loom.com/embed/0146ce68e8b14e408ae05c40d1bd1484", height=430)
 
-        upload_instruction_file = util.read_markdown_file("instructions/upload.md")
+        upload_instruction_file = assets.markdown("instructions/upload.md")
         st.markdown(upload_instruction_file, unsafe_allow_html=True)
 
     with st.beta_expander("Upload Data", expanded=False):
@@ -231,11 +221,11 @@ if analyze_data_sb:
         levels_file = levels_col.file_uploader("Upload Levels Data", type=['csv'])
         zero_file = zero_col.file_uploader("Upload Zero Fasting Data", type=['csv'])
         if whoop_file is not None and levels_file is not None and zero_file is not None:
-            fitness_scores = wp.load_whoop_data(whoop_file)
-            sleep_scores = wp.sleep_metrics(fitness_scores)
-            metabolic_scores = lv.load_levels_data(levels_file)
-            fasting = zo.load_zero_data(zero_file)
-            fasting_scores = zo.all_fasts_stats(fasting)
+            fitness_scores = adapter.load_upload(wp.load_whoop_data, whoop_file)
+            sleep_scores = adapter.sleep_metrics(fitness_scores)
+            metabolic_scores = adapter.load_upload(lv.load_levels_data, levels_file)
+            fasting = adapter.load_upload(zo.load_zero_data, zero_file)
+            fasting_scores = adapter.all_fasts_stats(fasting)
 
     with st.beta_expander("Statistics Terminology Review", expanded=False):
         st.write("")
@@ -249,13 +239,13 @@ if analyze_data_sb:
         view_rr = rr_column.checkbox("Coefficient of Determination")
 
         if view_pc:
-            pc_file = util.read_markdown_file("analysis/pearson_corr.md")
+            pc_file = assets.markdown("analysis/pearson_corr.md")
             st.markdown(pc_file, unsafe_allow_html=True)
         if view_ols:
-            ols_file = util.read_markdown_file("analysis/ols.md")
+            ols_file = assets.markdown("analysis/ols.md")
             st.markdown(ols_file, unsafe_allow_html=True)
         if view_rr:
-            rr_file = util.read_markdown_file("analysis/rsquared.md")
+            rr_file = assets.markdown("analysis/rsquared.md")
             st.markdown(rr_file, unsafe_allow_html=True)
     with st.beta_expander("Analyze Data", expanded=False):
         st.write("")
@@ -264,61 +254,127 @@ if analyze_data_sb:
             if view_dd:
                 st.markdown("#### Data Dictionary: Lifestyle and Metabolic Metrics")
                 st.write("")
-                st.table(data_dictionary)
+                st.table(assets.data_dictionary())
                 st.write("")
 
-            all_metrics = util.create_metrics_dataset(sleep_scores=sleep_scores,
-                                                      metabolic_scores=metabolic_scores,
-                                                      fasting_scores=fasting_scores, )
-            corr_matrix = util.corr_matrix(all_metrics, 'Date').round(2)
+            all_metrics = adapter.create_metrics_dataset(sleep_scores=sleep_scores,
+                                                         metabolic_scores=metabolic_scores,
+                                                         fasting_scores=fasting_scores, )
+            corr_matrix = adapter.clustered_corr_matrix(all_metrics, 'Date').round(2)
             corr_heatmap = plot.plotly_heatmap(corr_matrix)
             st.plotly_chart(corr_heatmap, use_container_width=True)
 
-            x_selection, y_selection, color_selection = util.variables_for_plot(all_metrics,
-                                                                                date_col='Date',
-                                                                                default_x='Sleep Score',
-                                                                                default_y='Metabolic Score',
-                                                                                default_c='Fast',
-                                                                                app_section='user')
+            top_x, top_y = adapter.top_pair_selection(adapter.top_correlated_pairs(all_metrics, 'Date'),
+                                                      app_section='user')
+            x_selection, y_selection, color_selection = adapter.variables_for_plot(all_metrics,
+                                                                                   date_col='Date',
+                                                                                   default_x=top_x or 'Sleep Score',
+                                                                                   default_y=top_y or 'Metabolic Score',
+                                                                                   default_c='Fast',
+                                                                                   app_section='user')
+            fits = adapter.all_pairs_ols(all_metrics, date_column='Date')
+            with st.beta_expander("View Linear Regression of All Metric Pairs"):
+                st.dataframe(fits[fits.x != fits.y].sort_values('r_squared', ascending=False))
             if x_selection != '<select>' and y_selection != '<select>':
                 scatter = plot.plotly_scatter(dataset=all_metrics,
                                               x_selection=x_selection,
                                               y_selection=y_selection,
                                               color_selection=color_selection,
-                                              hover=['Date'])
-                line = plot.plotly_line(all_metrics, x_selection, y_selection, 'Date')
+                                              hover=['Date'],
+                                              fit=reg.pair_fit(fits, x_selection, y_selection))
+                date_range = adapter.plot_date_range(all_metrics.Date, app_section='user')
+                line = plot.plotly_line(all_metrics, x_selection, y_selection, 'Date', date_range=date_range)
                 st.write("")
                 st.plotly_chart(scatter, use_container_width=True)
                 st.plotly_chart(line, use_container_width=True)
+                lagged = adapter.lagged_correlations(all_metrics, date_column='Date')
+                st.plotly_chart(plot.plotly_lag_heatmap(lagged, y_selection), use_container_width=True)
 
             # get_report = st.checkbox("Generate Pandas Profile Report", key = 'user')
             # if get_report:
-            #     pr = util.profile_report(all_metrics)
+            #     pr = adapter.profile_report(all_metrics)
             #     st_profile_report(pr)
         else:
             st.markdown("""
             Please Upload All Required Data in the **Upload Data** Section Above
             """)
 
-if more_info_sb:
+
+def more_info_page():
+    """
+    Additional Information page: the apps and devices of the data sources.
+    """
     st.write("")
     st.markdown("## Additional Information")
     st.write("")
 
-    more_info_file = util.read_markdown_file("more_info/odds_ends.md")
+    more_info_file = assets.markdown("more_info/odds_ends.md")
     st.markdown(more_info_file, unsafe_allow_html=True)
     with st.beta_expander("Levels Health", expanded=False):
-        levels_file = util.read_markdown_file("more_info/levels.md")
+        levels_file = assets.markdown("more_info/levels.md")
         st.markdown(levels_file, unsafe_allow_html=True)
-        levels = Image.open(util.SRC_PATH / 'content/more_info/levels.jpg')
+        levels = assets.image('more_info/levels.jpg')
         st.image(levels, use_column_width=True, )
     with st.beta_expander("Zero Fasting", expanded=False):
-        zero_file = util.read_markdown_file("more_info/zero.md")
+        zero_file = assets.markdown("more_info/zero.md")
         st.markdown(zero_file, unsafe_allow_html=True)
-        zero = Image.open(util.SRC_PATH / 'content/more_info/zero.png')
+        zero = assets.image('more_info/zero.png')
         st.image(zero, use_column_width=True, )
     with st.beta_expander("Whoop", expanded=False):
-        whoop_file = util.read_markdown_file("more_info/whoop.md")
+        whoop_file = assets.markdown("more_info/whoop.md")
         st.markdown(whoop_file, unsafe_allow_html=True)
-        whoop = Image.open(util.SRC_PATH / 'content/more_info/whoop.jpg')
+        whoop = assets.image('more_info/whoop.jpg')
         st.image(whoop, use_column_width=True, )
+
+
+st.set_page_config(page_title='Metabolic Health',
+                   page_icon='🔎',
+                   layout='centered',
+                   initial_sidebar_state='expanded')
+st.sidebar.subheader("Application Pages:")
+st.markdown("""
+# Metabolic Health Analysis 
+An application to cross analyze your metabolic health and lifestyle metrics.
+""")
+welcome_sb = st.sidebar.checkbox(
+    "Welcome", value=True)
+lifestyle_sb = st.sidebar.checkbox(
+    "Metabolism & Lifestyle", value=False)
+data_sb = st.sidebar.checkbox(
+    "Data", value=False)
+example_analysis_sb = st.sidebar.checkbox(
+    "Analysis", value=False)
+analyze_data_sb = st.sidebar.checkbox(
+    "Analyze Your Data", value=False
+)
+more_info_sb = st.sidebar.checkbox(
+    "Additional Information", value=False
+)
+
+st.sidebar.write("")
+st.sidebar.write("")
+st.sidebar.write("")
+
+with st.sidebar.beta_expander("Meet the Developer"):
+    me = assets.image('me.jpeg')
+    st.image(me, use_column_width=True,
+             )
+    meet_developer_file = assets.markdown("meet_developer.md")
+    st.markdown(meet_developer_file, unsafe_allow_html=True)
+
+# only the code of the selected pages runs on a rerun
+if welcome_sb:
+    welcome_page()
+if lifestyle_sb:
+    lifestyle_page()
+if data_sb:
+    data_page()
+if example_analysis_sb:
+    analysis_page()
+if analyze_data_sb:
+    analyze_your_data_page()
+if more_info_sb:
+    more_info_page()
+
+# counters of the persistent caches, after the pages so they include this rerun
+adapter.show_cache_stats()
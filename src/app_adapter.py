@@ -0,0 +1,255 @@
+"""
+Streamlit adapter of the compute modules (glucose, levels, whoop, zero, utilities).
+All Streamlit caching, error reporting, and widgets live here, so the compute modules stay importable
+(and fast to import) without Streamlit, i.e. in batch jobs.
+"""
+import pandas as pd
+import streamlit as st
+
+import correlation as corr
+import downsample as ds
+import fingerprint as fp
+import regression as reg
+import result_cache as rc
+import upload_cache as uc
+import utilities as util
+import whoop as wp
+import zero as zo
+
+# Streamlit hashes pandas arguments with the fingerprint attached at load time, instead of their content on every rerun
+FINGERPRINT_HASH_FUNCS = {pd.DataFrame: fp.fingerprint, pd.Series: fp.fingerprint}
+
+
+@st.cache(allow_output_mutation=True)
+def get_upload_cache() -> uc.UploadCache:
+    """
+    Create the persistent upload cache once per app process, so its counters survive reruns.
+    """
+    return uc.UploadCache()
+
+
+@st.cache(allow_output_mutation=True)
+def get_result_cache() -> rc.ResultCache:
+    """
+    Create the persistent result cache once per app process, so its counters survive reruns.
+    """
+    return rc.ResultCache()
+
+
+def cache_stats() -> dict:
+    """
+    Get the counters (hit ratio, bytes saved, ...) of the persistent caches of this app process.
+    """
+    return {'uploads': get_upload_cache().stats(), 'results': get_result_cache().stats()}
+
+
+def show_cache_stats():
+    """
+    Show the counters of the persistent caches of this app process in a sidebar expander: hits, misses, hit ratio,
+    and the megabytes served from the cache instead of recomputed (saved) and stored on disk.
+    """
+    stats = pd.DataFrame(cache_stats()).T
+    table = pd.DataFrame({'Hits': stats.hits.astype(int),
+                          'Misses': stats.misses.astype(int),
+                          'Hit Ratio (%)': (stats.hit_ratio * 100).round(1),
+                          'Saved (MB)': (stats.bytes_saved / 1024 ** 2).round(2),
+                          'Stored (MB)': (stats.bytes / 1024 ** 2).round(2)})
+    table.index = table.index.str.title()
+    with st.sidebar.beta_expander("Cache Statistics"):
+        st.table(table)
+
+
+def load_upload(loader, upload, *args):
+    """
+    Load an uploaded file through the persistent upload cache, reporting incorrectly formatted files in the app.
+    Args:
+        loader: Function used to parse the file, i.e. whoop.load_whoop_data().
+        upload: The uploaded file.
+        *args: Additional arguments passed to the loader.
+
+    Returns: The parsed upload.
+
+    """
+    try:
+        return get_upload_cache().load(loader, upload, *args)
+    except ValueError as error:
+        st.error(str(error))
+        raise
+
+
+@st.cache(suppress_st_warning=True, hash_funcs=FINGERPRINT_HASH_FUNCS)
+def sleep_metrics(whoop_summary: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cached whoop.sleep_metrics().
+    """
+    return wp.sleep_metrics(whoop_summary)
+
+
+@st.cache(suppress_st_warning=True, hash_funcs=FINGERPRINT_HASH_FUNCS)
+def all_fasts_stats(fasts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cached zero.all_fasts_stats().
+    """
+    return zo.all_fasts_stats(fasts)
+
+
+def create_metrics_dataset(sleep_scores: pd.DataFrame,
+                           metabolic_scores: pd.DataFrame,
+                           fasting_scores: pd.DataFrame) -> pd.DataFrame:
+    """
+    utilities.create_metrics_dataset(), cached on disk across sessions and app processes.
+    """
+    return get_result_cache().compute(util.create_metrics_dataset,
+                                      sleep_scores=sleep_scores,
+                                      metabolic_scores=metabolic_scores,
+                                      fasting_scores=fasting_scores)
+
+
+def create_raw_analysis_dataset(sleep: pd.DataFrame, glucose: pd.Series) -> pd.DataFrame:
+    """
+    utilities.create_raw_analysis_dataset(), cached on disk across sessions and app processes.
+    """
+    return get_result_cache().compute(util.create_raw_analysis_dataset, sleep=sleep, glucose=glucose)
+
+
+@st.cache(suppress_st_warning=True, hash_funcs=FINGERPRINT_HASH_FUNCS)
+def corr_matrix(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
+    """
+    Cached utilities.corr_matrix().
+    """
+    return util.corr_matrix(parameters, date_column=date_column)
+
+
+@st.cache(suppress_st_warning=True, hash_funcs=FINGERPRINT_HASH_FUNCS)
+def corr_matrix_long(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
+    """
+    Cached utilities.corr_matrix_long().
+    """
+    return util.corr_matrix_long(parameters, date_column=date_column)
+
+
+@st.cache(suppress_st_warning=True, hash_funcs=FINGERPRINT_HASH_FUNCS)
+def clustered_corr_matrix(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
+    """
+    Cached utilities.clustered_corr_matrix().
+    """
+    return util.clustered_corr_matrix(parameters, date_column=date_column)
+
+
+@st.cache(suppress_st_warning=True, hash_funcs=FINGERPRINT_HASH_FUNCS)
+def top_correlated_pairs(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
+    """
+    Cached utilities.top_correlated_pairs().
+    """
+    return util.top_correlated_pairs(parameters, date_column=date_column)
+
+
+@st.cache(suppress_st_warning=True, hash_funcs=FINGERPRINT_HASH_FUNCS)
+def lagged_correlations(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
+    """
+    Cached correlation.lagged_correlations().
+    """
+    return corr.lagged_correlations(parameters, date_column=date_column)
+
+
+@st.cache(suppress_st_warning=True, hash_funcs=FINGERPRINT_HASH_FUNCS)
+def all_pairs_ols(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
+    """
+    Cached regression.all_pairs_ols().
+    """
+    return reg.all_pairs_ols(parameters, date_column=date_column)
+
+
+@st.cache(hash_funcs=FINGERPRINT_HASH_FUNCS)
+def profile_report(summary_data: pd.DataFrame):
+    """
+    Cached utilities.profile_report().
+    """
+    return util.profile_report(summary_data)
+
+
+def top_pair_selection(top_pairs: pd.DataFrame, app_section: str = 'user') -> (str, str):
+    """
+    Let the user jump to one of the most strongly correlated parameter pairs.
+    Args:
+        top_pairs: The strongest pairs, output from utilities.top_correlated_pairs().
+        app_section: section of app where function is called from. String used to set streamlit widget keys.
+
+    Returns: The selected pair's x and y parameters, (None, None) if no pair is selected.
+
+    """
+    labels = [f"{pair.x} vs. {pair.y} (r={pair.correlation:.2f})" for pair in top_pairs.itertuples()]
+    label = st.selectbox(label='Jump to a Strongly Correlated Pair', options=['<select>'] + labels,
+                         key=app_section + '_top_pair')
+    if label == '<select>':
+        return None, None
+    pair = top_pairs.iloc[labels.index(label)]
+    return pair.x, pair.y
+
+
+def variables_for_plot(dataset: pd.DataFrame,
+                       date_col: str = 'Date',
+                       default_x: str = None,
+                       default_y: str = None,
+                       default_c: str = None,
+                       app_section: str = 'user') -> (str, str, str):
+    """
+    Get user selected parameters for plot x-axis, y-axis, and optionally, the marker color gradient.
+    Args:
+        app_section: section of app where function is called from. String used to set streamlit widget keys.
+        dataset: pandas dataFrame used for plotting. Expect a 'Date' column and a unique statistics for all other
+        columns.
+        default_x: default parameter desired for x axis of scatter plot.
+        default_y: default parameter desired for y axis of scatter plot.
+        default_c: default parameter desired for color scheme of scatter plot.
+        date_col: Name of date column to be removed from selection options.
+
+    Returns: parameter selections for the x-axis, y-axis, and the marker color gradient as strings.
+
+    """
+
+    all_cols = sorted(dataset)
+    all_cols.insert(0, '<select>')
+    all_cols_no_date = all_cols.copy()
+    all_cols_no_date.remove(date_col)
+
+    x_default, y_default, c_default = 0, 0, 0
+
+    if default_x:
+        x_default = all_cols_no_date.index(default_x)
+    if default_y:
+        y_default = all_cols_no_date.index(default_y)
+    if default_c:
+        c_default = all_cols_no_date.index(default_c)
+
+    x_key = app_section + '_x'
+    y_key = app_section + '_y'
+    c_key = app_section + '_c'
+    x_axis_col, y_axis_col, color_col = st.beta_columns(3)
+    x = x_axis_col.selectbox(label='X-Axis', options=all_cols_no_date, index=x_default, key=x_key)
+    y = y_axis_col.selectbox(label='Y-Axis', options=all_cols_no_date, index=y_default, key=y_key)
+    color = color_col.selectbox(label='OPTIONAL: Color Gradient',
+                                options=all_cols_no_date,
+                                index=c_default,
+                                key=c_key)
+
+    return x, y, color
+
+
+def plot_date_range(dates: pd.Series, max_points: int = ds.MAX_POINTS, app_section: str = 'user'):
+    """
+    Get a user selected date range to zoom the trend plot into, so the range is downsampled at a finer resolution.
+    Only offered when the series have more points than are plotted.
+    Args:
+        dates: Dates of the plotted series.
+        max_points: Number of points plotted per series, see downsample.downsample().
+        app_section: section of app where function is called from. String used to set streamlit widget keys.
+
+    Returns: The selected (start, end) datetimes, None when the full series is plotted without downsampling.
+
+    """
+    if len(dates) <= max_points:
+        return None
+    first, last = pd.Timestamp(dates.min()).to_pydatetime(), pd.Timestamp(dates.max()).to_pydatetime()
+    return st.slider('Zoom Trend', min_value=first, max_value=last, value=(first, last),
+                     key=app_section + '_zoom')
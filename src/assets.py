@@ -0,0 +1,93 @@
+"""
+Static assets of the app (markdown, images, the sample dataset and its analysis, and the data dictionary), loaded once
+per app process.
+Streamlit reruns app.py on every interaction, these caches are plain functools.lru_cache so a rerun only pays for a
+dictionary lookup. Cached values are shared by every session and must not be modified.
+"""
+import functools
+
+import pandas as pd
+
+import sample_artifact as sa
+import utilities as util
+
+# Most markdown files and images held in memory, about twice the number of assets the app uses
+ASSET_CACHE_SIZE = 64
+
+DATA_DICTIONARY_PATH = util.SRC_PATH / 'content' / 'metrics_data_dictionary.csv'
+
+
+@functools.lru_cache(maxsize=ASSET_CACHE_SIZE)
+def markdown(file: str) -> str:
+    """
+    Cached utilities.read_markdown_file().
+    """
+    return util.read_markdown_file(file)
+
+
+@functools.lru_cache(maxsize=ASSET_CACHE_SIZE)
+def image(file: str):
+    """
+    Open and decode an image once.
+    Args:
+        file: name of file, which should be located in src/content/
+
+    Returns: The decoded PIL Image.
+
+    """
+    from PIL import Image  # only the app renders images
+
+    decoded = Image.open(util.SRC_PATH / 'content' / file)
+    decoded.load()
+    return decoded
+
+
+@functools.lru_cache(maxsize=1)
+def sample_artifact():
+    """
+    Cached sample_artifact.load_or_build(), None when the artifact could not be built.
+    """
+    return sa.load_or_build()
+
+
+@functools.lru_cache(maxsize=1)
+def sample_dataset() -> pd.DataFrame:
+    """
+    Get the sample dataset of the Data and Analysis pages from the artifact, or parse sample.csv without it.
+    """
+    artifact = sample_artifact()
+    return artifact['sample'] if artifact else sa.parse_sample()
+
+
+@functools.lru_cache(maxsize=1)
+def sample_analysis() -> dict:
+    """
+    Get the analysis of the sample dataset from the artifact, or run it (without prebuilt figures) if the artifact
+    could not be built.
+    See sample_artifact.analyze().
+    """
+    return sample_artifact() or sa.analyze(sample_dataset(), figures=False)
+
+
+@functools.lru_cache(maxsize=ASSET_CACHE_SIZE)
+def sample_figure(*key):
+    """
+    Decode a prebuilt figure of the sample analysis once.
+    Args:
+        *key: Key of the figure, see sample_artifact.default_figures().
+
+    Returns: The Plotly figure, None if it was not prebuilt.
+
+    """
+    figure = sample_analysis()['figures'].get(key)
+    if figure is None:
+        return None
+    return sa.decode_figure(figure)
+
+
+@functools.lru_cache(maxsize=1)
+def data_dictionary() -> pd.DataFrame:
+    """
+    Parse the data dictionary of the lifestyle and metabolic metrics.
+    """
+    return pd.read_csv(DATA_DICTIONARY_PATH, index_col='Label')
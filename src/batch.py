@@ -0,0 +1,226 @@
+"""
+Headless batch computation of the metrics dataset for a cohort of users.
+
+Expects one directory per user inside the input directory, each containing the user's exports:
+
+    input_dir/
+        <user>/whoop.csv
+        <user>/levels.csv
+        <user>/zero.csv
+        <user>/glucose.csv (optional, FreeStyle LibreLink)
+        <user>/timezone.txt (timezone of the glucose export, e.g. Europe/Berlin, defaults to --timezone)
+
+Writes one metrics table per user (output_dir/users/<user>.parquet), the combined metrics of all users
+(output_dir/metrics.parquet, with a 'User' column), and the per-user timings (output_dir/timings.csv).
+Users with a glucose export also get a sleep and glucose statistics table (output_dir/glucose/<user>.parquet),
+computed incrementally from a per-user aggregate store (output_dir/glucose/stores/<user>/) kept across runs, so a
+re-run on a longer export only aggregates the new or changed days.
+LibreLink timestamps are local device time, so a user with a glucose export and no timezone (neither timezone.txt nor
+--timezone) fails instead of assuming one: shifted days would be written to the aggregate store.
+
+Usage: python batch.py input_dir output_dir [--workers N] [--timezone TZ]
+"""
+import argparse
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import aggregate_store as ag
+import glucose as gc
+import levels as lv
+import utilities as util
+import whoop as wp
+import zero as zo
+
+EXPORT_FILES = {'whoop': 'whoop.csv', 'levels': 'levels.csv', 'zero': 'zero.csv'}
+GLUCOSE_FILE = 'glucose.csv'
+TIMEZONE_FILE = 'timezone.txt'
+
+
+def user_metrics(user_dir: pathlib.Path, export_files: dict = None) -> pd.DataFrame:
+    """
+    Run the metrics pipeline of the app (Whoop sleep metrics, Levels metabolic scores, Zero fasting stats)
+    on one user's exports.
+    Args:
+        user_dir: Directory containing the user's Whoop, Levels, and Zero exports.
+        export_files: File names of the exports, defaults to batch.EXPORT_FILES.
+
+    Returns: The metrics dataset, output from utilities.create_metrics_dataset().
+
+    """
+    export_files = export_files or EXPORT_FILES
+    fitness_scores = wp.load_whoop_data(user_dir / export_files['whoop'])
+    sleep_scores = wp.sleep_metrics(fitness_scores)
+    metabolic_scores = lv.load_levels_data(user_dir / export_files['levels'])
+    fasting = zo.load_zero_data(user_dir / export_files['zero'])
+    fasting_scores = zo.all_fasts_stats(fasting)
+    metrics = util.create_metrics_dataset(sleep_scores=sleep_scores,
+                                          metabolic_scores=metabolic_scores,
+                                          fasting_scores=fasting_scores)
+    return metrics
+
+
+def user_timezone(user_dir: pathlib.Path, timezone: str = None) -> str:
+    """
+    Get the timezone of a user's glucose export, from the user's timezone file or else the given default.
+    Args:
+        user_dir: Directory containing the user's exports.
+        timezone: Default timezone, used if the user has no timezone file.
+
+    Returns: The timezone name.
+
+    """
+    timezone_file = user_dir / TIMEZONE_FILE
+    if timezone_file.exists():
+        timezone = timezone_file.read_text().strip()
+    if not timezone:
+        raise ValueError(f"No timezone for the glucose export of {user_dir.name}, write it to {timezone_file} "
+                         f"or pass --timezone")
+    return timezone
+
+
+def user_glucose_analysis(user_dir: pathlib.Path,
+                          store_dir: pathlib.Path,
+                          export_files: dict = None,
+                          glucose_file: str = GLUCOSE_FILE,
+                          timezone: str = None) -> pd.DataFrame:
+    """
+    Compute the sleep and glucose statistics of one user's Whoop and glucose exports incrementally, see
+    utilities.create_incremental_analysis_dataset().
+    Args:
+        user_dir: Directory containing the user's exports.
+        store_dir: Directory of the user's aggregate store, created on the first run.
+        export_files: File names of the exports, defaults to batch.EXPORT_FILES.
+        glucose_file: File name of the glucose export.
+        timezone: Timezone of the glucose export if the user has no timezone file, see batch.user_timezone().
+
+    Returns: The sleep and glucose statistics dataset, None if the user has no glucose export.
+
+    """
+    export_files = export_files or EXPORT_FILES
+    if not (user_dir / glucose_file).exists():
+        return None
+    timezone = user_timezone(user_dir, timezone)
+    sleep = wp.load_whoop_data(user_dir / export_files['whoop'])
+    glucose = gc.load_glucose_data(user_dir / glucose_file, timezone=timezone)
+    store = ag.AggregateStore(path=store_dir)
+    return util.create_incremental_analysis_dataset(sleep=sleep, glucose=glucose, store=store)
+
+
+def process_user(user_dir: pathlib.Path,
+                 output_dir: pathlib.Path,
+                 export_files: dict = None,
+                 glucose_dir: pathlib.Path = None,
+                 glucose_file: str = GLUCOSE_FILE,
+                 timezone: str = None) -> dict:
+    """
+    Compute and write the metrics table of one user, and the sleep and glucose statistics if the user has a glucose
+    export. Errors are recorded instead of raised, so a single malformed export does not stop the batch.
+    Args:
+        user_dir: Directory containing the user's exports. The directory name is the user id.
+        output_dir: Directory to write the user's metrics table to.
+        export_files: File names of the exports, defaults to batch.EXPORT_FILES.
+        glucose_dir: Directory to write the user's glucose statistics and aggregate store to, None to skip them.
+        glucose_file: File name of the glucose export.
+        timezone: Timezone of the glucose export if the user has no timezone file.
+
+    Returns: Dictionary of the user id, status, number of days, number of days with glucose statistics,
+             and processing time in seconds.
+
+    """
+    start = time.perf_counter()
+    glucose_days = 0
+    try:
+        metrics = user_metrics(user_dir, export_files=export_files)
+        metrics.to_parquet(output_dir / f"{user_dir.name}.parquet", index=False)
+        if glucose_dir is not None:
+            analysis = user_glucose_analysis(user_dir,
+                                             store_dir=glucose_dir / 'stores' / user_dir.name,
+                                             export_files=export_files,
+                                             glucose_file=glucose_file,
+                                             timezone=timezone)
+            if analysis is not None:
+                analysis.to_parquet(glucose_dir / f"{user_dir.name}.parquet", index=False)
+                glucose_days = len(analysis)
+        status, days = 'ok', len(metrics)
+    except Exception as error:  # record any failure of the user's pipeline
+        status, days = f"error: {error!r}", 0
+    return {'User': user_dir.name, 'Status': status, 'Days': days, 'Glucose Days': glucose_days,
+            'Seconds': time.perf_counter() - start}
+
+
+def run_batch(input_dir: pathlib.Path,
+              output_dir: pathlib.Path,
+              workers: int = None,
+              export_files: dict = None,
+              glucose_file: str = GLUCOSE_FILE,
+              timezone: str = None) -> pd.DataFrame:
+    """
+    Compute the metrics tables of every user in input_dir in a process pool, then combine them.
+    Users are independent, so throughput scales with the number of worker processes.
+    Args:
+        input_dir: Directory with one sub directory of exports per user.
+        output_dir: Directory to write the metrics tables and timings to.
+        workers: Number of worker processes, defaults to the number of CPUs.
+        export_files: File names of the exports, defaults to batch.EXPORT_FILES.
+        glucose_file: File name of the optional glucose export.
+        timezone: Timezone of the glucose exports of users without a timezone file.
+
+    Returns: The per-user timings as a pandas DataFrame.
+
+    """
+    user_dirs = sorted(path for path in pathlib.Path(input_dir).iterdir() if path.is_dir())
+    output_dir = pathlib.Path(output_dir)
+    users_dir = output_dir / 'users'
+    users_dir.mkdir(parents=True, exist_ok=True)
+    glucose_dir = output_dir / 'glucose'
+    glucose_dir.mkdir(exist_ok=True)
+
+    timings = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(process_user, user_dir, users_dir, export_files, glucose_dir, glucose_file, timezone)
+                   for user_dir in user_dirs]
+        for future in futures:
+            timing = future.result()
+            print(f"{timing['User']}: {timing['Status']}, {timing['Days']} days, {timing['Seconds']:.2f}s")
+            timings.append(timing)
+    timings = pd.DataFrame(timings, columns=['User', 'Status', 'Days', 'Glucose Days', 'Seconds'])
+    timings.to_csv(output_dir / 'timings.csv', index=False)
+
+    completed = timings.loc[timings.Status == 'ok', 'User']
+    if len(completed):
+        combined = pd.concat([pd.read_parquet(users_dir / f"{user}.parquet").assign(User=user) for user in completed],
+                             ignore_index=True)
+        combined.to_parquet(output_dir / 'metrics.parquet', index=False)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute the metrics dataset for a cohort of users.')
+    parser.add_argument('input_dir', type=pathlib.Path, help='directory with one sub directory of exports per user')
+    parser.add_argument('output_dir', type=pathlib.Path, help='directory to write the metrics tables to')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: CPUs)')
+    for source, file_name in EXPORT_FILES.items():
+        parser.add_argument(f'--{source}', default=file_name, help=f'file name of the {source} export')
+    parser.add_argument('--glucose', default=GLUCOSE_FILE, help='file name of the optional glucose export')
+    parser.add_argument('--timezone', default=None,
+                        help=f'timezone of the glucose exports of users without a {TIMEZONE_FILE} file')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    timings = run_batch(args.input_dir,
+                        args.output_dir,
+                        workers=args.workers,
+                        export_files={source: getattr(args, source) for source in EXPORT_FILES},
+                        glucose_file=args.glucose,
+                        timezone=args.timezone)
+    failed = (timings.Status != 'ok').sum()
+    print(f"{len(timings)} users ({failed} failed) in {time.perf_counter() - start:.1f}s, "
+          f"{timings.Seconds.sum():.1f}s of user processing")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import fingerprint as fp
+
+# Number of correlation engines kept by correlation.correlation_engine(), least recently used are dropped first
+ENGINE_CACHE_SIZE = 16
+
+# Largest lag in days of correlation.lagged_correlations(), in either direction
+MAX_LAG = 14
+
+# Number of pairs in the index of the strongest correlations, see CorrelationEngine.top_pairs()
+TOP_PAIRS = 20
+
+_engines = OrderedDict()
+
+
+def numeric_columns(dataset: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get the numeric (and boolean) columns of a DataFrame, the columns pandas DataFrame.corr() correlates.
+    """
+    return dataset.select_dtypes(include=['number', 'bool'])
+
+
+class CorrelationEngine:
+    """
+    Pearson correlation matrix kept as sufficient statistics of every column pair: the number of rows where both
+    columns are present (n), the sums and sums of squares of each column over those rows, and the sum of products.
+    Appending rows updates the statistics in O(rows * k^2), adding a column in O(rows * k), and the matrix is
+    recalculated from the statistics in O(k^2). Missing values are excluded pairwise, as in pandas DataFrame.corr().
+    Every column is centered on the mean of its first values before accumulating, to limit floating point
+    cancellation. The clustered column order and the index of the strongest pairs are kept until the data changes.
+    """
+
+    def __init__(self, dataset: pd.DataFrame = None):
+        self.columns = []
+        self.index = pd.Index([])
+        self.values = np.empty((0, 0))
+        self.shift = np.empty(0)
+        self.n = np.empty((0, 0))
+        self.sum = np.empty((0, 0))
+        self.sum_sq = np.empty((0, 0))
+        self.sum_products = np.empty((0, 0))
+        self._summaries = {}
+        if dataset is not None:
+            self.update(dataset)
+
+    def update(self, dataset: pd.DataFrame):
+        """
+        Bring the engine up to date with a dataset which extends the data seen so far: columns not seen yet are added,
+        then rows (index values) not seen yet are appended. Rows seen before are expected to be unchanged.
+        Args:
+            dataset: pandas DataFrame of measurements, non numeric columns are ignored.
+        """
+        dataset = numeric_columns(dataset)
+        new_columns = [column for column in dataset.columns if column not in self.columns]
+        for column in new_columns:
+            self.add_column(column, dataset[column].reindex(self.index))
+        new_rows = ~dataset.index.isin(self.index)
+        if new_rows.any():
+            self.append(dataset.loc[new_rows, self.columns])
+
+    def copy(self):
+        """
+        Copy the engine, so it can be extended without changing this one.
+        """
+        engine = CorrelationEngine()
+        engine.columns = list(self.columns)
+        engine.index = self.index
+        for name in ['values', 'shift', 'n', 'sum', 'sum_sq', 'sum_products']:
+            setattr(engine, name, getattr(self, name).copy())
+        return engine
+
+    def extends(self, dataset: pd.DataFrame) -> bool:
+        """
+        Check whether a dataset extends the data of the engine by appending rows: same numeric columns, the engine's
+        rows are the first rows of the dataset, and their values are unchanged.
+        Args:
+            dataset: pandas DataFrame of measurements.
+        """
+        dataset = numeric_columns(dataset)
+        rows = len(self.index)
+        if list(dataset.columns) != self.columns or not 0 < rows < len(dataset):
+            return False
+        if not dataset.index[:rows].equals(self.index):
+            return False
+        return np.array_equal(dataset.iloc[:rows].to_numpy(dtype=float), self.values, equal_nan=True)
+
+    def append(self, rows: pd.DataFrame):
+        """
+        Append rows of all current columns.
+        Args:
+            rows: pandas DataFrame with (at least) the engine's columns.
+        """
+        values = rows[self.columns].to_numpy(dtype=float)
+        if len(self.index) == 0:
+            self.shift = self._centers(values)
+        shifted, present = self._mask(values)
+        self.n += present.T @ present
+        self.sum += shifted.T @ present
+        self.sum_sq += (shifted ** 2).T @ present
+        self.sum_products += shifted.T @ shifted
+        self.values = np.vstack([self.values, values])
+        self.index = self.index.append(rows.index)
+        self._summaries.clear()
+
+    def add_column(self, name, values: pd.Series):
+        """
+        Add a column, given for all rows seen so far.
+        Args:
+            name: Column name.
+            values: Column values, aligned with the engine's rows.
+        """
+        column = np.asarray(values, dtype=float).reshape(-1, 1)
+        shift = self._centers(column)
+        shifted_column, present_column = self._mask(column, shift)
+        shifted, present = self._mask(self.values)
+
+        n = present.T @ present_column
+        self.n = self._grow(self.n, n, n.T, present_column.T @ present_column)
+        self.sum = self._grow(self.sum, shifted.T @ present_column, shifted_column.T @ present,
+                              shifted_column.T @ present_column)
+        self.sum_sq = self._grow(self.sum_sq, (shifted ** 2).T @ present_column, (shifted_column ** 2).T @ present,
+                                 (shifted_column ** 2).T @ present_column)
+        products = shifted.T @ shifted_column
+        self.sum_products = self._grow(self.sum_products, products, products.T, shifted_column.T @ shifted_column)
+
+        self.values = np.hstack([self.values.reshape(len(self.index), len(self.columns)), column])
+        self.shift = np.append(self.shift, shift)
+        self.columns.append(name)
+        self._summaries.clear()
+
+    def matrix(self, columns: list = None) -> pd.DataFrame:
+        """
+        Calculate the correlation matrix from the sufficient statistics.
+        Args:
+            columns: Optional subset and order of the columns, defaults to the order the columns were added in.
+
+        Returns: The correlations as a square pandas DataFrame, same as pandas DataFrame.corr().
+
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = self.sum_products - self.sum * self.sum.T / self.n
+            variance = self.sum_sq - self.sum ** 2 / self.n  # variance of column i over rows shared with column j
+            correlation = covariance / np.sqrt(variance * variance.T)
+        correlation[(self.n < 2) | (variance <= 0) | (variance.T <= 0)] = np.nan
+        correlation = np.clip(correlation, -1, 1)
+        diagonal = np.diag_indices_from(correlation)
+        correlation[diagonal] = np.where(np.isnan(correlation[diagonal]), np.nan, 1.0)
+        matrix = pd.DataFrame(correlation, index=self.columns, columns=self.columns)
+        if columns is not None:
+            matrix = matrix.loc[columns, columns]
+        return matrix
+
+    def cluster_order(self, columns: list = None) -> list:
+        """
+        Order the columns by average linkage hierarchical clustering on the correlation distance 1 - |r|, with the
+        optimal leaf ordering, so strongly (positively or negatively) correlated columns are next to each other.
+        Pairs without a correlation are at the largest distance. Kept until the data changes.
+        Args:
+            columns: Optional subset of the columns, defaults to all columns.
+
+        Returns: The column names in clustered order.
+
+        """
+        columns = list(self.columns if columns is None else columns)
+        key = ('order', tuple(columns))
+        if key not in self._summaries:
+            if len(columns) < 3:
+                self._summaries[key] = columns
+            else:
+                from scipy.cluster import hierarchy
+                from scipy.spatial.distance import squareform
+                distance = 1 - np.abs(self.matrix(columns=columns).to_numpy())
+                distance = np.nan_to_num(distance, nan=1.0)
+                np.fill_diagonal(distance, 0)
+                condensed = squareform((distance + distance.T) / 2, checks=False)
+                linkage = hierarchy.optimal_leaf_ordering(hierarchy.linkage(condensed, method='average'), condensed)
+                self._summaries[key] = [columns[leaf] for leaf in hierarchy.leaves_list(linkage)]
+        return list(self._summaries[key])
+
+    def top_pairs(self, k: int = TOP_PAIRS, columns: list = None) -> pd.DataFrame:
+        """
+        Index the k column pairs with the strongest correlation |r|, each unordered pair once. Kept until the data
+        changes.
+        Args:
+            k: Number of pairs.
+            columns: Optional subset of the columns, defaults to all columns.
+
+        Returns: A pandas DataFrame with columns 'x', 'y', 'correlation', and 'n' (rows shared by the pair),
+                 sorted by |correlation|, strongest first.
+
+        """
+        columns = list(self.columns if columns is None else columns)
+        key = ('pairs', k, tuple(columns))
+        if key not in self._summaries:
+            positions = pd.Index(self.columns).get_indexer(columns)
+            correlation = self.matrix(columns=columns).to_numpy()
+            rows, cols = np.triu_indices(len(columns), k=1)
+            strength = np.nan_to_num(np.abs(correlation[rows, cols]), nan=-1.0)
+            strongest = np.argpartition(-strength, k - 1)[:k] if k < len(strength) else np.arange(len(strength))
+            strongest = strongest[np.argsort(-strength[strongest], kind='stable')]
+            strongest = strongest[strength[strongest] >= 0]  # pairs without a correlation are not indexed
+            rows, cols = rows[strongest], cols[strongest]
+            self._summaries[key] = pd.DataFrame({'x': [columns[row] for row in rows],
+                                                 'y': [columns[col] for col in cols],
+                                                 'correlation': correlation[rows, cols],
+                                                 'n': self.n[positions[rows], positions[cols]].astype(np.int64)})
+        return self._summaries[key].copy()
+
+    def _mask(self, values: np.ndarray, shift: np.ndarray = None) -> (np.ndarray, np.ndarray):
+        present = ~np.isnan(values)
+        shifted = np.where(present, values - (self.shift if shift is None else shift), 0.0)
+        return shifted, present.astype(float)
+
+    @staticmethod
+    def _centers(values: np.ndarray) -> np.ndarray:
+        present = ~np.isnan(values)
+        count = present.sum(axis=0)
+        total = np.where(present, values, 0.0).sum(axis=0)
+        return np.divide(total, count, out=np.zeros(values.shape[1]), where=count > 0)
+
+    @staticmethod
+    def _grow(matrix: np.ndarray, column: np.ndarray, row: np.ndarray, corner: np.ndarray) -> np.ndarray:
+        return np.block([[matrix, column], [row, corner]])
+
+
+def correlation_engine(parameters: pd.DataFrame) -> CorrelationEngine:
+    """
+    Get the correlation engine of a dataset, cached by the dataset's fingerprint (see fingerprint.fingerprint()),
+    so repeated requests for the same data never recompute the sufficient statistics. A dataset extending a cached
+    one with appended rows (see CorrelationEngine.extends()) gets a copy of its engine, updated with the new rows in
+    O(new rows * k^2).
+    Args:
+        parameters: A pandas DataFrame of measurements.
+
+    Returns: The dataset's correlation engine.
+
+    """
+    fingerprint = fp.fingerprint(parameters)
+    if fingerprint in _engines:
+        _engines.move_to_end(fingerprint)
+    else:
+        # a previous version of the dataset (i.e. before new days were appended) is updated with the new rows only
+        previous = [engine for engine in _engines.values() if engine.extends(parameters)]
+        if previous:
+            engine = max(previous, key=lambda candidate: len(candidate.index)).copy()
+            engine.update(parameters)
+        else:
+            engine = CorrelationEngine(parameters)
+        _engines[fingerprint] = engine
+        if len(_engines) > ENGINE_CACHE_SIZE:
+            _engines.popitem(last=False)
+    return _engines[fingerprint]
+
+
+def cross_correlate(first: np.ndarray, second: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    Cross-correlate every column of first with every column of second at lags -max_lag to +max_lag, with FFTs
+    zero-padded against wrap around: result[lag, i, j] = sum over t of first[t - lag, i] * second[t, j].
+    Only the requested lags are transformed back, as one matrix product with their Fourier basis.
+    Args:
+        first: numpy array of shape (rows, columns of first).
+        second: numpy array of shape (rows, columns of second).
+        max_lag: Largest lag (in rows) in either direction.
+
+    Returns: numpy array of shape (2 * max_lag + 1, columns of first, columns of second),
+             ordered from lag -max_lag to +max_lag.
+
+    """
+    size = 1 << int(np.ceil(np.log2(max(len(first) + max_lag, 1))))
+    spectrum = np.conj(np.fft.rfft(first, n=size, axis=0))[:, :, np.newaxis] * \
+        np.fft.rfft(second, n=size, axis=0)[:, np.newaxis, :]
+    frequencies = np.arange(spectrum.shape[0])
+    weights = np.where((frequencies == 0) | (frequencies == size // 2), 1.0, 2.0) / size  # one-sided spectrum
+    angles = 2 * np.pi * np.outer(np.arange(-max_lag, max_lag + 1), frequencies) / size
+    spectrum = spectrum.reshape(len(frequencies), -1)
+    correlation = (np.cos(angles) * weights) @ spectrum.real - (np.sin(angles) * weights) @ spectrum.imag
+    return correlation.reshape(2 * max_lag + 1, first.shape[1], second.shape[1])
+
+
+def lagged_correlations(parameters: pd.DataFrame, date_column: str = None, max_lag: int = MAX_LAG) -> pd.DataFrame:
+    """
+    Calculate the Pearson correlation of every parameter pair, with x leading y by -max_lag to +max_lag days.
+    At lag L, x of day t - L is correlated with y of day t (i.e. at lag 3, does x three days ago predict y today).
+    The rows are placed on a daily calendar, so missing days are excluded pairwise instead of shifting the lag.
+    All the pairwise sums (counts, sums, sums of squares, and products) of every pair and lag are cross-correlations
+    of the centered and masked columns, calculated at once with FFTs instead of shifting and correlating per lag.
+    Args:
+        parameters: A pandas DataFrame of daily measurements, non numeric columns are ignored.
+        date_column: Date column, if it exists, in the parameters DataFrame. Otherwise the index holds the dates.
+        max_lag: Largest lag in days, in either direction.
+
+    Returns: The correlations in long format, columns 'x', 'y', 'lag', 'correlation', and 'n'.
+
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(parameters[date_column] if date_column else parameters.index))
+    dataset = numeric_columns(parameters.drop(columns=[date_column]) if date_column else parameters)
+    days = (dates - dates.min()).days
+    values = np.full((days.max() + 1 if len(dates) else 0, dataset.shape[1]), np.nan)
+    values[np.asarray(days)] = dataset.to_numpy(dtype=float)
+
+    present = ~np.isnan(values)
+    centered = np.where(present, values - CorrelationEngine._centers(values), 0.0)
+    present = present.astype(float)
+    k = dataset.shape[1]
+    sums = cross_correlate(np.hstack([present, centered, centered ** 2]), np.hstack([present, centered]), max_lag)
+    n = np.rint(sums[:, :k, :k])
+    sum_x, sum_y = sums[:, k:2 * k, :k], sums[:, :k, k:]
+    # the squares of y are only correlated with x leading, the sum of pair (i, j) at lag is at (j, i) and -lag
+    sum_sq_x, sum_sq_y = sums[:, 2 * k:, :k], np.swapaxes(sums[::-1, 2 * k:, :k], 1, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = sums[:, k:2 * k, k:] - sum_x * sum_y / n
+        variance_x = sum_sq_x - sum_x ** 2 / n
+        variance_y = sum_sq_y - sum_y ** 2 / n
+        correlation = covariance / np.sqrt(variance_x * variance_y)
+    tolerance = 1e-9 * np.maximum(np.nansum(centered ** 2, axis=0), 1)
+    correlation[(n < 2) | (variance_x <= tolerance[:, np.newaxis]) | (variance_y <= tolerance[np.newaxis, :])] = np.nan
+
+    lags, rows, cols = np.meshgrid(np.arange(-max_lag, max_lag + 1), np.arange(k), np.arange(k), indexing='ij')
+    correlations = pd.DataFrame({'x': dataset.columns[rows.ravel()],
+                                 'y': dataset.columns[cols.ravel()],
+                                 'lag': lags.ravel(),
+                                 'correlation': np.clip(correlation, -1, 1).ravel(),
+                                 'n': n.ravel().astype(np.int64)})
+    return correlations
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+import glucose_grid as gg
+
+# Default number of points per plotted trace, about two per pixel of a full width chart
+MAX_POINTS = 2000
+DOWNSAMPLE_METHODS = ('minmax', 'lttb')
+
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Select the smallest and largest value of every bucket of consecutive values (equal counts per bucket),
+    so every peak and nadir of the trace is kept.
+    Args:
+        y: numpy array of values without missing values.
+        buckets: Number of buckets, at most two values are kept per bucket.
+
+    Returns: Sorted positions of the selected values.
+
+    """
+    if len(y) <= 2 * buckets:
+        return np.arange(len(y))
+    edges = np.linspace(0, len(y), buckets + 1).astype(np.int64)[:-1]
+    codes = np.repeat(np.arange(buckets), np.diff(np.append(edges, len(y))))
+    positions = np.arange(len(y))
+    # first position of the bucket minimum and of the bucket maximum
+    lowest = np.minimum.reduceat(y, edges)
+    highest = np.maximum.reduceat(y, edges)
+    first_low = np.full(buckets, len(y))
+    first_high = np.full(buckets, len(y))
+    np.minimum.at(first_low, codes[y == lowest[codes]], positions[y == lowest[codes]])
+    np.minimum.at(first_high, codes[y == highest[codes]], positions[y == highest[codes]])
+    return np.unique(np.concatenate([first_low, first_high]))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select points with Largest-Triangle-Three-Buckets (Steinarsson, 2013): the first and last point, and from every
+    bucket in between the point forming the largest triangle with the point selected from the previous bucket and
+    the mean of the next bucket. Each bucket is one vectorized step.
+    Args:
+        x: numpy array of x values (numeric, sorted) without missing values.
+        y: numpy array of y values without missing values.
+        threshold: Number of points to select.
+
+    Returns: Sorted positions of the selected points.
+
+    """
+    if threshold >= len(x) or threshold < 3:
+        return np.arange(len(x))
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = (np.floor(np.arange(threshold - 1) * (len(x) - 2) / (threshold - 2)) + 1).astype(np.int64)
+    edges[-1] = len(x) - 1
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, len(x) - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else len(x)
+        mean_x, mean_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs((x[previous] - mean_x) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (mean_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(series: pd.Series,
+               max_points: int = MAX_POINTS,
+               start=None,
+               end=None,
+               method: str = 'minmax') -> pd.Series:
+    """
+    Reduce a time series to about max_points points for plotting, over an optional [start, end] range, so zooming into
+    a range gives a finer resolution of it for the same number of points. Missing values are skipped, the first
+    missing value of each gap is kept so the plotted line breaks across gaps.
+    Args:
+        series: pandas Series with a sorted DatetimeIndex (i.e. glucose data or a daily metric).
+        max_points: Target number of points.
+        start: Optional first datetime of the range (inclusive).
+        end: Optional last datetime of the range (inclusive).
+        method: 'minmax' (smallest and largest value of each bucket, keeps every peak) or 'lttb'
+                (largest triangle three buckets, keeps the visual shape).
+
+    Returns: The selected points of the series, a subset of its rows.
+
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method {method}, expected one of {DOWNSAMPLE_METHODS}")
+    timestamps = series.index.values
+    left = 0 if start is None else np.searchsorted(timestamps, pd.Timestamp(start).to_datetime64(), side='left')
+    right = len(series) if end is None else np.searchsorted(timestamps, pd.Timestamp(end).to_datetime64(),
+                                                            side='right')
+    series = series.iloc[left:right]
+    if len(series) <= max_points:
+        return series
+
+    values = series.to_numpy(dtype=np.float64)
+    measured = np.flatnonzero(~np.isnan(values))
+    if method == 'minmax':
+        selected = minmax_indices(values[measured], max(max_points // 2, 1))
+    else:
+        x = series.index.values.astype('datetime64[ns]').view(np.int64)
+        selected = lttb_indices(x[measured], values[measured], max_points)
+    gap_start, _ = gg.nan_runs(values)
+    return series.iloc[np.union1d(measured[selected], gap_start)]
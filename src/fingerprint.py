@@ -0,0 +1,125 @@
+"""
+Content fingerprints of pandas DataFrames and Series, attached once to a frame's attrs and reused by every cache.
+A frame is hashed in full when it is loaded (or first seen). Frames derived by a fingerprint.derived() function are
+stamped with a hash of the function and the fingerprints of its inputs, so the data is never hashed again.
+pandas copies attrs to the results of many operations (i.e. df.iloc[1:]). Every fingerprint is therefore stored
+with the identity and shape of the frame it was attached to, and is only trusted on that frame. Frames are expected
+not to be modified in place once fingerprinted.
+"""
+import functools
+import hashlib
+
+import pandas as pd
+
+ATTRS_KEY = 'fingerprint'
+
+
+def content_fingerprint(data) -> str:
+    """
+    Hash the full content of a DataFrame (index, columns, and values) or Series (index, name, and values).
+    Args:
+        data: pandas DataFrame or Series.
+
+    Returns: The hexadecimal SHA-256 digest.
+
+    """
+    digest = hashlib.sha256(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr(list(data.columns)).encode())
+    else:
+        digest.update(f"{data.name!r}:{data.dtype}".encode())
+    return digest.hexdigest()
+
+
+def owner(data) -> tuple:
+    """
+    Identify the frame a fingerprint is attached to, to tell it apart from frames the attrs were copied to.
+    Args:
+        data: pandas DataFrame or Series.
+
+    Returns: Tuple of the object's id and shape.
+
+    """
+    return id(data), data.shape
+
+
+def attach(data, digest: str = None):
+    """
+    Attach a fingerprint to a DataFrame or Series (in place), i.e. when it is loaded.
+    Args:
+        data: pandas DataFrame or Series.
+        digest: Fingerprint to attach, defaults to the hash of the full content (see fingerprint.content_fingerprint()).
+
+    Returns: The same data.
+
+    """
+    data.attrs[ATTRS_KEY] = {'digest': digest or content_fingerprint(data), 'owner': owner(data)}
+    return data
+
+
+def fingerprint(value) -> str:
+    """
+    Get the fingerprint of a value, i.e. as a cache key or a Streamlit hash function.
+    DataFrames and Series use the fingerprint in their attrs if it was attached to them (not copied from another
+    frame by pandas), otherwise their content is hashed and the fingerprint attached. Anything else is hashed from its repr.
+    Args:
+        value: A pandas DataFrame, Series, or a plain argument (i.e. a string or a number).
+
+    Returns: The hexadecimal SHA-256 digest.
+
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        attached = value.attrs.get(ATTRS_KEY)
+        if not attached or attached.get('owner') != owner(value):
+            attach(value)
+        return value.attrs[ATTRS_KEY]['digest']
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+def call_fingerprint(function, *args, **kwargs) -> str:
+    """
+    Fingerprint a function call from the function's name and the fingerprints of its arguments.
+    Args:
+        function: The function.
+        *args: Positional arguments of the call.
+        **kwargs: Keyword arguments of the call.
+
+    Returns: The hexadecimal SHA-256 digest.
+
+    """
+    digest = hashlib.sha256(f"{function.__module__}.{function.__qualname__}".encode())
+    for arg in args:
+        digest.update(fingerprint(arg).encode())
+    for name in sorted(kwargs):
+        digest.update(f"{name}={fingerprint(kwargs[name])}".encode())
+    return digest.hexdigest()
+
+
+def without_columns(data: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """
+    Drop columns from a DataFrame (i.e. a date column before correlating), fingerprinting the result from the
+    fingerprint of the data instead of hashing it.
+    Args:
+        data: pandas DataFrame.
+        columns: Columns to drop.
+
+    Returns: The DataFrame without the columns.
+
+    """
+    digest = hashlib.sha256(f"{fingerprint(data)}:without:{list(columns)!r}".encode()).hexdigest()
+    return attach(data.drop(columns=columns), digest=digest)
+
+
+def derived(function):
+    """
+    Decorate a function deriving a DataFrame (or Series) from its arguments, so its result is stamped with the
+    fingerprint of the call (see fingerprint.call_fingerprint()) instead of being hashed when it is used.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        digest = call_fingerprint(function, *args, **kwargs)
+        result = function(*args, **kwargs)
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            attach(result, digest=digest)
+        return result
+    return wrapper
@@ -1,22 +1,28 @@
 import pandas as pd
-import streamlit as st
 import numpy as np
 import pathlib
 from os.path import abspath, dirname
 import datetime
 
+import fingerprint as fp
+
 SRC_PATH = pathlib.Path(dirname(abspath(__file__)))
 
 
-# @st.cache(suppress_st_warning=True)
-def load_glucose_data(glucose_file, timezone: str) -> pd.DataFrame:
+# Rows read per chunk by the streaming glucose loader
+GLUCOSE_CHUNKSIZE = 100000
+
+
+def load_glucose_data(glucose_file, timezone: str, chunksize: int = None) -> pd.DataFrame:
     """
     Load a FreeStyle LibreLink CSV file and return a pandas DataFrame version of the file
     Args:
         timezone: Expected timezone of the glucose data
         glucose_file: file to be converted to a DataFrame
+        chunksize: Optional number of rows to read at a time. If set, the file is streamed with
+                   glucose.stream_glucose_data() to bound peak memory on large (multi-year) exports.
 
-    Returns: pandas DataFrame of glucose data
+    Returns: pandas Series of float32 glucose data, fingerprinted (see fingerprint.attach())
     """
 
     # TODO: split into 'read' and 'load' functions
@@ -26,87 +32,241 @@ def load_glucose_data(glucose_file, timezone: str) -> pd.DataFrame:
                      'Historic Glucose mg/dL']
 
     try:
+        if chunksize:
+            return stream_glucose_data(glucose_file, timezone=timezone, chunksize=chunksize)
         raw_glucose = pd.read_csv(glucose_file,
                                   header=1,
                                   usecols=expected_cols,
                                   parse_dates=['Device Timestamp'],
                                   index_col='Device Timestamp'
                                   )
-    except ValueError:
-        st.error(f"""
+    except ValueError as error:
+        raise ValueError(f"""
         Incorrect format of glucose data CSV. Please make sure you uploaded the correct file.
         \ntThe following columns must be present in the second row:
         \n {expected_cols}
-        """)
-        raise
+        """) from error
 
     glucose_utc_time = raw_glucose.tz_localize(timezone, ambiguous='NaT').tz_convert(None)
     clean_glucose = glucose_utc_time.loc[(glucose_utc_time['Record Type'] == 0)
                                          & (glucose_utc_time.index.notnull()),
-                                         'Historic Glucose mg/dL'].rename('Glucose (mg/dL)')
+                                         'Historic Glucose mg/dL'].astype(np.float32).rename('Glucose (mg/dL)')
     clean_glucose.index.rename('Timestamp', inplace=True)
-    return clean_glucose
+    return fp.attach(clean_glucose)
 
 
-# Other option for aggregating statistics: aggregate over pandas.groupBy() groups.
-# This would require creating temporary labels for every glucose sample.
-# For example, label glucose samples by date, if sample timestamp is within date's sleep period.
-# Then groupBy(label) and aggregate.
-# For now, keep the single series and dict iterating method for flexibility.
-# In the future, pass in statistics to be calculated (out of box or custom).
-def glucose_stats(glucose: pd.Series, time_label: str = None) -> pd.Series:
+def stream_glucose_data(glucose_file, timezone: str, chunksize: int = GLUCOSE_CHUNKSIZE) -> pd.Series:
     """
-    Aggregate statistics over a series of glucose data and return the statistics as a series.
-    Optionally, add an additional time label associated with the series (i.e. 'Day', 'Previous Day', 'Sleep').
+    Stream a FreeStyle LibreLink CSV file chunk by chunk and return the historic glucose records.
+    Every chunk is reduced to its historic glucose records (Record Type 0) and converted to UTC before the next chunk
+    is read. Only the compact float32 glucose values and int64 timestamps of each chunk are kept and concatenated.
     Args:
-        time_label: Optional label.
-        glucose: pandas Series to aggregate over.
+        glucose_file: file to be converted.
+        timezone: Expected timezone of the glucose data.
+        chunksize: Number of rows to read at a time.
 
-    Returns: Aggregated statistics as a pandas Series.
+    Returns: pandas Series of float32 glucose data, indexed on the UTC timestamp.
 
     """
+    timestamps = []
+    values = []
+    chunks = pd.read_csv(glucose_file,
+                         header=1,
+                         usecols=['Device Timestamp', 'Record Type', 'Historic Glucose mg/dL'],
+                         chunksize=chunksize)
+    for chunk in chunks:
+        historic = chunk[chunk['Record Type'] == 0]
+        local_time = pd.DatetimeIndex(pd.to_datetime(historic['Device Timestamp']))
+        utc_time = local_time.tz_localize(timezone, ambiguous='NaT').tz_convert(None)
+        valid = np.asarray(utc_time.notnull())
+        timestamps.append(utc_time.values[valid].astype('datetime64[ns]').view(np.int64))
+        values.append(historic['Historic Glucose mg/dL'].to_numpy(dtype=np.float32)[valid])
+
+    index = pd.DatetimeIndex(np.concatenate(timestamps).view('datetime64[ns]'), name='Timestamp')
+    clean_glucose = pd.Series(np.concatenate(values), index=index, name='Glucose (mg/dL)')
+    return fp.attach(clean_glucose)
+
+
+# Statistics calculated by default for every group of glucose data.
+# Keys are the statistic labels (before the optional time label), values are any function accepted by pandas agg().
+GLUCOSE_STATISTICS = {'Glucose Mean': 'mean',
+                      'Glucose Volatility': 'std',
+                      'Glucose Minimum': 'min',
+                      'Glucose Maximum': 'max'}
+
+
+def statistic_labels(time_label: str = None, statistics: dict = None) -> dict:
+    """
+    Create the column labels of the glucose statistics, optionally suffixed by a time label (i.e. 'Glucose Mean (Day)').
+    Args:
+        time_label: Optional label.
+        statistics: Statistics to be calculated, defaults to glucose.GLUCOSE_STATISTICS.
+
+    Returns: Dictionary of labelled statistics. Keys are the column labels, values are the aggregation functions.
 
+    """
+    if statistics is None:
+        statistics = GLUCOSE_STATISTICS
     if time_label:
         time_unit = f" ({time_label})"
     else:
         time_unit = ""
-    stats = glucose.agg(gc_mean='mean', gc_std='std', gc_min='min', gc_max='max')
-    stats.rename(index={"gc_mean": "Glucose Mean" + time_unit,
-                        "gc_std": "Glucose Volatility" + time_unit,
-                        "gc_min": "Glucose Minimum" + time_unit,
-                        "gc_max": "Glucose Maximum" + time_unit},
-                 inplace=True)
+    return {label + time_unit: function for label, function in statistics.items()}
+
+
+def glucose_stats(glucose: pd.Series, time_label: str = None, statistics: dict = None) -> pd.Series:
+    """
+    Aggregate statistics over a series of glucose data and return the statistics as a series.
+    Optionally, add an additional time label associated with the series (i.e. 'Day', 'Previous Day', 'Sleep').
+    Args:
+        time_label: Optional label.
+        glucose: pandas Series to aggregate over.
+        statistics: Optional statistics to be calculated, see glucose.GLUCOSE_STATISTICS.
+
+    Returns: Aggregated statistics as a pandas Series.
+
+    """
+    labelled_statistics = statistic_labels(time_label=time_label, statistics=statistics)
+    stats = pd.Series({label: glucose.agg(function) for label, function in labelled_statistics.items()},
+                      name=glucose.name, dtype=float)
     return stats
 
 
-# @st.cache(suppress_st_warning=True)
-def grouped_glucose_stats(groups: dict, time_label: str = None) -> pd.Series:
+def labelled_glucose_stats(glucose: pd.Series,
+                           labels,
+                           time_label: str = None,
+                           statistics: dict = None) -> pd.DataFrame:
+    """
+    Aggregate statistics over groups of glucose data in a single groupby call.
+    Every glucose sample is labelled with its group (i.e. date, or date of sleep period) and all groups are
+    aggregated at once.
+    Args:
+        glucose: pandas Series of glucose data.
+        labels: Group label of every glucose sample. Any grouper accepted by pandas groupby(), aligned with glucose.
+        time_label: Optional label.
+        statistics: Optional statistics to be calculated, see glucose.GLUCOSE_STATISTICS.
+
+    Returns: A pandas DataFrame of aggregated statistics.
+             dataFrame index values are the unique labels.
+             dataFrame columns are the labelled statistics.
+
+    """
+    labelled_statistics = statistic_labels(time_label=time_label, statistics=statistics)
+    all_stats_grouped = glucose.groupby(labels).agg(**labelled_statistics).astype(float)
+    all_stats_grouped.index.name = None
+    return all_stats_grouped
+
+
+def window_glucose_stats(glucose: pd.Series,
+                         left: np.ndarray,
+                         right: np.ndarray,
+                         keys,
+                         time_label: str = None,
+                         statistics: dict = None) -> pd.DataFrame:
     """
-    Aggregate statistics over multiple series of glucose data. Each series will be passed to glucose_stats(), and
-    combined into a single dataFrame. Optionally, add an additional time label associated with the series
+    Aggregate statistics over windows of glucose data given as offsets (see glucose.window_offsets()).
+    Windows may overlap, samples are gathered once per window and aggregated in a single groupby call.
+    Args:
+        glucose: pandas Series of glucose data, the offsets refer to.
+        left: Start offset (inclusive) of each window.
+        right: End offset (exclusive) of each window.
+        keys: Index values of the returned DataFrame, one per window.
+        time_label: Optional label.
+        statistics: Optional statistics to be calculated, see glucose.GLUCOSE_STATISTICS.
+
+    Returns: A pandas DataFrame of aggregated statistics, one row per window (NaN for windows without glucose data).
+
+    """
+    positions, codes = segment_positions(left=left, right=right)
+    window_glucose = pd.Series(glucose.values[positions], name=glucose.name)
+    all_stats_grouped = labelled_glucose_stats(glucose=window_glucose,
+                                               labels=codes,
+                                               time_label=time_label,
+                                               statistics=statistics)
+    all_stats_grouped = all_stats_grouped.reindex(np.arange(len(keys)))
+    all_stats_grouped.index = pd.Index(keys)
+    return all_stats_grouped
+
+
+def grouped_glucose_stats(groups: dict, time_label: str = None, statistics: dict = None) -> pd.DataFrame:
+    """
+    Aggregate statistics over multiple series of glucose data, combined into a single dataFrame.
+    Optionally, add an additional time label associated with the series
     (i.e. 'Day', 'Previous Day', 'Sleep'). Example use would be a collection of series, one for every day,
     or sleep period.
+    The series are concatenated, labelled by group, and aggregated in one pass (glucose.window_glucose_stats()).
     Args:
         time_label: Optional label.
         groups: Dictionary of groups, keys can be anything, but values should be a subseries of glucose data associated
                 with the key. Keys will then be the index values of the returned dataFrame. Most common practice is to
                 store a date as the key.
+        statistics: Optional statistics to be calculated, see glucose.GLUCOSE_STATISTICS.
 
     Returns: A pandas dataFrame of aggregated statistics for a group of glucose subseries.
              dataFrame index values from groups dictionary keys.
              dataFrame columns will be statistics calculated in glucose_stats().
 
     """
-    all_stats = {}
-    for key, glucose in groups.items():
-        stats = glucose_stats(glucose=glucose, time_label=time_label)
-        all_stats[key] = stats
-    all_stats_grouped = pd.DataFrame.from_dict(all_stats, orient='index')
-
+    if not groups:
+        return pd.DataFrame(columns=list(statistic_labels(time_label=time_label, statistics=statistics)), dtype=float)
+    lengths = np.array([len(glucose) for glucose in groups.values()])
+    right = np.cumsum(lengths)
+    all_glucose = pd.Series(np.concatenate([glucose.values for glucose in groups.values()]))
+    all_stats_grouped = window_glucose_stats(glucose=all_glucose,
+                                             left=right - lengths,
+                                             right=right,
+                                             keys=list(groups),
+                                             time_label=time_label,
+                                             statistics=statistics)
     return all_stats_grouped
 
 
-# @st.cache(suppress_st_warning=True)
+def day_glucose_stats(glucose: pd.Series, time_label: str = 'Day', statistics: dict = None) -> pd.DataFrame:
+    """
+    Aggregate statistics over the glucose data of every day in a single groupby call.
+    Equivalent to grouped_glucose_stats(create_glucose_day_groups(glucose)), without building the day groups.
+    Args:
+        glucose: pandas Series of glucose data.
+        time_label: Optional label.
+        statistics: Optional statistics to be calculated, see glucose.GLUCOSE_STATISTICS.
+
+    Returns: A pandas DataFrame of aggregated statistics indexed on a DatetimeIndex of days.
+
+    """
+    day_stats = labelled_glucose_stats(glucose=glucose,
+                                       labels=glucose.index.floor('D').rename(None),
+                                       time_label=time_label,
+                                       statistics=statistics)
+    return day_stats
+
+
+def sleep_glucose_stats(glucose: pd.Series,
+                        sleep: pd.DataFrame,
+                        time_label: str = 'Sleep',
+                        statistics: dict = None) -> pd.DataFrame:
+    """
+    Aggregate statistics over the glucose data of every sleep period in a single pass.
+    Equivalent to grouped_glucose_stats(create_glucose_sleep_groups(glucose, sleep)), without building the sleep groups.
+    Args:
+        glucose: pandas Series of glucose data.
+        sleep: pandas DataFrame containing sleep data. Required date index, and 'Sleep Start' and 'Sleep End' columns.
+        time_label: Optional label.
+        statistics: Optional statistics to be calculated, see glucose.GLUCOSE_STATISTICS.
+
+    Returns: A pandas DataFrame of aggregated statistics indexed on sleep date.
+
+    """
+    glucose = glucose.sort_index(kind='mergesort')
+    offsets = sleep_period_offsets(glucose=glucose, sleep=sleep)
+    sleep_stats = window_glucose_stats(glucose=glucose,
+                                       left=offsets.left.values,
+                                       right=offsets.right.values,
+                                       keys=offsets.index,
+                                       time_label=time_label,
+                                       statistics=statistics)
+    return sleep_stats
+
+
 def create_glucose_day_groups(glucose: pd.Series) -> dict:
     """
     Create a dictionary of glucose series, unique to each day in the parent glucose series.
@@ -119,13 +279,12 @@ def create_glucose_day_groups(glucose: pd.Series) -> dict:
     Returns: The dictionary of subsamples.
 
     """
-    day_groups = dict(list(glucose.groupby(glucose.index.date)))
+    day_groups = dict(list(glucose.groupby(glucose.index.floor('D'))))
     return day_groups
 
 
 # Other option is take a day_stats dataFrame and shift index by 1 day,
 # but, would have to adjust column names for correct time label (day) -> (previous day)
-# @st.cache(suppress_st_warning=True)
 def create_glucose_previous_day_groups(day_groups: dict) -> dict:
     """
     Create a dictionary of glucose subseries, unique to each day in the parent glucose series.
@@ -149,12 +308,113 @@ def create_glucose_previous_day_groups(day_groups: dict) -> dict:
     return previous_day_groups
 
 
-# @st.cache(suppress_st_warning=True)
+def window_offsets(glucose: pd.Series, start, end) -> (np.ndarray, np.ndarray):
+    """
+    Locate the glucose samples falling inside each [start, end] window with a sorted interval join.
+    Both window bounds are inclusive. The glucose index must be monotonic increasing (sorted by time).
+    Args:
+        glucose: pandas Series of glucose data with a sorted DatetimeIndex.
+        start: Array-like of window start datetimes.
+        end: Array-like of window end datetimes, aligned with start.
+
+    Returns: Two integer arrays (left, right). Samples of window i are glucose.iloc[left[i]:right[i]].
+             Windows with a missing start or end are returned as empty (left == right).
+
+    """
+    start = pd.DatetimeIndex(start)
+    end = pd.DatetimeIndex(end)
+    left = glucose.index.searchsorted(start, side='left')
+    right = glucose.index.searchsorted(end, side='right')
+    missing = start.isna() | end.isna()
+    right = np.where(missing | (right < left), left, right)
+    return left, right
+
+
+def segment_positions(left: np.ndarray, right: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Expand window offsets into the flat positions of every sample in every window, without a Python loop.
+    Args:
+        left: Start offset (inclusive) of each window.
+        right: End offset (exclusive) of each window.
+
+    Returns: Two integer arrays (positions, codes). positions are the sample positions of all windows concatenated,
+             codes are the window number (0..n-1) of each position.
+
+    """
+    left = np.asarray(left, dtype=np.int64)
+    lengths = np.asarray(right, dtype=np.int64) - left
+    codes = np.repeat(np.arange(len(left)), lengths)
+    window_starts = np.cumsum(lengths) - lengths
+    positions = np.arange(lengths.sum()) - np.repeat(window_starts - left, lengths)
+    return positions, codes
+
+
+def day_offsets(glucose: pd.Series) -> pd.DataFrame:
+    """
+    Calculate the glucose offsets of every day with glucose data in a single pass, from the day boundaries of the
+    sorted index.
+    Args:
+        glucose: pandas Series of glucose data with a sorted DatetimeIndex.
+
+    Returns: A pandas DataFrame indexed on a DatetimeIndex of days with 'left' and 'right' offset columns.
+
+    """
+    days = glucose.index.floor('D').rename(None)
+    boundaries = np.flatnonzero(days[1:] != days[:-1]) + 1
+    left = np.concatenate([[0], boundaries]) if len(days) else np.array([], dtype=np.int64)
+    right = np.concatenate([boundaries, [len(days)]]) if len(days) else np.array([], dtype=np.int64)
+    return pd.DataFrame({'left': left, 'right': right}, index=days[left])
+
+
+def sleep_period_offsets(glucose: pd.Series, sleep: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate the glucose offsets of every sleep period in a single pass, see glucose.window_offsets().
+    Only days where both sleep and glucose data are available, and the sleep period contains at least one glucose
+    sample, are kept.
+    Args:
+        glucose: pandas Series of glucose data with a sorted DatetimeIndex.
+        sleep: pandas DataFrame containing sleep data. Required date index, and 'Sleep Start' and 'Sleep End' columns.
+
+    Returns: A pandas DataFrame indexed on sleep date with 'left' and 'right' offset columns.
+
+    """
+    glucose_days = glucose.index.floor('D').unique()
+    glucose_sleep_days = sleep[sleep.index.isin(glucose_days)]
+    left, right = window_offsets(glucose=glucose,
+                                 start=glucose_sleep_days['Sleep Start'],
+                                 end=glucose_sleep_days['Sleep End'])
+    offsets = pd.DataFrame({'left': left, 'right': right}, index=glucose_sleep_days.index)
+    return offsets[offsets.right > offsets.left]
+
+
+def label_sleep_periods(glucose: pd.Series, sleep: pd.DataFrame) -> pd.Series:
+    """
+    Label every glucose sample with the date of the sleep period it falls within.
+    Samples outside of all sleep periods are dropped. If sleep periods overlap, a sample is labelled with the latest
+    sleep date containing it.
+    Args:
+        glucose: pandas Series of glucose data.
+        sleep: pandas DataFrame containing sleep data. Required date index, and 'Sleep Start' and 'Sleep End' columns.
+
+    Returns: A pandas Series of sleep dates, indexed on the glucose sample timestamps.
+
+    """
+    glucose = glucose.sort_index(kind='mergesort')
+    offsets = sleep_period_offsets(glucose=glucose, sleep=sleep)
+    positions, codes = segment_positions(left=offsets.left.values, right=offsets.right.values)
+    labels = np.full(len(glucose), -1)
+    labels[positions] = codes  # later sleep periods win on overlap
+    labelled = labels >= 0
+    return pd.Series(offsets.index[labels[labelled]], index=glucose.index[labelled], name='Sleep Date')
+
+
 def create_glucose_sleep_groups(glucose: pd.Series, sleep: pd.DataFrame) -> dict:
     """
     Create a dictionary of glucose series, unique to each day where both sleep and glucose data are available.
     Keys will be unique dates.
     Values will be the subseries with timestamp dates matching the key.
+    Sleep periods are located with a sorted interval join (glucose.sleep_period_offsets()) instead of
+    masking the full glucose series once per day.
     Args:
         sleep: pandas DataFrame containing sleep data. Required date index, and 'Sleep Start' and 'Sleep End' columns.
         glucose: pandas Series of glucose data.
@@ -164,43 +424,135 @@ def create_glucose_sleep_groups(glucose: pd.Series, sleep: pd.DataFrame) -> dict
              Values are the subseries of glucose measurements during the sleep period for key date.
 
     """
-    glucose_days = np.unique(glucose.index.date)
-    sleep_days = sleep.index
-    glucose_sleep_days = sleep_days[sleep_days.isin(glucose_days)]
+    if glucose.index.is_monotonic_increasing:
+        order = None
+        sorted_glucose = glucose
+    else:
+        order = np.argsort(glucose.index.values, kind='mergesort')
+        sorted_glucose = glucose.iloc[order]
+    offsets = sleep_period_offsets(glucose=sorted_glucose, sleep=sleep)
 
     groups = {}
-    for day in glucose_sleep_days:
-        period = (glucose.index >= sleep.loc[day]['Sleep Start']) \
-                 & (glucose.index <= sleep.loc[day]['Sleep End'])
-        sleeping_glucose = glucose[period]
-        if sleeping_glucose.empty:  # handle edge case: dates match, but no glucose data in sleep time period
-            continue
-        groups[day] = sleeping_glucose
+    for day, left, right in zip(offsets.index, offsets.left, offsets.right):
+        if order is None:
+            groups[day] = glucose.iloc[left:right]
+        else:  # keep the original sample order of unsorted uploads
+            groups[day] = glucose.iloc[np.sort(order[left:right])]
 
     return groups
 
 
-# def set_duration_start_end(start: pd.Series, duration_minutes: int) -> dict:
-#     duration_delta = pd.timedelta(duration_minutes, 'minutes')
-#     end = start.copy + duration_delta
-#     all_start_end = # MERGE START AND END TOGETHER
-#     return all_start_end
+def set_duration_start_end(start: pd.Series, duration_minutes: int) -> pd.DataFrame:
+    """
+    Create windows of a fixed duration from their start datetimes, i.e. the 2 hours following every meal.
+    Args:
+        start: pandas Series of window start datetimes.
+        duration_minutes: Duration of every window in minutes.
+
+    Returns: A pandas DataFrame with the start and end datetimes as columns ('start_dt', 'end_dt'), indexed like start.
+
+    """
+    start = pd.to_datetime(start)
+    all_start_end = pd.DataFrame({'start_dt': start, 'end_dt': start + pd.Timedelta(minutes=duration_minutes)},
+                                 index=start.index)
+    return all_start_end
+
+
+def period_offsets(glucose: pd.Series,
+                   all_start_end: pd.DataFrame,
+                   start_column: str = 'start_dt',
+                   end_column: str = 'end_dt') -> pd.DataFrame:
+    """
+    Calculate the glucose offsets of every [start, end] window of a DataFrame of intervals, see
+    glucose.window_offsets(). Windows can be anything with a start and an end (fasts, meals, workouts), and may
+    overlap.
+    Args:
+        glucose: pandas Series of glucose data with a sorted DatetimeIndex.
+        all_start_end: pandas DataFrame of windows, i.e. the output of zero.fasts_start_end().
+        start_column: Column of the window start datetimes.
+        end_column: Column of the window end datetimes.
+
+    Returns: A pandas DataFrame indexed like all_start_end with 'left' and 'right' offset columns.
+             Windows without glucose data are kept as empty windows (left == right).
+
+    """
+    left, right = window_offsets(glucose=glucose, start=all_start_end[start_column], end=all_start_end[end_column])
+    return pd.DataFrame({'left': left, 'right': right}, index=all_start_end.index)
+
+
+def period_glucose_stats(glucose: pd.Series,
+                         all_start_end: pd.DataFrame,
+                         start_column: str = 'start_dt',
+                         end_column: str = 'end_dt',
+                         time_label: str = None,
+                         statistics: dict = None) -> pd.DataFrame:
+    """
+    Aggregate statistics over the glucose data of every window of a DataFrame of intervals in a single pass:
+    the windows are located with one sorted interval join over the glucose index (glucose.period_offsets()),
+    then aggregated at once (glucose.window_glucose_stats()).
+    Args:
+        glucose: pandas Series of glucose data.
+        all_start_end: pandas DataFrame of windows, i.e. the output of zero.fasts_start_end().
+        start_column: Column of the window start datetimes.
+        end_column: Column of the window end datetimes.
+        time_label: Optional label.
+        statistics: Optional statistics to be calculated, see glucose.GLUCOSE_STATISTICS.
+
+    Returns: A pandas DataFrame of aggregated statistics indexed like all_start_end
+             (NaN for windows without glucose data).
+
+    """
+    if not glucose.index.is_monotonic_increasing:
+        glucose = glucose.sort_index(kind='mergesort')
+    offsets = period_offsets(glucose, all_start_end, start_column=start_column, end_column=end_column)
+    period_stats = window_glucose_stats(glucose=glucose,
+                                        left=offsets.left.values,
+                                        right=offsets.right.values,
+                                        keys=offsets.index,
+                                        time_label=time_label,
+                                        statistics=statistics)
+    return period_stats
 
 
 def sub_period_glucose(glucose: pd.Series, start: datetime, end: datetime) -> pd.Series:
-    period = (glucose.index >= start) & (glucose.index <= end)
-    sub_glucose = glucose[period]
-    if sub_glucose.empty:  # handle edge case: no glucose data in period
+    """
+    Get the glucose data of a single [start, end] period.
+    Args:
+        glucose: pandas Series of glucose data with a sorted DatetimeIndex.
+        start: Period start datetime.
+        end: Period end datetime.
+
+    Returns: The subseries of glucose data during the period, None if there is no glucose data in the period.
+
+    """
+    left, right = window_offsets(glucose=glucose, start=[start], end=[end])
+    if left[0] == right[0]:  # handle edge case: no glucose data in period
         return None
-    else:
-        return sub_glucose
+    return glucose.iloc[left[0]:right[0]]
+
+
+def period_group_glucose(glucose: pd.Series,
+                         all_start_end: pd.DataFrame,
+                         start_column: str = 'start_dt',
+                         end_column: str = 'end_dt') -> dict:
+    """
+    Create a dictionary of glucose series, one for every window of a DataFrame of intervals with glucose data.
+    Windows are located with one sorted interval join (glucose.period_offsets()) and may overlap.
+    Args:
+        glucose: pandas Series of glucose data.
+        all_start_end: pandas DataFrame of windows, i.e. the output of zero.fasts_start_end().
+        start_column: Column of the window start datetimes.
+        end_column: Column of the window end datetimes.
 
+    Returns: Dictionary of glucose subseries.
+             Keys are the index values of all_start_end.
+             Values are the subseries of glucose measurements during the window.
 
-def period_group_glucose(glucose: pd.Series, all_start_end: pd.DataFrame):
-    all_period_glucose = {}
-    for period in all_start_end:
-        period_glucose = sub_period_glucose(glucose=glucose, start=period.start, end=period.end)
-        if period_glucose:  # NEED TO CHECK IF NOT NONE
-            key = period.index
-            all_period_glucose[key] = period_glucose
+    """
+    if not glucose.index.is_monotonic_increasing:
+        glucose = glucose.sort_index(kind='mergesort')
+    offsets = period_offsets(glucose, all_start_end, start_column=start_column, end_column=end_column)
+    offsets = offsets[offsets.right > offsets.left]
+    all_period_glucose = {key: glucose.iloc[left:right]
+                          for key, left, right in zip(offsets.index, offsets.left, offsets.right)}
     return all_period_glucose
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+import glucose as gc
+
+# Default spacing of the grid, LibreLink historic glucose is recorded every 15 minutes
+GRID_STEP = '15min'
+# Default longest gap (in grid slots) filled by linear interpolation, longer gaps are left missing
+INTERPOLATION_LIMIT = 2
+
+
+def nan_runs(values: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Locate the runs of consecutive missing (NaN) values.
+    Args:
+        values: numpy array of values.
+
+    Returns: Two integer arrays (start, end). Run i covers values[start[i]:end[i]].
+
+    """
+    edges = np.diff(np.concatenate([[0], np.isnan(values).astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+class GlucoseGrid:
+    """
+    Glucose data normalized onto a fixed UTC time grid: a flat float32 array of values, the epoch (in nanoseconds) of
+    the first slot, and the step between slots. Missing slots (gaps) are NaN.
+    Locating a window is arithmetic on its bounds instead of a search of the timestamps, and the values of a window
+    are a zero-copy slice of the array.
+    """
+
+    def __init__(self, values: np.ndarray, start: int, step: int, interpolated: int = 0):
+        self.values = values
+        self.start = start
+        self.step = step
+        self.interpolated = interpolated
+
+    @classmethod
+    def from_series(cls, glucose: pd.Series, step=GRID_STEP, interpolation_limit: int = INTERPOLATION_LIMIT):
+        """
+        Normalize glucose data onto a grid. Every sample is assigned to its nearest slot, samples sharing a slot are
+        averaged. Gaps of at most interpolation_limit slots, between two measured slots, are linearly interpolated.
+        Args:
+            glucose: pandas Series of glucose data with a (UTC) DatetimeIndex, in any order.
+            step: Spacing of the grid, i.e. '5min' or '15min'. The grid is aligned to multiples of the step.
+            interpolation_limit: Longest gap (in slots) to interpolate, 0 to leave every gap missing.
+
+        Returns: The glucose grid.
+
+        """
+        step = pd.Timedelta(step).value
+        glucose = glucose.dropna()
+        if glucose.empty:
+            return cls(np.empty(0, dtype=np.float32), start=0, step=step)
+        timestamps = glucose.index.values.astype('datetime64[ns]').view(np.int64)
+        start = timestamps.min() // step * step
+        slots = np.rint((timestamps - start) / step).astype(np.int64)
+        sums = np.bincount(slots, weights=glucose.to_numpy(dtype=np.float64))
+        counts = np.bincount(slots)
+        with np.errstate(invalid='ignore'):
+            values = (sums / counts).astype(np.float32)
+
+        interpolated = 0
+        if interpolation_limit:
+            gap_start, gap_end = nan_runs(values)
+            short = (gap_end - gap_start) <= interpolation_limit  # gaps are always between two measured slots
+            positions, _ = gc.segment_positions(left=gap_start[short], right=gap_end[short])
+            measured = np.flatnonzero(counts)
+            values[positions] = np.interp(positions, measured, values[measured])
+            interpolated = len(positions)
+        return cls(values, start=int(start), step=step, interpolated=interpolated)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """
+        Timestamps of the grid slots.
+        """
+        timestamps = self.start + self.step * np.arange(len(self.values), dtype=np.int64)
+        return pd.DatetimeIndex(timestamps.view('datetime64[ns]'), name='Timestamp')
+
+    def to_series(self) -> pd.Series:
+        """
+        Get the grid as a pandas Series of glucose data (NaN for gaps), i.e. to use with glucose.window_glucose_stats()
+        on offsets from GlucoseGrid.offsets().
+        """
+        return pd.Series(self.values, index=self.index, name='Glucose (mg/dL)')
+
+    def offsets(self, start, end) -> (np.ndarray, np.ndarray):
+        """
+        Locate the slots falling inside each [start, end] window, both bounds inclusive, in O(1) per window.
+        Same contract as glucose.window_offsets().
+        Args:
+            start: Array-like of window start datetimes (UTC).
+            end: Array-like of window end datetimes (UTC), aligned with start.
+
+        Returns: Two integer arrays (left, right). Slots of window i are values[left[i]:right[i]].
+                 Windows with a missing start or end are returned as empty (left == right).
+
+        """
+        start = pd.DatetimeIndex(start)
+        end = pd.DatetimeIndex(end)
+        missing = np.asarray(start.isna() | end.isna())
+        start_ns = start.values.astype('datetime64[ns]').view(np.int64)
+        end_ns = end.values.astype('datetime64[ns]').view(np.int64)
+        left = np.clip(-((self.start - start_ns) // self.step), 0, len(self.values))  # ceiling division
+        right = np.clip((end_ns - self.start) // self.step + 1, 0, len(self.values))
+        right = np.where(missing | (right < left), left, right)
+        return left, right
+
+    def window(self, start, end) -> np.ndarray:
+        """
+        Get the values of a single [start, end] window.
+        Args:
+            start: Window start datetime (UTC).
+            end: Window end datetime (UTC).
+
+        Returns: A view of the grid values (not a copy).
+
+        """
+        left, right = self.offsets([start], [end])
+        return self.values[left[0]:right[0]]
+
+    def gaps(self) -> pd.DataFrame:
+        """
+        List the gaps left on the grid (runs of missing slots after interpolation).
+
+        Returns: A pandas DataFrame with one row per gap, columns 'start', 'end' (first and last missing slot),
+                 'slots', and 'duration'.
+
+        """
+        gap_start, gap_end = nan_runs(self.values)
+        index = self.index
+        gaps = pd.DataFrame({'start': index[gap_start],
+                             'end': index[gap_end - 1],
+                             'slots': gap_end - gap_start,
+                             'duration': pd.to_timedelta((gap_end - gap_start) * self.step, unit='ns')})
+        return gaps
+
+    def coverage_stats(self, left: np.ndarray, right: np.ndarray, keys) -> pd.DataFrame:
+        """
+        Calculate the coverage of windows given as offsets (see GlucoseGrid.offsets()), from a cumulative count of the
+        measured slots and the gaps overlapping each window.
+        Args:
+            left: Start offset (inclusive) of each window.
+            right: End offset (exclusive) of each window.
+            keys: Index values of the returned DataFrame, one per window.
+
+        Returns: A pandas DataFrame with one row per window, columns 'Slots', 'Glucose Slots', 'Coverage' (fraction of
+                 slots with glucose data), and 'Longest Gap (minutes)'.
+
+        """
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        measured = np.concatenate([[0], np.cumsum(~np.isnan(self.values))])
+        slots = right - left
+        glucose_slots = measured[right] - measured[left]
+
+        # clip the gaps overlapping each window to the window, then take the longest
+        gap_start, gap_end = nan_runs(self.values)
+        first = np.searchsorted(gap_end, left, side='right')
+        last = np.maximum(np.searchsorted(gap_start, right, side='left'), first)
+        positions, codes = gc.segment_positions(left=first, right=last)
+        clipped = np.minimum(gap_end[positions], right[codes]) - np.maximum(gap_start[positions], left[codes])
+        longest = np.zeros(len(left), dtype=np.int64)
+        np.maximum.at(longest, codes, clipped)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            coverage = glucose_slots / slots
+        stats = pd.DataFrame({'Slots': slots,
+                              'Glucose Slots': glucose_slots,
+                              'Coverage': coverage,
+                              'Longest Gap (minutes)': longest * self.step / 60e9},
+                             index=pd.Index(keys))
+        return stats
+
+    def summary(self) -> dict:
+        """
+        Summarize the grid.
+
+        Returns: Dictionary of the first and last slot, step, number of slots, measured and interpolated slots,
+                 coverage, number of gaps, longest gap, and the size of the values in bytes.
+
+        """
+        gaps = self.gaps()
+        missing = int(np.isnan(self.values).sum())
+        index = self.index
+        return {'start': index[0] if len(index) else pd.NaT,
+                'end': index[-1] if len(index) else pd.NaT,
+                'step': pd.Timedelta(self.step, unit='ns'),
+                'slots': len(self.values),
+                'measured': len(self.values) - missing - self.interpolated,
+                'interpolated': self.interpolated,
+                'coverage': 1 - missing / len(self.values) if len(self.values) else 0.0,
+                'gaps': len(gaps),
+                'longest_gap': gaps.duration.max() if len(gaps) else pd.Timedelta(0),
+                'bytes': self.values.nbytes}
@@ -1,15 +1,17 @@
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+import fingerprint as fp
 
 
-# @st.cache(suppress_st_warning=True)
 def load_levels_data(levels_file) -> pd.DataFrame:
     """
     Load a CSV file of Levels daily scores as a DataFrame.
+    Scores are stored as float32, and the index is a DatetimeIndex of days.
     Args:
         levels_file: file to be converted to a DataFrame.
 
-    Returns: pandas DataFrame of Levels daily scores.
+    Returns: pandas DataFrame of Levels daily scores, fingerprinted (see fingerprint.attach()).
     """
     expected_cols = ['Date', 'Metabolic Score']
 
@@ -18,12 +20,12 @@ def load_levels_data(levels_file) -> pd.DataFrame:
                              header=0, parse_dates=['Date'],
                              index_col='Date',
                              usecols=expected_cols)
-    except ValueError:
-        st.error(f"""
+    except ValueError as error:
+        raise ValueError(f"""
         Incorrect format of Levels data CSV. Please make sure you uploaded the correct file.
         \nThe following columns must be present in the first row:
         \n {expected_cols}
-        """)
-        raise
-    levels.index = levels.index.date # change index from datetime to date
-    return levels
+        """) from error
+    levels = levels.astype(np.float32)
+    levels.index = levels.index.normalize().rename(None)  # days, kept as datetime64 for native joins
+    return fp.attach(levels)
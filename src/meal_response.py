@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+# Minutes after an event covered by its response curve, and the spacing of the curve
+RESPONSE_MINUTES = 120
+RESPONSE_STEP_MINUTES = 5
+# Longest gap between two glucose samples bridged by linear interpolation, the curve is missing (NaN) across longer gaps
+RESPONSE_MAX_GAP = '30min'
+RESPONSE_PERCENTILES = (25, 75)
+
+
+def response_curves(glucose: pd.Series,
+                    events,
+                    minutes: int = RESPONSE_MINUTES,
+                    step_minutes: int = RESPONSE_STEP_MINUTES,
+                    max_gap=RESPONSE_MAX_GAP) -> pd.DataFrame:
+    """
+    Align the glucose data on events (i.e. Levels meal logs): the glucose at fixed offsets after every event,
+    linearly interpolated between the surrounding samples. All events x offsets are located with a single
+    searchsorted of the glucose index, and gathered at once.
+    Args:
+        glucose: pandas Series of glucose data.
+        events: pandas Series (or DatetimeIndex) of event datetimes. Index values of a Series identify the events.
+        minutes: Minutes after the event covered by the curve.
+        step_minutes: Spacing of the curve in minutes.
+        max_gap: Longest gap between two glucose samples to interpolate across.
+
+    Returns: A pandas DataFrame of glucose curves, one row per event, one column per offset (minutes after the event).
+             Offsets without glucose data around them are NaN.
+
+    """
+    if not glucose.index.is_monotonic_increasing:
+        glucose = glucose.sort_index(kind='mergesort')
+    keys = events.index if isinstance(events, pd.Series) else pd.RangeIndex(len(events))
+    offsets = np.arange(0, minutes + 1, step_minutes)
+
+    timestamps = glucose.index.values.astype('datetime64[ns]').view(np.int64)
+    values = glucose.to_numpy(dtype=np.float64)
+    event_times = pd.DatetimeIndex(events).values.astype('datetime64[ns]').view(np.int64)
+    targets = event_times[:, np.newaxis] + offsets[np.newaxis, :] * 60_000_000_000
+
+    after = np.searchsorted(timestamps, targets, side='left')
+    before = np.clip(after - 1, 0, None)
+    after = np.clip(after, None, len(timestamps) - 1)
+    if len(timestamps):
+        exact = timestamps[after] == targets
+        gap = timestamps[after] - timestamps[before]
+        inside = (timestamps[before] <= targets) & (targets <= timestamps[after]) & \
+            (gap <= pd.Timedelta(max_gap).value)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = np.where(gap > 0, (targets - timestamps[before]) / gap, 0.0)
+        curves = values[before] + weights * (values[after] - values[before])
+        curves = np.where(exact, values[after], np.where(inside, curves, np.nan))
+    else:
+        curves = np.full(targets.shape, np.nan)
+    curves[pd.isna(pd.DatetimeIndex(events))] = np.nan
+    return pd.DataFrame(curves, index=keys, columns=pd.Index(offsets, name='Minutes'))
+
+
+def response_metrics(curves: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate the glucose response of every event from its curve, relative to the glucose at the event (baseline).
+    Args:
+        curves: Glucose curves, output from meal_response.response_curves().
+
+    Returns: A pandas DataFrame with one row per event. Columns:
+                - Baseline Glucose (mg/dL): glucose at the event.
+                - Peak Delta (mg/dL): highest rise above the baseline.
+                - Time to Peak (minutes): minutes from the event to the peak.
+                - iAUC (mg/dL*h): incremental area under the curve above the baseline (trapezoidal),
+                                  NaN if the curve is incomplete.
+
+    """
+    values = curves.to_numpy(dtype=np.float64)
+    minutes = curves.columns.to_numpy(dtype=np.float64)
+    deltas = values - values[:, :1]
+    complete = ~np.isnan(deltas).any(axis=1)
+    peak = np.argmax(np.where(np.isnan(deltas), -np.inf, deltas), axis=1)
+    measured = ~np.isnan(deltas).all(axis=1)
+
+    above = np.clip(deltas, 0, None)
+    area = ((above[:, 1:] + above[:, :-1]) / 2 * np.diff(minutes)).sum(axis=1) / 60
+
+    metrics = pd.DataFrame({'Baseline Glucose (mg/dL)': values[:, 0] if values.shape[1] else np.nan,
+                            'Peak Delta (mg/dL)': np.where(measured, deltas[np.arange(len(deltas)), peak], np.nan),
+                            'Time to Peak (minutes)': np.where(measured, minutes[peak], np.nan),
+                            'iAUC (mg/dL*h)': np.where(complete, area, np.nan)},
+                           index=curves.index)
+    return metrics
+
+
+def response_summary(curves: pd.DataFrame, percentiles: tuple = RESPONSE_PERCENTILES) -> pd.DataFrame:
+    """
+    Summarize the response curves of all events, relative to the glucose at each event.
+    Args:
+        curves: Glucose curves, output from meal_response.response_curves().
+        percentiles: Percentiles of the glucose rise to calculate at every offset.
+
+    Returns: A pandas DataFrame indexed on the offset (minutes after the event), with the 'Mean', 'Median', and
+             percentile (i.e. 'P25') glucose rise, and the number of 'Events' with glucose data at the offset.
+
+    """
+    deltas = curves.to_numpy(dtype=np.float64)
+    deltas = deltas - deltas[:, :1]
+    with np.errstate(invalid='ignore'):
+        # all-NaN offsets are reported as NaN
+        summary = {'Mean': np.nanmean(deltas, axis=0) if len(deltas) else np.nan,
+                   'Median': np.nanmedian(deltas, axis=0) if len(deltas) else np.nan}
+        for percentile in percentiles:
+            summary[f'P{percentile}'] = np.nanpercentile(deltas, percentile, axis=0) if len(deltas) else np.nan
+    summary['Events'] = (~np.isnan(deltas)).sum(axis=0)
+    return pd.DataFrame(summary, index=curves.columns)
@@ -1,14 +1,20 @@
+import functools
 import pathlib
 from os.path import abspath, dirname
 
 import altair as alt
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from plotly import colors
+
+import downsample as ds
+import regression as reg
 
 SRC_PATH = pathlib.Path(dirname(abspath(__file__)))
 
+# Traces with more points than this are drawn with WebGL (Scattergl) instead of SVG
+WEBGL_THRESHOLD = 1000
+
 
 def altair_heatmap(corr_matrix: pd.DataFrame, x_selection: str = None, y_selection: str = None) -> alt.Chart:
     """
@@ -105,116 +111,369 @@ def plotly_heatmap(corr_matrix: pd.DataFrame) -> go.Figure:
     return fig
 
 
+def plotly_lag_heatmap(lagged_correlations: pd.DataFrame, y_selection: str) -> go.Figure:
+    """
+    Create a Plotly heatmap of the lagged correlations of every parameter with a selected parameter.
+    Args:
+        lagged_correlations: Long format lagged correlations, see correlation.lagged_correlations().
+        y_selection: Parameter to correlate the lagged parameters with.
+
+    Returns: The Plotly graph object figure.
+
+    """
+    title = f"Lagged Correlation with {y_selection}"
+    selected = lagged_correlations[(lagged_correlations.y == y_selection) & (lagged_correlations.x != y_selection)]
+    matrix = selected.pivot(index='x', columns='lag', values='correlation')
+    days = selected.pivot(index='x', columns='lag', values='n').reindex_like(matrix)
+    data = [go.Heatmap(x=matrix.columns,
+                       y=matrix.index,
+                       z=matrix,
+                       customdata=days,
+                       colorscale='RdBu',
+                       colorbar=dict(title='Correlation'),
+                       zmin=-1,
+                       zmax=1,
+                       hovertemplate=f"%{{y}} %{{x}} days earlier vs. {y_selection}<br>"
+                                     "Correlation: %{z:.2f}<br>Days: %{customdata}<extra></extra>",
+                       )]
+    layout = go.Layout(autosize=False,
+                       xaxis=dict(title='Lag (days)', dtick=1),
+                       yaxis=dict(showticklabels=True, tickfont=dict(size=8)), )
+    fig = go.Figure(data=data, layout=layout)
+    fig.update_layout(
+        title=dict(
+            text=title,
+            x=0.5
+        ),
+        yaxis=dict(
+            automargin=True
+        )
+    )
+    return fig
+
+
+def scatter_class(points: int):
+    """
+    Get the Plotly trace class for a trace of the given number of points: Scattergl (WebGL) above
+    WEBGL_THRESHOLD points, Scatter (SVG) otherwise.
+    """
+    return go.Scattergl if points > WEBGL_THRESHOLD else go.Scatter
+
+
+def date_xaxis(title: str = 'Date') -> dict:
+    """
+    Layout of a date x-axis with spikes, a range selector (1 week, 1 month, all), and a range slider.
+    """
+    return dict(
+        title=title,
+        showgrid=True,
+        showspikes=True,
+        spikemode='across + toaxis',
+        spikesnap='cursor',
+        showline=True,
+        spikedash='solid',
+        rangeselector=dict(
+            buttons=list([
+                dict(count=7,
+                     label="1w",
+                     step="day",
+                     stepmode="backward"),
+                dict(count=1,
+                     label="1m",
+                     step="month",
+                     stepmode="backward"),
+                dict(step="all")
+            ])
+        ),
+        rangeslider=dict(
+            visible=True
+        ),
+        type="date"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def layout_template(view: str) -> go.Layout:
+    """
+    Get the prebuilt (and validated) layout shared by every figure of a view, built once per process.
+    Figures copy it, and only set their data and titles.
+    Args:
+        view: 'scatter', 'line' (two metrics on a date axis), or 'glucose'.
+
+    Returns: The Plotly layout.
+
+    """
+    layouts = {
+        'scatter': dict(
+            title=dict(x=0.5),
+            hovermode='closest',
+            legend=dict(itemsizing='constant'),
+        ),
+        'line': dict(
+            xaxis=date_xaxis(),
+            yaxis=dict(
+                showgrid=True
+            ),
+            yaxis2=dict(
+                showgrid=False,
+                overlaying='y',
+                side='right'
+            ),
+            title=dict(
+                text='Metrics Trends',
+                x=0.5
+            ),
+            legend=dict(
+                orientation="h",
+            )
+        ),
+        'glucose': dict(
+            xaxis=date_xaxis(title='Time'),
+            yaxis=dict(
+                showgrid=True,
+                title='Glucose (mg/dL)'
+            ),
+            title=dict(
+                text='Glucose',
+                x=0.5
+            )
+        ),
+    }
+    return go.Layout(layouts[view])
+
+
+def trendline(x: pd.Series, fit, x_selection: str, y_selection: str, group: str = None, line_color: str = None):
+    """
+    Create the OLS trendline trace of a scatter plot, over the range of the x values.
+    Args:
+        x: Plotted x values.
+        fit: OLS fit of the pair (see regression.pair_fit()), None if the pair could not be fitted.
+        x_selection: Parameter plotted along the x-axis.
+        y_selection: Parameter plotted along the y-axis.
+        group: Optional category of the fitted points, the trendline joins its legend group.
+        line_color: Optional color of the line.
+
+    Returns: A list with the trendline trace, empty without a fit.
+
+    """
+    if fit is None or pd.isna(fit.slope):
+        return []
+    x_range = pd.Series([x.min(), x.max()])
+    label = 'OLS trendline' if group is None else f"OLS trendline ({group})"
+    return [go.Scatter(x=x_range,
+                       y=fit.intercept + fit.slope * x_range,
+                       mode='lines',
+                       name=label,
+                       legendgroup=group,
+                       line=dict(color=line_color),
+                       hovertemplate=(f"{label}<br>{y_selection} = {fit.slope:.4g} * {x_selection} + "
+                                      f"{fit.intercept:.4g}<br>"
+                                      f"R<sup>2</sup>={fit.r_squared:.4f}, p={fit.p_value:.3g}, n={fit.n}"
+                                      "<extra></extra>"),
+                       showlegend=False)]
+
+
 def plotly_scatter(dataset: pd.DataFrame,
                    x_selection: str,
                    y_selection: str,
                    color_selection: str,
-                   hover: [str] = None) -> go.Figure:
+                   hover: [str] = None,
+                   fit: pd.Series = None) -> go.Figure:
     """
     Create an interactive Plotly scatter plot with user defined x and y parameters as well as an optional third
-    parameter used for point color gradient.
+    parameter used for point color gradient (numeric parameters) or point groups (categorical parameters).
+    Built from the cached scatter layout (see plot.layout_template()), with WebGL markers above WEBGL_THRESHOLD points.
     Args:
         dataset: DataFrame containing selected parameters.
         x_selection: Parameter to plot along the x-axis.
         y_selection: Parameter to plot along the y-axis.
         color_selection: Parameter to use for scatter marker color gradient (parameter options are numeric intervals).
         hover: Additional parameters to include in the tool tip.
+        fit: Precomputed OLS fit of the pair (see regression.pair_fit()) drawn as the trendline.
+             Without it, the pair is fitted with regression.all_pairs_ols(). Ignored for a categorical color
+             parameter, every category is fitted and drawn with its own trendline (as Plotly Express does).
 
     Returns: The Plotly graph object figure.
 
     """
     title = f"Scatter Analysis: {x_selection} vs. {y_selection}"
-    if color_selection == '<select>':
-        color = None
+    color = None if color_selection == '<select>' else color_selection
+    hover = list(hover or [])
+    tooltip = f"{x_selection}=%{{x}}<br>{y_selection}=%{{y}}" + \
+        ''.join(f"<br>{column}=%{{customdata[{position}]}}" for position, column in enumerate(hover))
+    trace_class = scatter_class(len(dataset))
+    marker_line = dict(width=1, color='DarkSlateGrey')
+    columns = list(dict.fromkeys([x_selection, y_selection]))
+    categorical = color is not None and not (pd.api.types.is_numeric_dtype(dataset[color]) and
+                                             not pd.api.types.is_bool_dtype(dataset[color]))
+
+    if not categorical:
+        marker = dict(line=marker_line)
+        if color is not None:
+            marker.update(color=dataset[color], colorscale='Blues', showscale=True, colorbar=dict(title=color))
+            tooltip += f"<br>{color}=%{{marker.color}}"
+        traces = [trace_class(x=dataset[x_selection],
+                              y=dataset[y_selection],
+                              mode='markers',
+                              marker=marker,
+                              customdata=dataset[hover],
+                              hovertemplate=tooltip + "<extra></extra>",
+                              showlegend=False)]
+        if fit is None:
+            fit = reg.pair_fit(reg.all_pairs_ols(dataset[columns]), x_selection, y_selection)
+        traces.extend(trendline(dataset[x_selection], fit, x_selection, y_selection))
     else:
-        color = color_selection
-    fig = px.scatter(dataset,
-                     x=x_selection,
-                     y=y_selection,
-                     color_continuous_scale='Blues',
-                     color=color,
-                     trendline="ols",
-                     hover_data=hover)
-    fig.update_traces(
-        marker=dict(
-            line=dict(width=1,
-                      color='DarkSlateGrey')),
-        )
-    fig.update_layout(
-        title=dict(
-            text=title,
-            x=0.5
-        )
-    )
+        # one trace and one trendline per category, in category order, like Plotly Express
+        traces = []
+        palette = colors.qualitative.Plotly
+        for position, (name, group) in enumerate(dataset.groupby(color, sort=True, observed=True)):
+            group_color = palette[position % len(palette)]
+            traces.append(trace_class(x=group[x_selection],
+                                      y=group[y_selection],
+                                      mode='markers',
+                                      name=str(name),
+                                      legendgroup=str(name),
+                                      marker=dict(color=group_color, line=marker_line),
+                                      customdata=group[hover],
+                                      hovertemplate=tooltip + f"<br>{color}={name}<extra></extra>"))
+            group_fit = reg.pair_fit(reg.all_pairs_ols(group[columns]), x_selection, y_selection)
+            traces.extend(trendline(group[x_selection], group_fit, x_selection, y_selection,
+                                    group=str(name), line_color=group_color))
+
+    fig = go.Figure(data=traces, layout=layout_template('scatter'))
+    fig.update_layout(title_text=title,
+                      xaxis_title_text=x_selection,
+                      yaxis_title_text=y_selection,
+                      legend_title_text=color)
     return fig
 
 
-def plotly_line(dataset: pd.DataFrame, x_selection: str, y_selection: str, date_col: str = 'Date') -> go.Figure:
+def downsampled_trace(series: pd.Series, max_points: int = ds.MAX_POINTS, date_range: tuple = None):
+    """
+    Create a line trace of a time series downsampled to max_points (see downsample.downsample()), over an optional
+    (start, end) date range. Markers are only drawn when every point is plotted.
+    Args:
+        series: pandas Series with a DatetimeIndex, in any order.
+        max_points: Target number of points of the trace.
+        date_range: Optional (start, end) datetimes of the range to plot at a finer resolution.
+
+    Returns: The Plotly Scatter (or Scattergl, see plot.scatter_class()) trace.
+
+    """
+    if not series.index.is_monotonic_increasing:
+        series = series.sort_index(kind='mergesort')
+    if date_range is not None:
+        series = series[pd.Timestamp(date_range[0]):pd.Timestamp(date_range[1])]
+    points = ds.downsample(series, max_points=max_points)
+    return scatter_class(len(points))(x=points.index,
+                                      y=points.values,
+                                      mode='lines+markers' if len(points) == len(series) else 'lines',
+                                      name=series.name)
+
+
+def plotly_line(dataset: pd.DataFrame,
+                x_selection: str,
+                y_selection: str,
+                date_col: str = 'Date',
+                max_points: int = ds.MAX_POINTS,
+                date_range: tuple = None) -> go.Figure:
     """
     Create a multi-line timeseries Plotly plot. Plot both the x and y selection variables.
+    Long series are downsampled to max_points per line, so the payload sent to the browser stays bounded.
+    Built from the cached line layout (see plot.layout_template()), the y selection on the secondary y-axis.
     Args:
         dataset: Dataset of parameters.
         x_selection: Sub-line 1 for the plot.
         y_selection: Sub-line 2 for the plot.
         date_col: Dates to plot on the x axis.
+        max_points: Target number of points per line.
+        date_range: Optional (start, end) datetimes to zoom into, downsampled at a finer resolution.
 
     Returns: The Plotly graph object figure.
 
     """
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    dates = pd.DatetimeIndex(dataset.loc[:, date_col])
+    first = downsampled_trace(pd.Series(dataset.loc[:, x_selection].values, index=dates, name=x_selection),
+                              max_points=max_points, date_range=date_range)
+    second = downsampled_trace(pd.Series(dataset.loc[:, y_selection].values, index=dates, name=y_selection),
+                               max_points=max_points, date_range=date_range)
+    second.update(yaxis='y2')
+    fig = go.Figure(data=[first, second], layout=layout_template('line'))
+    fig.update_layout(yaxis_title_text=x_selection, yaxis2_title_text=y_selection)
+    if date_range is not None:
+        fig.update_xaxes(range=list(date_range))
+    return fig
+
+
+def plotly_glucose(glucose: pd.Series, max_points: int = ds.MAX_POINTS, date_range: tuple = None) -> go.Figure:
+    """
+    Create a Plotly plot of raw glucose data, downsampled to max_points (min/max per bucket, so no peak is lost).
+    Args:
+        glucose: pandas Series of glucose data.
+        max_points: Target number of points.
+        date_range: Optional (start, end) datetimes to zoom into, downsampled at a finer resolution.
+
+    Returns: The Plotly graph object figure.
+
+    """
+    fig = go.Figure(data=[downsampled_trace(glucose, max_points=max_points, date_range=date_range)],
+                    layout=layout_template('glucose'))
+    if date_range is not None:
+        fig.update_xaxes(range=list(date_range))
+    return fig
+
+
+def plotly_meal_response(summary: pd.DataFrame, lower: str = 'P25', upper: str = 'P75') -> go.Figure:
+    """
+    Create a Plotly plot of the glucose response to meals: the median rise above the glucose at the meal, within a
+    percentile band, and the mean.
+    Args:
+        summary: Summary of the response curves, see meal_response.response_summary().
+        lower: Column of the lower edge of the band.
+        upper: Column of the upper edge of the band.
+
+    Returns: The Plotly graph object figure.
+
+    """
+    title = f"Glucose Response to Meals (n={summary.Events.max() if len(summary) else 0})"
+    minutes = summary.index
+    fig = go.Figure()
     fig.add_trace(
-        go.Scatter(x=dataset.loc[:, date_col],
-                   y=dataset.loc[:, x_selection],
-                   mode='lines+markers',
-                   name=x_selection),
-        secondary_y=False, )
+        go.Scatter(x=minutes,
+                   y=summary[upper],
+                   mode='lines',
+                   line=dict(width=0),
+                   hoverinfo='skip',
+                   showlegend=False))
     fig.add_trace(
-        go.Scatter(x=dataset.loc[:, date_col],
-                   y=dataset.loc[:, y_selection],
+        go.Scatter(x=minutes,
+                   y=summary[lower],
+                   mode='lines',
+                   line=dict(width=0),
+                   fill='tonexty',
+                   fillcolor='rgba(31, 119, 180, 0.2)',
+                   name=f'{lower}-{upper}',
+                   hoverinfo='skip'))
+    fig.add_trace(
+        go.Scatter(x=minutes,
+                   y=summary.Median,
                    mode='lines+markers',
-                   name=y_selection),
-        secondary_y=True, )
+                   line=dict(color='rgb(31, 119, 180)'),
+                   name='Median',
+                   customdata=summary.Events,
+                   hovertemplate="%{x} min: %{y:.1f} mg/dL<br>Meals: %{customdata}<extra></extra>"))
+    fig.add_trace(
+        go.Scatter(x=minutes,
+                   y=summary.Mean,
+                   mode='lines',
+                   line=dict(dash='dash'),
+                   name='Mean'))
     fig.update_layout(
-        xaxis=dict(
-            title='Date',
-            showgrid=True,
-            showspikes=True,
-            spikemode='across + toaxis',
-            spikesnap='cursor',
-            showline=True,
-            spikedash='solid',
-            rangeselector=dict(
-                buttons=list([
-                    dict(count=7,
-                         label="1w",
-                         step="day",
-                         stepmode="backward"),
-                    dict(count=1,
-                         label="1m",
-                         step="month",
-                         stepmode="backward"),
-                    dict(step="all")
-                ])
-            ),
-            rangeslider=dict(
-                visible=True
-            ),
-            type="date"
-        ),
-        yaxis=dict(
-            showgrid=True,
-            title=x_selection
-        ),
-        yaxis2=dict(
-            showgrid=False,
-            title=y_selection
-        ),
         title=dict(
-            text='Metrics Trends',
+            text=title,
             x=0.5
         ),
-        legend=dict(
-            orientation="h",
-        )
+        xaxis=dict(title='Minutes after Meal', dtick=15),
+        yaxis=dict(title='Glucose Rise (mg/dL)'),
     )
     return fig
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import correlation as corr
+import fingerprint as fp
+
+FIT_COLUMNS = ['x', 'y', 'slope', 'intercept', 'r_squared', 'p_value', 'n']
+
+
+def engine_fits(engine: corr.CorrelationEngine, columns: list = None) -> pd.DataFrame:
+    """
+    Fit an ordinary least squares line (y = slope * x + intercept) for every ordered column pair, from the sufficient
+    statistics of a correlation engine. The centered moments of every pair are derived in one vectorized pass, so all
+    k^2 fits cost O(k^2) on top of the engine. Rows with a missing x or y are excluded pairwise, as in the fit of a
+    single pair.
+    Args:
+        engine: Correlation engine of the dataset, see correlation.CorrelationEngine.
+        columns: Optional subset and order of the columns, defaults to the order the columns were added in.
+
+    Returns: A pandas DataFrame of the fits in long format, columns 'x', 'y', 'slope', 'intercept', 'r_squared',
+             'p_value', and 'n'.
+
+    """
+    # statistics of column i over the rows shared with column j are at [i, j], so x is the row and y the column
+    n = engine.n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = engine.sum / n
+        mean_y = engine.sum.T / n
+        ss_x = engine.sum_sq - engine.sum * mean_x
+        ss_y = engine.sum_sq.T - engine.sum.T * mean_y
+        ss_xy = engine.sum_products - engine.sum * mean_y
+
+        slope = ss_xy / ss_x
+        intercept = (mean_y + engine.shift[np.newaxis, :]) - slope * (mean_x + engine.shift[:, np.newaxis])
+        r_squared = np.clip(ss_xy ** 2 / (ss_x * ss_y), 0, 1)
+        degrees = n - 2
+        t_statistic = np.sqrt(r_squared * degrees / (1 - r_squared))
+    undefined = (n < 2) | (ss_x <= 0)
+    slope[undefined] = np.nan
+    intercept[undefined] = np.nan
+    r_squared[undefined | (ss_y <= 0)] = np.nan
+    p_value = 2 * stats.t.sf(t_statistic, np.where(degrees > 0, degrees, np.nan))
+    p_value[np.isnan(r_squared)] = np.nan
+
+    names = pd.Index(engine.columns)
+    positions = np.arange(len(names)) if columns is None else names.get_indexer(columns)
+    rows, cols = np.meshgrid(positions, positions, indexing='ij')
+    rows, cols = rows.ravel(), cols.ravel()
+    fits = pd.DataFrame({'x': names[rows],
+                         'y': names[cols],
+                         'slope': slope[rows, cols],
+                         'intercept': intercept[rows, cols],
+                         'r_squared': r_squared[rows, cols],
+                         'p_value': p_value[rows, cols],
+                         'n': n[rows, cols].astype(np.int64)})
+    return fits
+
+
+def all_pairs_ols(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
+    """
+    Fit an ordinary least squares line for every pair of numeric parameters, i.e. every x-y pair of the output of
+    utilities.create_metrics_dataset(). Reuses the correlation engine cached by the dataset's fingerprint
+    (see correlation.correlation_engine()), so the heatmap and the fits share the same sufficient statistics.
+    Args:
+        parameters: A pandas DataFrame of measurements.
+        date_column: Date column, if it exists, in the parameters DataFrame.
+
+    Returns: The fits of each parameter pair (x-y) in long format, see regression.engine_fits().
+
+    """
+    if date_column:
+        parameters = fp.without_columns(parameters, [date_column])
+    return engine_fits(corr.correlation_engine(parameters), columns=list(corr.numeric_columns(parameters).columns))
+
+
+def pair_fit(fits: pd.DataFrame, x: str, y: str):
+    """
+    Look up the fit of one parameter pair.
+    Args:
+        fits: Fits in long format, see regression.all_pairs_ols().
+        x: Parameter on the x-axis.
+        y: Parameter on the y-axis.
+
+    Returns: The pair's fit as a pandas Series, None if the pair was not fitted.
+
+    """
+    pair = fits[(fits.x == x) & (fits.y == y)]
+    return pair.iloc[0] if len(pair) else None
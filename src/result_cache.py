@@ -0,0 +1,56 @@
+import hashlib
+import os
+
+import fingerprint as fp
+import upload_cache as uc
+
+# Bump whenever the output of a cached pipeline step changes (i.e. utilities.create_metrics_dataset()),
+# so results of an older pipeline are never read.
+PIPELINE_VERSION = 1
+
+RESULT_CACHE_PATH = uc.UPLOAD_CACHE_PATH / 'results'
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 1024 ** 3))
+
+
+class ResultCache(uc.FeatherCache):
+    """
+    Persistent cache of derived datasets (i.e. the output of utilities.create_metrics_dataset()), shared by every app
+    process and surviving restarts. Results are keyed by the function, the pipeline version, and the fingerprints of
+    the arguments (see fingerprint.fingerprint()), so the same inputs always map to the same file.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        super().__init__(path=path, max_bytes=max_bytes)
+
+    @staticmethod
+    def key(function, *args, **kwargs) -> str:
+        """
+        Create the cache key of a function call.
+        Args:
+            function: The pipeline function.
+            *args: Positional arguments of the call.
+            **kwargs: Keyword arguments of the call.
+
+        Returns: The hexadecimal SHA-256 digest.
+
+        """
+        call = fp.call_fingerprint(function, *args, **kwargs)
+        return hashlib.sha256(f"{call}:{PIPELINE_VERSION}".encode()).hexdigest()
+
+    def compute(self, function, *args, **kwargs):
+        """
+        Call a pipeline function, reading the result from the cache if it was calculated before from the same inputs.
+        Args:
+            function: Function returning a pandas DataFrame (or Series), called on a cache miss.
+            *args: Positional arguments of the call.
+            **kwargs: Keyword arguments of the call.
+
+        Returns: The result of the function, fingerprinted with the cache key.
+
+        """
+        key = self.key(function, *args, **kwargs)
+        result = self.get(key)
+        if result is None:
+            result = function(*args, **kwargs)
+            self.put(key, result)
+        return fp.attach(result, digest=key)
@@ -0,0 +1,219 @@
+"""
+Preprocessed sample dataset of the app's Data and Analysis pages. The sample is fixed, so its typed DataFrame,
+correlation matrix, strongest pairs, all-pairs regression fits, lagged correlations, and the JSON of the figures shown
+by default are computed once and stored in a single pickle. The app memory-maps and unpickles it instead of parsing
+the CSV and recomputing. A missing or stale artifact is rebuilt by the first app process that needs it (see
+sample_artifact.load_or_build()), the app falls back to sample.csv if it cannot be written.
+Build it ahead of time from the src directory: python sample_artifact.py
+"""
+import hashlib
+import json
+import mmap
+import os
+import pathlib
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import correlation as corr
+import fingerprint as fp
+import regression as reg
+import result_cache as rc
+import utilities as util
+
+# Bump whenever the contents of the artifact change, so a stale artifact is never loaded
+ARTIFACT_VERSION = 1
+
+SAMPLE_PATH = util.SRC_PATH / 'sample.csv'
+ARTIFACT_PATH = util.SRC_PATH / 'sample.pickle'
+# Modules computing the contents of the artifact, a change to any of them makes the artifact stale
+SOURCE_MODULES = ['sample_artifact', 'utilities', 'correlation', 'regression', 'fingerprint', 'plot', 'downsample']
+
+# Selections shown by default on the Analysis page, their figures are prebuilt
+DATE_COLUMN = 'Date'
+DEFAULT_X = 'Sleep Score'
+DEFAULT_Y = 'Metabolic Score'
+DEFAULT_COLOR = 'Fast'
+
+
+def parse_sample(path: pathlib.Path = SAMPLE_PATH) -> pd.DataFrame:
+    """
+    Parse the sample dataset, numeric columns rounded to two decimals.
+    Args:
+        path: Path of the sample CSV file.
+
+    Returns: The sample dataset, with its fingerprint attached.
+
+    """
+    sample = pd.read_csv(path, parse_dates=[DATE_COLUMN], index_col=0)
+    return fp.attach(sample.round(dict.fromkeys(sample.select_dtypes('number').columns, 2)))
+
+
+def source_digest(path: pathlib.Path = SAMPLE_PATH) -> str:
+    """
+    Identify the inputs of an artifact: the sample file, the sources of the modules computing it (SOURCE_MODULES),
+    the artifact and pipeline versions, and the pandas, numpy, and plotly versions (pickled frames are not portable
+    across pandas versions, and the fits and figures depend on numpy and plotly).
+    Args:
+        path: Path of the sample CSV file.
+
+    Returns: The hexadecimal SHA-256 digest.
+
+    """
+    digest = hashlib.sha256(pathlib.Path(path).read_bytes())
+    for module in SOURCE_MODULES:
+        digest.update((util.SRC_PATH / f"{module}.py").read_bytes())
+    digest.update(f":{ARTIFACT_VERSION}:{rc.PIPELINE_VERSION}:{pd.__version__}:{np.__version__}:"
+                  f"{plotly.__version__}".encode())
+    return digest.hexdigest()
+
+
+def encode_figure(figure: go.Figure) -> str:
+    """
+    Serialize a figure to JSON without its layout template. The template is the default one, re-applied when the
+    figure is decoded, and validating it is most of the decoding time.
+    Args:
+        figure: Plotly figure.
+
+    Returns: The figure JSON.
+
+    """
+    spec = figure.to_plotly_json()
+    spec['layout'].pop('template', None)
+    return pio.to_json(spec, validate=False)
+
+
+def decode_figure(spec: str) -> go.Figure:
+    """
+    Build a figure from its JSON, see sample_artifact.encode_figure().
+    Args:
+        spec: The figure JSON.
+
+    Returns: The Plotly figure.
+
+    """
+    return go.Figure(json.loads(spec))
+
+
+def default_figures(analysis: dict) -> dict:
+    """
+    Build the figures of the Analysis page for the default selections.
+    Args:
+        analysis: Output of sample_artifact.analyze().
+
+    Returns: Dictionary of figure key to Plotly figure JSON. Keys are ('heatmap',), ('scatter', x, y, color),
+             ('line', x, y), and ('lag', y).
+
+    """
+    import plot  # plot imports altair, only needed to build the figures
+
+    sample = analysis['sample']
+    figures = {('heatmap',): plot.plotly_heatmap(analysis['corr_matrix']),
+               ('scatter', DEFAULT_X, DEFAULT_Y, DEFAULT_COLOR): plot.plotly_scatter(
+                   dataset=sample,
+                   x_selection=DEFAULT_X,
+                   y_selection=DEFAULT_Y,
+                   color_selection=DEFAULT_COLOR,
+                   hover=[DATE_COLUMN],
+                   fit=reg.pair_fit(analysis['fits'], DEFAULT_X, DEFAULT_Y)),
+               ('line', DEFAULT_X, DEFAULT_Y): plot.plotly_line(sample, DEFAULT_X, DEFAULT_Y, DATE_COLUMN),
+               ('lag', DEFAULT_Y): plot.plotly_lag_heatmap(analysis['lagged'], DEFAULT_Y)}
+    return {key: encode_figure(figure) for key, figure in figures.items()}
+
+
+def analyze(sample: pd.DataFrame, figures: bool = True) -> dict:
+    """
+    Run the analysis of the sample dataset shown on the Analysis page.
+    Args:
+        sample: The sample dataset, see sample_artifact.parse_sample().
+        figures: Whether to build the figures of the default selections (requires the plot module).
+
+    Returns: Dictionary with the 'sample', its clustered 'corr_matrix' (rounded to two decimals), 'top_pairs',
+             all-pairs regression 'fits', 'lagged' correlations, and the 'figures' JSON (see default_figures()).
+
+    """
+    analysis = {'sample': sample,
+                'corr_matrix': util.clustered_corr_matrix(sample, date_column=DATE_COLUMN).round(2),
+                'top_pairs': util.top_correlated_pairs(sample, date_column=DATE_COLUMN),
+                'fits': reg.all_pairs_ols(sample, date_column=DATE_COLUMN),
+                'lagged': corr.lagged_correlations(sample, date_column=DATE_COLUMN)}
+    analysis['figures'] = default_figures(analysis) if figures else {}
+    return analysis
+
+
+def build(path: pathlib.Path = ARTIFACT_PATH, sample_path: pathlib.Path = SAMPLE_PATH) -> pathlib.Path:
+    """
+    Build the artifact: analyze the sample and pickle the results, written to a temporary file and atomically renamed
+    so a running app never reads a partial artifact.
+    Args:
+        path: Path of the artifact.
+        sample_path: Path of the sample CSV file.
+
+    Returns: The path of the artifact.
+
+    """
+    path = pathlib.Path(path)
+    sample = parse_sample(sample_path)
+    contents = {'source': source_digest(sample_path), 'fingerprint': fp.fingerprint(sample), **analyze(sample)}
+    descriptor, temporary = tempfile.mkstemp(suffix='.tmp', prefix=f'{path.stem}.', dir=str(path.parent))
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            pickle.dump(contents, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return path
+
+
+def load(path: pathlib.Path = ARTIFACT_PATH, sample_path: pathlib.Path = SAMPLE_PATH):
+    """
+    Load the artifact with a single memory-mapped read. Only load artifacts built locally, they are pickles.
+    Args:
+        path: Path of the artifact.
+        sample_path: Path of the sample CSV file the artifact must have been built from.
+
+    Returns: The contents of the artifact (see sample_artifact.analyze()), None if it is missing, unreadable, or was
+             built from another sample, version, or pandas version.
+
+    """
+    try:
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            contents = pickle.loads(mapped)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if not isinstance(contents, dict) or contents.get('source') != source_digest(sample_path):
+        return None
+    fp.attach(contents['sample'], digest=contents['fingerprint'])
+    return contents
+
+
+def load_or_build(path: pathlib.Path = ARTIFACT_PATH, sample_path: pathlib.Path = SAMPLE_PATH):
+    """
+    Load the artifact, building it first if it is missing or stale (see sample_artifact.load()), so a new deployment
+    or a code change only pays for the analysis once.
+    Args:
+        path: Path of the artifact.
+        sample_path: Path of the sample CSV file.
+
+    Returns: The contents of the artifact, None if it could not be built.
+
+    """
+    contents = load(path, sample_path)
+    if contents is None:
+        try:
+            build(path, sample_path)
+        except (OSError, ImportError):  # read-only deployment, or the plotting dependencies are not installed
+            return None
+        contents = load(path, sample_path)
+    return contents
+
+
+if __name__ == '__main__':
+    artifact = build()
+    print(f"Wrote {artifact} ({artifact.stat().st_size / 1024:.1f} KiB)")
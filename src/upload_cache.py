@@ -0,0 +1,190 @@
+import hashlib
+import io
+import os
+import pathlib
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+import fingerprint as fp
+
+# Bump whenever the output of a loader changes (columns, dtypes, index), so stale cache files are never read.
+LOADER_VERSION = 2
+
+UPLOAD_CACHE_PATH = pathlib.Path(os.environ.get('UPLOAD_CACHE_DIR',
+                                                pathlib.Path(tempfile.gettempdir()) / 'glucose-sleep-analysis'))
+UPLOAD_CACHE_MAX_BYTES = 500 * 1024 ** 2
+
+_SERIES_FLAG = b'upload_cache_series'
+
+
+class FeatherCache:
+    """
+    Persistent content-addressed cache of pandas DataFrames (and Series), stored as Feather files named by their key.
+    Files are written to a temporary file and atomically renamed, so several app processes can share the directory,
+    and readers never see a partial file. Least recently used files are evicted once the cache exceeds max_bytes.
+    Counters of hits, misses, and bytes saved (size of the files served instead of recomputed) are kept per instance.
+    """
+
+    def __init__(self, path: pathlib.Path, max_bytes: int):
+        self.path = pathlib.Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def file(self, key: str) -> pathlib.Path:
+        """
+        Get the cache file of a key.
+        """
+        return self.path / f"{key}.feather"
+
+    def get(self, key: str):
+        """
+        Read a cached value, counting a hit or a miss.
+        Args:
+            key: Cache key.
+
+        Returns: The cached pandas DataFrame (or Series), None if the key is not cached.
+
+        """
+        file = self.file(key)
+        try:
+            cached = self._read(file)
+            os.utime(file)  # mark as recently used
+            size = file.stat().st_size
+        except (FileNotFoundError, pa.ArrowInvalid):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.bytes_saved += size
+        return cached
+
+    def put(self, key: str, value):
+        """
+        Write a value to the cache, then evict the least recently used files.
+        Args:
+            key: Cache key.
+            value: pandas DataFrame (or Series) to cache.
+        """
+        self._write(value, self.file(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Delete the least recently used cache files until the cache is within max_bytes.
+        Files deleted meanwhile by another process are skipped.
+        """
+        files = []
+        for cached in self.path.glob('*.feather'):
+            try:
+                files.append((cached.stat(), cached))
+            except FileNotFoundError:
+                continue
+        files.sort(key=lambda stat_file: stat_file[0].st_mtime)
+        total_bytes = sum(stat.st_size for stat, _ in files)
+        for stat, cached in files:
+            if total_bytes <= self.max_bytes:
+                break
+            total_bytes -= stat.st_size
+            try:
+                cached.unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        """
+        Get the cache counters.
+
+        Returns: Dictionary of hits, misses, hit ratio, bytes saved, and bytes stored on disk.
+
+        """
+        requests = self.hits + self.misses
+        stored = 0
+        for cached in self.path.glob('*.feather'):
+            try:
+                stored += cached.stat().st_size
+            except FileNotFoundError:
+                continue
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'bytes': stored}
+
+    @staticmethod
+    def _read(file: pathlib.Path):
+        table = feather.read_table(str(file), memory_map=True)
+        parsed = table.to_pandas()
+        if _SERIES_FLAG in (table.schema.metadata or {}):
+            parsed = parsed.iloc[:, 0]
+        return parsed
+
+    @staticmethod
+    def _write(parsed, file: pathlib.Path):
+        is_series = isinstance(parsed, pd.Series)
+        table = pa.Table.from_pandas(parsed.to_frame() if is_series else parsed, preserve_index=True)
+        if is_series:
+            table = table.replace_schema_metadata({**table.schema.metadata, _SERIES_FLAG: b'1'})
+        descriptor, temporary = tempfile.mkstemp(suffix='.tmp', prefix=f'{file.stem}.', dir=str(file.parent))
+        os.close(descriptor)
+        try:
+            feather.write_feather(table, temporary)
+            os.replace(temporary, file)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+class UploadCache(FeatherCache):
+    """
+    Persistent cache of parsed uploads, keyed by a SHA-256 of the raw file bytes, the loader, and the loader version.
+    Repeat sessions (and app restarts) memory-map the Feather file instead of re-parsing the CSV.
+    """
+
+    def __init__(self, path: pathlib.Path = UPLOAD_CACHE_PATH, max_bytes: int = UPLOAD_CACHE_MAX_BYTES):
+        super().__init__(path=path, max_bytes=max_bytes)
+
+    @staticmethod
+    def key(raw: bytes, loader, *args) -> str:
+        """
+        Create the cache key of an upload.
+        Args:
+            raw: Raw bytes of the uploaded file.
+            loader: Function used to parse the file.
+            *args: Additional arguments passed to the loader (i.e. a timezone).
+
+        Returns: The hexadecimal SHA-256 digest.
+
+        """
+        digest = hashlib.sha256(raw)
+        digest.update(f"{loader.__module__}.{loader.__name__}:{LOADER_VERSION}:{args!r}".encode())
+        return digest.hexdigest()
+
+    def load(self, loader, upload, *args):
+        """
+        Load an upload with a loader (i.e. whoop.load_whoop_data()), reading the parsed result from the cache if
+        the same file was loaded before.
+        Args:
+            loader: Function used to parse the file, called as loader(file, *args) on a cache miss.
+            upload: The uploaded file (i.e. a Streamlit UploadedFile) or a path.
+            *args: Additional arguments passed to the loader.
+
+        Returns: The pandas DataFrame (or Series) returned by the loader, fingerprinted with the cache key.
+
+        """
+        if isinstance(upload, (str, pathlib.Path)):
+            raw = pathlib.Path(upload).read_bytes()
+        elif hasattr(upload, 'getvalue'):
+            raw = upload.getvalue()
+        else:
+            raw = upload.read()
+        key = self.key(raw, loader, *args)
+        parsed = self.get(key)
+        if parsed is None:
+            parsed = loader(io.BytesIO(raw), *args)
+            self.put(key, parsed)
+        return fp.attach(parsed, digest=key)
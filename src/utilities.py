@@ -1,15 +1,18 @@
+import numpy as np
 import pandas as pd
-import streamlit as st
 import pathlib
 import datetime as dt
 from os.path import abspath, dirname
-from pandas_profiling import ProfileReport
+import correlation as corr
+import fingerprint as fp
 import glucose as gc
 
 SRC_PATH = pathlib.Path(dirname(abspath(__file__)))
 
+# Largest number of columns of the clustered correlation heatmap, see utilities.clustered_corr_matrix()
+HEATMAP_MAX_COLUMNS = 30
+
 
-@st.cache(suppress_st_warning=True)
 def read_markdown_file(file: str) -> str:
     """
     Read a markdown file and return as text.
@@ -22,7 +25,7 @@ def read_markdown_file(file: str) -> str:
     return (SRC_PATH / 'content' / file).read_text()
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
 def create_metrics_dataset(sleep_scores: pd.DataFrame,
                            metabolic_scores: pd.DataFrame,
                            fasting_scores: pd.DataFrame) -> pd.DataFrame:
@@ -42,11 +45,11 @@ def create_metrics_dataset(sleep_scores: pd.DataFrame,
     return metrics
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
 def create_raw_analysis_dataset(sleep: pd.DataFrame, glucose: pd.Series) -> pd.DataFrame:
     """
     Create the full dataset for use in scatter plot analysis.
-    First create subsets of glucose statistics by various grouping created:
+    First aggregate glucose statistics over various groupings, each in a single pass:
         - glucose statistics (day)
         - glucose statistics (previous day)
         - glucose statistics (sleep)
@@ -62,19 +65,48 @@ def create_raw_analysis_dataset(sleep: pd.DataFrame, glucose: pd.Series) -> pd.D
              Columns will be unique statistics (sleep or glucose related).
 
     """
-    sleep_groups = gc.create_glucose_sleep_groups(glucose=glucose, sleep=sleep)
-    day_groups = gc.create_glucose_day_groups(glucose=glucose)
-    glucose_sleep_stats = gc.grouped_glucose_stats(groups=sleep_groups, time_label='Sleep')
-    glucose_day_stats = gc.grouped_glucose_stats(groups=day_groups, time_label='Day')
-    all_glucose_data = pd.concat([glucose_sleep_stats, glucose_day_stats], axis=1)
+    glucose_sleep_stats = gc.sleep_glucose_stats(glucose=glucose, sleep=sleep, time_label='Sleep')
+    glucose_day_stats = gc.day_glucose_stats(glucose=glucose, time_label='Day')
+    all_data = join_glucose_sleep_stats(sleep=sleep, glucose_stats=[glucose_sleep_stats, glucose_day_stats])
+    return all_data
+
+
+def create_incremental_analysis_dataset(sleep: pd.DataFrame, glucose: pd.Series, store) -> pd.DataFrame:
+    """
+    Create the same dataset as create_raw_analysis_dataset(), from a persistent aggregate store.
+    Only the days and sleep periods of the upload which are new or changed are aggregated,
+    the glucose statistics are rebuilt from the stored aggregates.
+    Args:
+        sleep: Sleep data uploaded to the app.
+        glucose: Glucose data uploaded to the app.
+        store: aggregate_store.AggregateStore of previous uploads, updated in place.
+
+    Returns: A wide pandas dataFrame of sleep and glucose statistics, see create_raw_analysis_dataset().
+
+    """
+    store.update(glucose=glucose, sleep=sleep)
+    all_data = join_glucose_sleep_stats(sleep=sleep, glucose_stats=[store.stats('Sleep'), store.stats('Day')])
+    return all_data
+
+
+def join_glucose_sleep_stats(sleep: pd.DataFrame, glucose_stats: [pd.DataFrame]) -> pd.DataFrame:
+    """
+    Outer join glucose statistics dataFrames and inner join with daily sleep data.
+    Args:
+        sleep: Sleep data uploaded to the app.
+        glucose_stats: Glucose statistics dataFrames indexed on date.
+
+    Returns: A wide pandas dataFrame of sleep and glucose statistics with a 'Date' column.
+
+    """
+    all_glucose_data = pd.concat(glucose_stats, axis=1)
     sleep_numeric = sleep.copy().drop(columns=['Sleep Start', 'Sleep End'])
     all_data = all_glucose_data.merge(sleep_numeric, left_index=True, right_index=True).round(2).reset_index()
     all_data.rename(columns={'index': 'Date'}, inplace=True)
-
     return all_data
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
 def corr_matrix_long(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
     """
     Create a long format correlation 'matrix'. Columns include 'x', 'y', and 'correlation'.
@@ -85,17 +117,17 @@ def corr_matrix_long(parameters: pd.DataFrame, date_column: str = None) -> pd.Da
     Returns: The correlations of each parameter pair (x-y) in long format.
 
     """
-    if date_column:
-        parameters = parameters.copy().drop(columns=[date_column])
-    correlations = parameters.corr().reset_index().melt('index')
+    correlations = corr_matrix(parameters, date_column=date_column).reset_index().melt('index')
     correlations.columns = ['x', 'y', 'correlation']
     return correlations
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
 def corr_matrix(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFrame:
     """
     Create a square format correlation 'matrix'. Indexes and columns will match.
+    Calculated from a correlation engine cached by the dataset's fingerprint (see correlation.correlation_engine()),
+    so repeated calls on the same data do not recompute the correlations.
     Args:
         parameters: A pandas DataFrame of measurements.
         date_column: Date column, if it exists, in the parameters DataFrame.
@@ -104,12 +136,58 @@ def corr_matrix(parameters: pd.DataFrame, date_column: str = None) -> pd.DataFra
 
     """
     if date_column:
-        parameters = parameters.copy().drop(columns=[date_column])
-    matrix = parameters.corr()
+        parameters = fp.without_columns(parameters, [date_column])
+    matrix = corr.correlation_engine(parameters).matrix(columns=list(corr.numeric_columns(parameters).columns))
     return matrix
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
+def clustered_corr_matrix(parameters: pd.DataFrame,
+                          date_column: str = None,
+                          max_columns: int = HEATMAP_MAX_COLUMNS) -> pd.DataFrame:
+    """
+    Create a square correlation 'matrix' in hierarchical clustering order (see CorrelationEngine.cluster_order()),
+    reduced to the max_columns parameters with the strongest correlation to any other parameter.
+    The order is cached with the correlation engine of the dataset's fingerprint.
+    Args:
+        parameters: A pandas DataFrame of measurements.
+        date_column: Date column, if it exists, in the parameters DataFrame.
+        max_columns: Largest number of parameters in the matrix.
+
+    Returns: The correlations as a matrix, indexes and columns in clustered order.
+
+    """
+    if date_column:
+        parameters = fp.without_columns(parameters, [date_column])
+    engine = corr.correlation_engine(parameters)
+    columns = list(corr.numeric_columns(parameters).columns)
+    if len(columns) > max_columns:
+        strength = np.nan_to_num(engine.matrix(columns=columns).abs().to_numpy(), nan=-1.0)
+        np.fill_diagonal(strength, -1.0)
+        strongest = strength.max(axis=1)
+        keep = np.sort(np.argsort(-strongest, kind='stable')[:max_columns])
+        columns = [columns[position] for position in keep]
+    return engine.matrix(columns=engine.cluster_order(columns))
+
+
+@fp.derived
+def top_correlated_pairs(parameters: pd.DataFrame, date_column: str = None, k: int = corr.TOP_PAIRS) -> pd.DataFrame:
+    """
+    Index the parameter pairs with the strongest correlation |r| (see CorrelationEngine.top_pairs()),
+    cached with the correlation engine of the dataset's fingerprint.
+    Args:
+        parameters: A pandas DataFrame of measurements.
+        date_column: Date column, if it exists, in the parameters DataFrame.
+        k: Number of pairs.
+
+    Returns: The k strongest pairs, columns 'x', 'y', 'correlation', and 'n', strongest first.
+
+    """
+    if date_column:
+        parameters = fp.without_columns(parameters, [date_column])
+    return corr.correlation_engine(parameters).top_pairs(k=k, columns=list(corr.numeric_columns(parameters).columns))
+
+
 def create_dates(dates: [str]) -> [dt.date]:
     """
     Create a list of dates as datetime.date objects.
@@ -123,64 +201,16 @@ def create_dates(dates: [str]) -> [dt.date]:
     return dates_list
 
 
-@st.cache()
-def profile_report(summary_data: pd.DataFrame) -> ProfileReport:
+def profile_report(summary_data: pd.DataFrame) -> 'ProfileReport':
     """
     Create a pandas_profiling profile report to embed in the Streamlit app or Jupyter Notebook
+    pandas_profiling is imported on first use, it is slow to import and only needed for the report.
     Args:
         summary_data: Dataset to be analyzed.
 
     Returns: The profile report.
 
     """
+    from pandas_profiling import ProfileReport
     pr = ProfileReport(summary_data, explorative=True)
     return pr
-
-
-def variables_for_plot(dataset: pd.DataFrame,
-                       date_col: str = 'Date',
-                       default_x: str = None,
-                       default_y: str = None,
-                       default_c: str = None,
-                       app_section: str = 'user') -> (str, str, str):
-    """
-    Get user selected parameters for plot x-axis, y-axis, and optionally, the marker color gradient.
-    Args:
-        app_section: section of app where function is called from. String used to set streamlit widget keys.
-        dataset: pandas dataFrame used for plotting. Expect a 'Date' column and a unique statistics for all other
-        columns.
-        default_x: default parameter desired for x axis of scatter plot.
-        default_y: default parameter desired for y axis of scatter plot.
-        default_c: default parameter desired for color scheme of scatter plot.
-        date_col: Name of date column to be removed from selection options.
-
-    Returns: parameter selections for the x-axis, y-axis, and the marker color gradient as strings.
-
-    """
-
-    all_cols = sorted(dataset)
-    all_cols.insert(0, '<select>')
-    all_cols_no_date = all_cols.copy()
-    all_cols_no_date.remove(date_col)
-
-    x_default, y_default, c_default = 0, 0, 0
-
-    if default_x:
-        x_default = all_cols_no_date.index(default_x)
-    if default_y:
-        y_default = all_cols_no_date.index(default_y)
-    if default_c:
-        c_default = all_cols_no_date.index(default_c)
-
-    x_key = app_section + '_x'
-    y_key = app_section + '_y'
-    c_key = app_section + '_c'
-    x_axis_col, y_axis_col, color_col = st.beta_columns(3)
-    x = x_axis_col.selectbox(label='X-Axis', options=all_cols_no_date, index=x_default, key=x_key)
-    y = y_axis_col.selectbox(label='Y-Axis', options=all_cols_no_date, index=y_default, key=y_key)
-    color = color_col.selectbox(label='OPTIONAL: Color Gradient',
-                                options=all_cols_no_date,
-                                index=c_default,
-                                key=c_key)
-
-    return x, y, color
@@ -0,0 +1,277 @@
+import numpy as np
+import pandas as pd
+
+import glucose as gc
+
+# Glucose target range in mg/dL (inclusive), used for the time in, above, and below range
+TARGET_RANGE = (70, 180)
+# Hours between the observations compared by CONGA, and the tolerance when matching the earlier observation
+CONGA_HOURS = 1
+CONGA_TOLERANCE = '5min'
+
+VARIABILITY_METRICS = ['Glucose CV (%)',
+                       'Time in Range (%)',
+                       'Time Above Range (%)',
+                       'Time Below Range (%)',
+                       'GMI (%)',
+                       'MAGE (mg/dL)',
+                       'CONGA (mg/dL)',
+                       'LBGI',
+                       'HBGI']
+
+
+def segment_sums(values: np.ndarray, codes: np.ndarray, windows: int) -> np.ndarray:
+    """
+    Sum values per window in one pass (missing windows sum to 0).
+    Args:
+        values: numpy array of values.
+        codes: Window number of every value.
+        windows: Number of windows.
+
+    Returns: numpy array of sums, one per window.
+
+    """
+    return np.bincount(codes, weights=values, minlength=windows)
+
+
+def segment_std(values: np.ndarray, codes: np.ndarray, windows: int) -> np.ndarray:
+    """
+    Calculate the sample standard deviation of values per window from the window sums of the values and their squares.
+    Args:
+        values: numpy array of values.
+        codes: Window number of every value.
+        windows: Number of windows.
+
+    Returns: numpy array of standard deviations, one per window (NaN for windows with less than two values).
+
+    """
+    count = np.bincount(codes, minlength=windows)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = segment_sums(values, codes, windows) / count
+        variance = (segment_sums((values - mean[codes]) ** 2, codes, windows)) / (count - 1)
+    variance[count < 2] = np.nan
+    return np.sqrt(variance)
+
+
+def turning_points(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """
+    Locate the peaks and nadirs of every window (plus the first and last value of each window), without a loop.
+    Plateaus are collapsed to their last value, so peaks and nadirs alternate within a window.
+    Args:
+        values: numpy array of values, the windows concatenated.
+        codes: Window number of every value, sorted.
+
+    Returns: Sorted positions of the turning points in values.
+
+    """
+    if len(values) == 0:
+        return np.array([], dtype=np.int64)
+    changes = np.diff(values)
+    steps = np.flatnonzero((codes[1:] == codes[:-1]) & (changes != 0))
+    directions = np.sign(changes[steps])
+    reversals = (directions[1:] != directions[:-1]) & (codes[steps[1:]] == codes[steps[:-1]])
+    window_edges = np.flatnonzero(np.diff(codes)) + 1
+    points = np.concatenate([[0], window_edges - 1, window_edges, [len(values) - 1], steps[1:][reversals]])
+    return np.unique(points)
+
+
+def mage(values: np.ndarray, codes: np.ndarray, std: np.ndarray) -> np.ndarray:
+    """
+    Calculate the mean amplitude of glycemic excursions (MAGE) of every window: the mean amplitude of the rises and
+    falls between peaks and nadirs, once the excursions smaller than the window's standard deviation are removed.
+    Excursions are removed in rounds over all windows at once. Each round removes the excursions smaller than the
+    standard deviation that are the smallest of their two neighbours on either side, merging their peak and nadir into
+    the surrounding (more extreme) peak and nadir.
+    Args:
+        values: numpy array of values, the windows concatenated.
+        codes: Window number of every value, sorted.
+        std: Standard deviation of every window.
+
+    Returns: numpy array of MAGE, one per window (NaN for windows without an excursion).
+
+    """
+    points = turning_points(values, codes)
+    peaks, windows = values[points].astype(np.float64), codes[points]
+    while True:
+        same_window = windows[1:] == windows[:-1]
+        amplitudes = np.where(same_window, np.abs(np.diff(peaks)), np.inf)
+        small = amplitudes < std[windows[:-1]]
+        if not small.any():
+            break
+        # rank the small amplitudes (ties broken by position), an excursion is removed if it ranks below its neighbours
+        ranks = np.empty(len(amplitudes), dtype=np.int64)
+        ranks[np.argsort(np.where(small, amplitudes, np.inf), kind='stable')] = np.arange(len(amplitudes))
+        padded = np.concatenate([[len(ranks)] * 2, ranks, [len(ranks)] * 2])
+        smallest = np.all([ranks < padded[2 + offset:len(padded) - 2 + offset] for offset in [-2, -1, 1, 2]], axis=0)
+        removed = np.flatnonzero(small & smallest)
+
+        first = (removed == 0) | ~np.r_[False, same_window][removed]  # excursion starts the window
+        last = (removed + 2 == len(peaks)) | ~np.r_[same_window, False][removed + 1]  # excursion ends the window
+        keep = np.ones(len(peaks), dtype=bool)
+        keep[removed[first]] = False
+        keep[removed[~first & last] + 1] = False
+        inner = removed[~first & ~last]
+        keep[inner] = False
+        keep[inner + 1] = False
+        # the neighbours of a removed peak and nadir take the more extreme value of the same kind
+        nadirs = peaks[inner + 1] < peaks[inner]
+        np.minimum.at(peaks, inner[nadirs] - 1, peaks[inner[nadirs] + 1])
+        np.maximum.at(peaks, inner[nadirs] + 2, peaks[inner[nadirs]])
+        np.maximum.at(peaks, inner[~nadirs] - 1, peaks[inner[~nadirs] + 1])
+        np.minimum.at(peaks, inner[~nadirs] + 2, peaks[inner[~nadirs]])
+        peaks, windows = peaks[keep], windows[keep]
+
+    same_window = windows[1:] == windows[:-1]
+    excursions = np.abs(np.diff(peaks))[same_window]
+    excursion_windows = windows[:-1][same_window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return segment_sums(excursions, excursion_windows, len(std)) / \
+            np.bincount(excursion_windows, minlength=len(std))
+
+
+def conga(glucose: pd.Series,
+          positions: np.ndarray,
+          codes: np.ndarray,
+          left: np.ndarray,
+          windows: int,
+          hours: float = CONGA_HOURS,
+          tolerance=CONGA_TOLERANCE) -> np.ndarray:
+    """
+    Calculate the continuous overall net glycemic action (CONGA) of every window: the standard deviation of the
+    differences between each observation and the observation n hours earlier, within the same window.
+    The earlier observation is the sample of the window closest to n hours earlier (the samples on either side of it
+    are found with one search of the sorted index), if it is within the tolerance.
+    Args:
+        glucose: pandas Series of glucose data with a sorted DatetimeIndex.
+        positions: Positions in glucose of the (non missing) samples of every window, see glucose.segment_positions().
+        codes: Window number of every position.
+        left: Start offset of each window.
+        windows: Number of windows.
+        hours: Hours between the compared observations.
+        tolerance: Largest difference from exactly n hours earlier, for the earlier observation to match.
+
+    Returns: numpy array of CONGA, one per window.
+
+    """
+    timestamps = glucose.index.values
+    target = timestamps[positions] - pd.Timedelta(hours=hours).to_timedelta64()
+    tolerance = pd.Timedelta(tolerance).to_timedelta64()
+    after = np.maximum(np.searchsorted(timestamps, target, side='left'), left[codes])
+    before = after - 1
+    after_valid = after < positions
+    before_valid = before >= left[codes]
+    closer = timestamps[after] - target >= target - timestamps[np.maximum(before, 0)]
+    earlier = np.where(before_valid & (closer | ~after_valid), before, after)
+    matched = before_valid | after_valid
+    matched[matched] = (np.abs(timestamps[earlier[matched]] - target[matched]) <= tolerance) & \
+        ~np.isnan(glucose.values[earlier[matched]])
+    differences = glucose.values[positions[matched]] - glucose.values[earlier[matched]]
+    return segment_std(differences.astype(np.float64), codes[matched], windows)
+
+
+def window_variability(glucose: pd.Series,
+                       left: np.ndarray,
+                       right: np.ndarray,
+                       keys,
+                       time_label: str = None) -> pd.DataFrame:
+    """
+    Calculate the glycemic variability metrics of windows of glucose data given as offsets
+    (see glucose.window_offsets(), or glucose_grid.GlucoseGrid.offsets() with GlucoseGrid.to_series()).
+    Samples are gathered once per window, and every metric is a segment reduction over all windows at once:
+        - Glucose CV (%): coefficient of variation, standard deviation / mean.
+        - Time in / Above / Below Range (%): share of samples in, above, and below glucose.TARGET_RANGE.
+        - GMI (%): glucose management indicator, 3.31 + 0.02392 * mean glucose (mg/dL).
+        - MAGE (mg/dL): mean amplitude of glycemic excursions, see variability.mage().
+        - CONGA (mg/dL): continuous overall net glycemic action over variability.CONGA_HOURS, see variability.conga().
+        - LBGI, HBGI: low and high blood glucose indices (Kovatchev).
+    Missing (NaN) values are ignored. Windows may overlap.
+    Args:
+        glucose: pandas Series of glucose data with a sorted DatetimeIndex, the offsets refer to.
+        left: Start offset (inclusive) of each window.
+        right: End offset (exclusive) of each window.
+        keys: Index values of the returned DataFrame, one per window.
+        time_label: Optional label, i.e. 'Day' gives 'Glucose CV (%) (Day)'.
+
+    Returns: A pandas DataFrame of variability metrics, one row per window (NaN for windows without glucose data).
+
+    """
+    windows = len(left)
+    positions, codes = gc.segment_positions(left=left, right=right)
+    present = ~np.isnan(glucose.values[positions])
+    positions, codes = positions[present], codes[present]
+    values = glucose.values[positions].astype(np.float64)
+
+    count = np.bincount(codes, minlength=windows)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = segment_sums(values, codes, windows) / count
+        std = segment_std(values, codes, windows)
+        low, high = TARGET_RANGE
+        below = segment_sums((values < low).astype(float), codes, windows) / count * 100
+        above = segment_sums((values > high).astype(float), codes, windows) / count * 100
+
+        risk = 1.509 * (np.log(values) ** 1.084 - 5.381)
+        risk = 10 * risk ** 2 * np.sign(risk)
+        low_index = segment_sums(np.maximum(-risk, 0), codes, windows) / count
+        high_index = segment_sums(np.maximum(risk, 0), codes, windows) / count
+
+    metrics = np.column_stack([std / mean * 100,
+                               100 - below - above,
+                               above,
+                               below,
+                               3.31 + 0.02392 * mean,
+                               mage(values, codes, std),
+                               conga(glucose, positions, codes, np.asarray(left), windows),
+                               low_index,
+                               high_index])
+    labels = list(gc.statistic_labels(time_label=time_label, statistics=dict.fromkeys(VARIABILITY_METRICS)))
+    return pd.DataFrame(metrics, columns=labels, index=pd.Index(keys))
+
+
+def day_variability(glucose: pd.Series, time_label: str = 'Day') -> pd.DataFrame:
+    """
+    Calculate the glycemic variability metrics of every day, see variability.window_variability().
+    Args:
+        glucose: pandas Series of glucose data.
+        time_label: Optional label.
+
+    Returns: A pandas DataFrame of variability metrics indexed on a DatetimeIndex of days.
+
+    """
+    glucose = glucose.sort_index(kind='mergesort')
+    days = gc.day_offsets(glucose)
+    return window_variability(glucose, days.left.values, days.right.values, keys=days.index, time_label=time_label)
+
+
+def sleep_variability(glucose: pd.Series, sleep: pd.DataFrame, time_label: str = 'Sleep') -> pd.DataFrame:
+    """
+    Calculate the glycemic variability metrics of every sleep period, see variability.window_variability().
+    Args:
+        glucose: pandas Series of glucose data.
+        sleep: pandas DataFrame containing sleep data. Required date index, and 'Sleep Start' and 'Sleep End' columns.
+        time_label: Optional label.
+
+    Returns: A pandas DataFrame of variability metrics indexed on sleep date.
+
+    """
+    glucose = glucose.sort_index(kind='mergesort')
+    offsets = gc.sleep_period_offsets(glucose=glucose, sleep=sleep)
+    return window_variability(glucose, offsets.left.values, offsets.right.values, keys=offsets.index,
+                              time_label=time_label)
+
+
+def fast_variability(glucose: pd.Series, start_end: pd.DataFrame, time_label: str = 'Fast') -> pd.DataFrame:
+    """
+    Calculate the glycemic variability metrics of every fast, see variability.window_variability().
+    Args:
+        glucose: pandas Series of glucose data.
+        start_end: A pandas DataFrame of fasts with the start and end datetimes as columns
+                   (output from zero.fasts_start_end()).
+        time_label: Optional label.
+
+    Returns: A pandas DataFrame of variability metrics, indexed like start_end.
+
+    """
+    glucose = glucose.sort_index(kind='mergesort')
+    offsets = gc.period_offsets(glucose, start_end)
+    return window_variability(glucose, offsets.left.values, offsets.right.values, keys=offsets.index,
+                              time_label=time_label)
@@ -1,16 +1,18 @@
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+import fingerprint as fp
 
 
-@st.cache(suppress_st_warning=True)
 def load_whoop_data(sleep_file) -> pd.DataFrame:
     """
     Load a Whoop daily summary CSV file and return a pandas DataFrame version of the file.
     Only read in a subset of columns defined by the expected_cols parameter.
+    Scores are stored as float32, and the index is a DatetimeIndex of days.
     Args:
         sleep_file: file to be converted to a DataFrame.
 
-    Returns: pandas DataFrame of daily Whoop summary data.
+    Returns: pandas DataFrame of daily Whoop summary data, fingerprinted (see fingerprint.attach()).
     """
 
     # TODO: split into 'read' and 'load' functions
@@ -34,20 +36,21 @@ def load_whoop_data(sleep_file) -> pd.DataFrame:
                                 index_col='Date',
                                 usecols=expected_cols
                                 )
-    except ValueError:
-        st.error(f"""
+    except ValueError as error:
+        raise ValueError(f"""
         Incorrect format of Whoop data CSV. Please make sure you uploaded the correct file.
         \nThe following columns must be present in the first row:
         \n {expected_cols}
-        """)
-        raise
+        """) from error
     raw_sleep['Sleep Start'] = raw_sleep['Sleep Start'].astype('datetime64[ms]')
     raw_sleep['Sleep End'] = raw_sleep['Sleep End'].astype('datetime64[ms]')
-    raw_sleep.index = raw_sleep.index.date # change index from datetime to date
-    return raw_sleep
+    scores = raw_sleep.columns.difference(['Sleep Start', 'Sleep End'])
+    raw_sleep[scores] = raw_sleep[scores].astype(np.float32)
+    raw_sleep.index = raw_sleep.index.normalize().rename(None)  # days, kept as datetime64 for native joins
+    return fp.attach(raw_sleep)
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
 def sleep_metrics(whoop_summary: pd.DataFrame) -> pd.DataFrame:
     """
     Get the subset of Whoop summary data relevant to sleep: Strain, Recovery, Sleep Score, Sleep (hr).
@@ -1,8 +1,9 @@
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+import fingerprint as fp
 
 
-@st.cache(suppress_st_warning=True)
 def load_zero_data(fast_file) -> pd.DataFrame:
     """
     Load a Zero Fasting data export CSV file and return a pandas DataFrame version of the file.
@@ -10,7 +11,7 @@ def load_zero_data(fast_file) -> pd.DataFrame:
     Args:
         fast_file: file to be converted to a DataFrame.
 
-    Returns: pandas DataFrame of sleep data.
+    Returns: pandas DataFrame of sleep data, fingerprinted (see fingerprint.attach()).
     """
     expected_cols = ['Date', 'Start', 'End', 'Hours', 'Night Eating']
     try:
@@ -18,18 +19,44 @@ def load_zero_data(fast_file) -> pd.DataFrame:
                             header=0,
                             parse_dates=['Date'],
                             usecols=expected_cols)
-    except ValueError:
-        st.error(f"""
+    except ValueError as error:
+        raise ValueError(f"""
         Incorrect format of fast data CSV. Please make sure you uploaded the correct file.
         \nThe following columns must be present in the first row:
         \n {expected_cols}
-        """)
-        raise
+        """) from error
     fasts = fasts.iloc[::-1].reset_index(drop=True)  # order by oldest to newest
-    return fasts
+    return fp.attach(fasts)
+
+
+# Zero Fasting exports the start and end of fasts as 24 hour clock times, i.e. 19:15
+ZERO_TIME_FORMAT = '%H:%M'
 
 
-@st.cache(suppress_st_warning=True)
+def time_of_day(times: pd.Series, time_format: str = ZERO_TIME_FORMAT) -> pd.Series:
+    """
+    Convert clock time strings to the time elapsed since midnight.
+    Each unique string is parsed once, with the explicit time_format if it matches all times,
+    otherwise the format is inferred. Durations are truncated to whole seconds.
+    Args:
+        times: pandas Series of clock time strings.
+        time_format: Expected strftime format of the times.
+
+    Returns: pandas Series of timedeltas.
+
+    """
+    codes, unique_times = pd.factorize(times)
+    try:
+        parsed = pd.to_datetime(unique_times, format=time_format)
+    except ValueError:
+        parsed = pd.to_datetime(unique_times)
+    unique_durations = (parsed - parsed.normalize()).floor('s')
+    durations = pd.Series(unique_durations.take(codes), index=times.index)
+    durations[codes < 0] = pd.NaT
+    return durations
+
+
+@fp.derived
 def fasts_start_end(fasts: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate the start and end datetimes of each logged fast from a file exported from Zero Fasting.
@@ -39,22 +66,59 @@ def fasts_start_end(fasts: pd.DataFrame) -> pd.DataFrame:
     Returns: A DataFrame with the start and end datetimes as individuals columns.
 
     """
-    start_times = pd.to_datetime(fasts['Start']).dt.strftime('%H:%M:%S')
-    start_times_duration = pd.to_timedelta(start_times)
-    end_times = pd.to_datetime(fasts['End']).dt.strftime('%H:%M:%S')
-    end_times_duration = pd.to_timedelta(end_times)
+    start_times_duration = time_of_day(fasts['Start'])
+    end_times_duration = time_of_day(fasts['End'])
     start_dates = fasts.Date
     start_dt = (start_dates + start_times_duration).rename('start_dt')
-    end_dates = (start_dt + pd.to_timedelta(fasts.Hours, 'H')).dt.date
-    end_dt = (pd.to_datetime(end_dates) + end_times_duration).rename('end_dt')
+    end_dates = (start_dt + pd.to_timedelta(fasts.Hours, 'h')).dt.floor('D')
+    end_dt = (end_dates + end_times_duration).rename('end_dt')
     start_end = pd.concat([start_dt, end_dt], axis=1)
     return start_end
 
 
-@st.cache(suppress_st_warning=True)
+def split_fasts_by_day(start_end: pd.DataFrame) -> pd.DataFrame:
+    """
+    Split every fast into the calendar days it covers, i.e. a 36 hour fast starting at 20:00 is split into
+    4 hours (start day), 24 hours (second day), and 8 hours (end day).
+    Fasts are expanded into per-day segments with numpy repeat/cumsum, without iterating over the fasts.
+    Fasts with a missing start or end datetime are skipped.
+    Args:
+        start_end: A pandas DataFrame of fasts with the start and end datetimes as columns
+                   (output from zero.fasts_start_end()).
+
+    Returns: A pandas DataFrame with one row per fast per day. Columns:
+                - fast: index value of the fast in start_end.
+                - date: calendar day of the segment.
+                - hours: hours fasted during the calendar day.
+                - elapsed_hours: consecutive hours fasted from the start of the fast to the end of the segment.
+
+    """
+    valid = start_end.start_dt.notna() & start_end.end_dt.notna() & (start_end.end_dt >= start_end.start_dt)
+    fasts = start_end[valid]
+    start_dt = fasts.start_dt.values
+    end_dt = fasts.end_dt.values
+    start_days = fasts.start_dt.dt.floor('D').values
+    day_counts = ((fasts.end_dt.dt.floor('D').values - start_days) // np.timedelta64(1, 'D')).astype(np.int64) + 1
+
+    fast_positions = np.repeat(np.arange(len(fasts)), day_counts)
+    day_numbers = np.arange(day_counts.sum()) - np.repeat(np.cumsum(day_counts) - day_counts, day_counts)
+    dates = start_days[fast_positions] + day_numbers * np.timedelta64(1, 'D')
+    segment_start = np.maximum(dates, start_dt[fast_positions])
+    segment_end = np.minimum(dates + np.timedelta64(1, 'D'), end_dt[fast_positions])
+
+    days = pd.DataFrame({'fast': fasts.index.values[fast_positions],
+                         'date': dates,
+                         'hours': (segment_end - segment_start) / np.timedelta64(1, 'h'),
+                         'elapsed_hours': (segment_end - start_dt[fast_positions]) / np.timedelta64(1, 'h')})
+    return days
+
+
+@fp.derived
 def date_durations(start_end: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate the durations of each fast, broken down by day (start and end days).
+    Fasts of any length are supported, the hours of days in between the start and end day
+    are available from zero.split_fasts_by_day().
 
     Args:
         start_end: A pandas DataFrame of fasts with the start and end datetimes as columns
@@ -63,18 +127,16 @@ def date_durations(start_end: pd.DataFrame) -> pd.DataFrame:
     Returns: A pandas DataFrame of fasts durations: start date duration, end date duration, total duration.
 
     """
-
-    # TODO calculate for fasts longer than 24 hours
-
-    start_duration = pd.Timedelta(24, 'h') - pd.to_timedelta(start_end.start_dt.dt.strftime('%H:%M:%S'))
-    end_duration = pd.to_timedelta(start_end.end_dt.dt.strftime('%H:%M:%S'))
-    start_hours = (start_duration / pd.Timedelta(1, 'h')).rename('start_hours')
-    end_hours = (end_duration / pd.Timedelta(1, 'h')).rename('end_hours')
+    days = split_fasts_by_day(start_end)
+    fast_days = days.groupby('fast', sort=False).hours
+    start_hours = fast_days.first().reindex(start_end.index).rename('start_hours')
+    end_hours = fast_days.last().reindex(start_end.index).rename('end_hours')
     total_hours = ((start_end.end_dt - start_end.start_dt) / pd.Timedelta('1H')).rename('total_hours')
     durations = pd.concat([start_hours, end_hours, total_hours], axis=1)
     return durations
 
 
+@fp.derived
 def fasts_details(fasts: pd.DataFrame) -> pd.DataFrame:
     """
     Combine outputs from zero.fasts_start_end() and zero.date_durations() for a detailed dataset on the fasts.
@@ -90,41 +152,38 @@ def fasts_details(fasts: pd.DataFrame) -> pd.DataFrame:
     return details
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
 def fast_cumulative_consecutive(details: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate cumulative and consecutive hours of fasts for each day in a fast_details dataset.
     Args:
-        details: DataFrame containing the durations for the start and end day of fasts, output from zero.fast_details().
+        details: DataFrame containing the start and end datetimes of fasts, output from zero.fast_details().
 
-    Returns: A pandas DataFrame with the cumulative and consecutive hours of fasts for each day.
-             There are potentially 2 fasts occurring in a single day (one ends and another starts).
+    Returns: A float32 pandas DataFrame with the cumulative and consecutive hours of fasts for each day, indexed on a
+             DatetimeIndex of days. There are potentially 2 fasts occurring in a single day (one ends and another starts).
+             Fasts longer than 24 hours count towards every day they cover.
                 - Cumulative fast hours is the sum of hours fasted throughout the day.
                 - Consecutive fast hours is the maximum consecutive hours fasted up until the end of the day.
                     - This can include hours from previous day if it carries over to current day.
 
     """
-    first_date = details.start_dt[0].date()
-    last_date = details.end_dt.iat[-1].date()
-    all_fast_dates = pd.date_range(start=first_date, end=last_date, freq='1D').date  # create dates not datetime
-    stats = pd.DataFrame({'Fast (cumulative hours)': 0, 'Fast (consecutive hours)': 0}, index=all_fast_dates,
-                         dtype=float)
-    for index, fast in details.iterrows():
-        start_date = fast["start_dt"].date()
-        end_date = fast["end_dt"].date()
-        stats.at[start_date, 'Fast (cumulative hours)'] += fast['start_hours']
-        stats.at[start_date, 'Fast (consecutive hours)'] = max(fast['start_hours'],
-                                                               stats.at[start_date, 'Fast (consecutive hours)'])
-        stats.at[end_date, 'Fast (cumulative hours)'] += fast['end_hours']
-        stats.at[end_date, 'Fast (consecutive hours)'] = max(fast['total_hours'],
-                                                             stats.at[end_date, 'Fast (consecutive hours)'])
+    days = split_fasts_by_day(details)
+    all_fast_dates = pd.date_range(start=days.date.min(), end=days.date.max(), freq='1D')
+
+    # a day's hours can come from multiple fasts (one ends and another starts)
+    cumulative = days.hours.groupby(days.date).sum()
+    consecutive = days.elapsed_hours.groupby(days.date).max()
+
+    stats = pd.DataFrame({'Fast (cumulative hours)': cumulative.reindex(all_fast_dates, fill_value=0),
+                          'Fast (consecutive hours)': consecutive.reindex(all_fast_dates, fill_value=0)},
+                         dtype=np.float32)
     return stats
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
 def fasts_binned(cumulative_consecutive: pd.DataFrame) -> pd.DataFrame:
     """
-    Bin consecutive and cumulative fasting hours stats from 0-12, 13-15, 16-18, 18+ hours, 
+    Bin consecutive and cumulative fasting hours stats from 0-12, 13-15, 16-18, 18+ hours (no upper limit),
     as well as a fasting benchmark (fasts? yes/no) cumulative hours by binning from 0-12, and 13+ hours.
     Args:
         cumulative_consecutive: Output from zero.fast_day_stats().
@@ -133,22 +192,22 @@ def fasts_binned(cumulative_consecutive: pd.DataFrame) -> pd.DataFrame:
 
     """
     consecutive_binned = pd.cut(x=cumulative_consecutive['Fast (consecutive hours)'],
-                                bins=[-1, 12, 15, 18, 24],
+                                bins=[-1, 12, 15, 18, np.inf],
                                 labels=['0-12 hours', '13-15 hours', '16-18 hours', '18+ hours']).\
         rename('Fast Binned (consecutive hours)')
     cumulative_binned = pd.cut(x=cumulative_consecutive['Fast (cumulative hours)'],
-                               bins=[-1, 12, 15, 18, 24],
+                               bins=[-1, 12, 15, 18, np.inf],
                                labels=['0-12 hours', '13-15 hours', '16-18 hours', '18+ hours']).\
         rename('Fast Binned (cumulative hours)')
     fast = pd.cut(x=cumulative_consecutive['Fast (cumulative hours)'],
-                  bins=[-1, 12, 24],
+                  bins=[-1, 12, np.inf],
                   labels=['No', 'Yes']).rename('Fast')
 
     binned_fasts = pd.concat([consecutive_binned, cumulative_binned, fast], axis=1)
     return binned_fasts
 
 
-@st.cache(suppress_st_warning=True)
+@fp.derived
 def all_fasts_stats(fasts: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate the daily cumulative and consecutive fasts durations and bin the fasts.
@@ -0,0 +1,5 @@
+import pathlib
+import sys
+
+# The app runs from src/ and its modules import each other by name (i.e. import glucose as gc)
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'src'))
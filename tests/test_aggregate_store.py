@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src import aggregate_store as ag
+from src import glucose as gc
+from tests.test_glucose import make_glucose, make_sleep
+
+
+def test_window_aggregates():
+    glucose = pd.Series([1.0, 2.0, 4.0, 8.0])
+    aggregates = ag.window_aggregates(glucose, left=np.array([0, 1]), right=np.array([3, 2]), keys=['a', 'b'])
+    assert aggregates.loc['a'].tolist() == [3, 7, 21, 1, 4]
+    assert aggregates.loc['b'].tolist() == [1, 2, 4, 2, 2]
+
+
+def test_aggregate_store_matches_full_recompute(tmp_path):
+    glucose = make_glucose(days=20)
+    sleep = make_sleep(days=20)
+    ag.AggregateStore(path=tmp_path).update(glucose=glucose.iloc[:1000], sleep=sleep)
+
+    store = ag.AggregateStore(path=tmp_path)  # reload persisted aggregates
+    updated = store.update(glucose=glucose, sleep=sleep)
+    assert updated == {'Day': 9, 'Sleep': 9}  # partially uploaded day and sleep period, plus the new ones
+    assert store.update(glucose=glucose, sleep=sleep) == {'Day': 0, 'Sleep': 0}
+
+    pd.testing.assert_frame_equal(store.stats('Day'), gc.day_glucose_stats(glucose))
+    pd.testing.assert_frame_equal(store.stats('Sleep'), gc.sleep_glucose_stats(glucose, sleep))
+
+
+def test_aggregate_store_keeps_complete_windows_on_overlapping_upload():
+    glucose = make_glucose(days=27)
+    sleep = make_sleep(days=27)
+    store = ag.AggregateStore()
+    store.update(glucose=glucose[:'2020-08-20'], sleep=sleep)
+
+    # re-upload starting mid-day, cutting the day and the sleep period of 2020-08-07, with 7 new days
+    updated = store.update(glucose=glucose['2020-08-07 23:30':], sleep=sleep)
+    assert updated['Day'] == 7
+    pd.testing.assert_frame_equal(store.stats('Day'), gc.day_glucose_stats(glucose))
+    pd.testing.assert_frame_equal(store.stats('Sleep'), gc.sleep_glucose_stats(glucose, sleep))
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from src import assets
+from src import fingerprint
+
+
+def test_sample_dataset_parsed_once():
+    assets.sample_dataset.cache_clear()
+    sample = assets.sample_dataset()
+    assert assets.sample_dataset() is sample
+    assert assets.sample_dataset.cache_info().misses == 1
+    assert pd.api.types.is_datetime64_any_dtype(sample.Date)
+    pd.testing.assert_frame_equal(sample.select_dtypes('number'), sample.select_dtypes('number').round(2))
+    assert fingerprint.fingerprint(sample) == fingerprint.content_fingerprint(sample)
+
+
+def test_markdown_and_images_cached():
+    assert assets.markdown('welcome.md') is assets.markdown('welcome.md')
+    assert assets.markdown.cache_info().maxsize == assets.ASSET_CACHE_SIZE
+    pytest.importorskip('PIL')
+    image = assets.image('me.jpeg')
+    assert assets.image('me.jpeg') is image
+    assert image.size[0] > 0
@@ -0,0 +1,82 @@
+import pandas as pd
+
+from src import batch
+from src import glucose
+from src import utilities
+from src import whoop
+
+
+def write_exports(user_dir, days: int = 5):
+    user_dir.mkdir()
+    dates = pd.date_range('2020-08-01', periods=days)
+    sleep_start = dates - pd.Timedelta(hours=1)
+    pd.DataFrame({'Date': dates, 'Strain': 10.0, 'Recovery': range(days), 'Sleep Score': 80.0, 'RHR': 55,
+                  'Average HR': 60, 'Max HR': 150, 'Respiratory Rate': 15.0, 'HRV (ms)': 60.0,
+                  'Sleep (hr)': 7.5, 'Sleep Start': sleep_start, 'Sleep End': sleep_start + pd.Timedelta(hours=8)}
+                 ).to_csv(user_dir / 'whoop.csv', index=False)
+    pd.DataFrame({'Date': dates, 'Metabolic Score': range(days)}).to_csv(user_dir / 'levels.csv', index=False)
+    pd.DataFrame({'Date': dates.strftime('%m/%d/%y'), 'Start': '20:00', 'End': '12:00', 'Hours': 16,
+                  'Night Eating': 0}).iloc[::-1].to_csv(user_dir / 'zero.csv', index=False)
+
+
+def test_run_batch(tmp_path):
+    input_dir = tmp_path / 'exports'
+    input_dir.mkdir()
+    write_exports(input_dir / 'user_a')
+    write_exports(input_dir / 'user_b')
+    (input_dir / 'user_c').mkdir()  # missing exports
+
+    timings = batch.run_batch(input_dir, tmp_path / 'metrics', workers=2)
+    assert list(timings.User) == ['user_a', 'user_b', 'user_c']
+    assert list(timings.Status[:2]) == ['ok', 'ok'] and timings.Status[2].startswith('error')
+
+    combined = pd.read_parquet(tmp_path / 'metrics' / 'metrics.parquet')
+    user_a = pd.read_parquet(tmp_path / 'metrics' / 'users' / 'user_a.parquet')
+    assert len(combined) == 2 * len(user_a) > 0
+    assert set(combined.User) == {'user_a', 'user_b'}
+
+
+def write_glucose_export(user_dir, days: int = 5, timezone: str = 'UTC'):
+    export = pd.DataFrame({'Device': 'FreeStyle LibreLink',
+                           'Device Timestamp': pd.date_range('2020-08-01', periods=days * 96, freq='15min')
+                                                 .strftime('%m-%d-%Y %I:%M %p'),
+                           'Record Type': 0,
+                           'Historic Glucose mg/dL': [90.0, 110.0, 130.0] * (days * 32)})
+    (user_dir / 'glucose.csv').write_text('Glucose Data,Generated on,08-10-2020\n' + export.to_csv(index=False))
+    if timezone:
+        (user_dir / batch.TIMEZONE_FILE).write_text(timezone + '\n')
+
+
+def test_run_batch_glucose_incremental(tmp_path):
+    input_dir = tmp_path / 'exports'
+    input_dir.mkdir()
+    write_exports(input_dir / 'user_a', days=8)
+    write_glucose_export(input_dir / 'user_a', days=5)
+    write_exports(input_dir / 'user_b')  # no glucose export
+
+    timings = batch.run_batch(input_dir, tmp_path / 'metrics', workers=1)
+    assert list(timings['Glucose Days']) == [5, 0]
+    assert (tmp_path / 'metrics' / 'glucose' / 'stores' / 'user_a' / 'day.feather').exists()
+
+    write_glucose_export(input_dir / 'user_a', days=8)  # longer export, only the new days are aggregated
+    timings = batch.run_batch(input_dir, tmp_path / 'metrics', workers=1)
+    assert list(timings.Status) == ['ok', 'ok']
+    incremental = pd.read_parquet(tmp_path / 'metrics' / 'glucose' / 'user_a.parquet')
+    full = utilities.create_raw_analysis_dataset(
+        sleep=whoop.load_whoop_data(input_dir / 'user_a' / 'whoop.csv'),
+        glucose=glucose.load_glucose_data(input_dir / 'user_a' / 'glucose.csv', timezone='UTC'))
+    pd.testing.assert_frame_equal(incremental, full, check_dtype=False, check_index_type=False)
+
+
+def test_run_batch_glucose_requires_timezone(tmp_path):
+    input_dir = tmp_path / 'exports'
+    input_dir.mkdir()
+    write_exports(input_dir / 'user_a')
+    write_glucose_export(input_dir / 'user_a', timezone=None)
+
+    timings = batch.run_batch(input_dir, tmp_path / 'metrics', workers=1)
+    assert 'No timezone' in timings.Status[0]
+    assert not (tmp_path / 'metrics' / 'glucose' / 'stores' / 'user_a').exists()
+
+    timings = batch.run_batch(input_dir, tmp_path / 'metrics', workers=1, timezone='UTC')
+    assert list(timings.Status) == ['ok'] and list(timings['Glucose Days']) == [5]
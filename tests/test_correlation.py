@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from src import correlation as corr
+from src import utilities
+
+SAMPLE_PATH = utilities.SRC_PATH / 'sample.csv'
+
+
+def make_dataset(rows: int = 200, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dataset = pd.DataFrame(rng.normal(1000, 5, (rows, 4)), columns=['a', 'b', 'c', 'd'])
+    dataset['b'] += dataset.a
+    dataset = dataset.mask(rng.random(dataset.shape) < 0.2)  # pairwise missing values
+    dataset['constant'] = 3.0
+    dataset['label'] = 'text'
+    return dataset
+
+
+def test_correlation_engine_matches_pandas():
+    dataset = make_dataset()
+    expected = dataset.drop(columns=['label']).corr()
+    pd.testing.assert_frame_equal(corr.CorrelationEngine(dataset).matrix(), expected, atol=1e-10)
+
+
+def test_correlation_engine_incremental_updates():
+    dataset = make_dataset()
+    engine = corr.CorrelationEngine(dataset.iloc[:50, :2])
+    engine.update(dataset.iloc[:120])  # add columns, then append rows
+    engine.update(dataset)
+    expected = dataset.drop(columns=['label']).corr()
+    pd.testing.assert_frame_equal(engine.matrix(columns=list(expected.columns)), expected, atol=1e-10)
+
+
+def test_correlation_engine_cached_by_fingerprint():
+    dataset = make_dataset()
+    assert corr.correlation_engine(dataset) is corr.correlation_engine(dataset.copy())
+    assert corr.correlation_engine(dataset) is not corr.correlation_engine(dataset.iloc[1:])
+
+
+def test_correlation_engine_extends_previous_version(monkeypatch):
+    corr._engines.clear()
+    dataset = make_dataset()
+    first = corr.correlation_engine(dataset.iloc[:150])
+    before = first.matrix()
+    appended = []
+    append = corr.CorrelationEngine.append
+    monkeypatch.setattr(corr.CorrelationEngine, 'append', lambda engine, rows: appended.append(len(rows)) or
+                        append(engine, rows))
+
+    engine = corr.correlation_engine(dataset)
+    assert engine is not first and appended == [len(dataset) - 150]  # only the new rows are accumulated
+    expected = dataset.drop(columns=['label']).corr()
+    pd.testing.assert_frame_equal(engine.matrix(columns=list(expected.columns)), expected, atol=1e-10)
+    pd.testing.assert_frame_equal(first.matrix(), before)
+
+    changed = dataset.copy()
+    changed.iloc[0, 0] += 1
+    assert not engine.extends(changed)
+
+
+def test_corr_matrix_sample():
+    sample = pd.read_csv(SAMPLE_PATH, parse_dates=['Date'], index_col=0)
+    expected = sample.drop(columns=['Date']).select_dtypes('number').corr()
+    pd.testing.assert_frame_equal(utilities.corr_matrix(sample, date_column='Date'), expected, atol=1e-10)
+    long = utilities.corr_matrix_long(sample, date_column='Date')
+    assert list(long.columns) == ['x', 'y', 'correlation'] and len(long) == expected.size
+
+
+def make_blocks(rows: int = 300, seed: int = 0) -> pd.DataFrame:
+    """Two independent blocks of correlated columns, interleaved: block 'p' (p0, p1, ...) and block 'q'."""
+    rng = np.random.default_rng(seed)
+    p, q = rng.normal(0, 1, (2, rows))
+    columns = {}
+    for i in range(4):
+        columns[f'p{i}'] = p * (-1) ** i + rng.normal(0, 0.3 + 0.1 * i, rows)
+        columns[f'q{i}'] = q + rng.normal(0, 0.3 + 0.1 * i, rows)
+    return pd.DataFrame(columns).mask(rng.random((rows, 8)) < 0.1)
+
+
+def test_cluster_order_groups_correlated_columns():
+    order = corr.CorrelationEngine(make_blocks()).cluster_order()
+    assert sorted(order) == sorted(make_blocks().columns)
+    blocks = [column[0] for column in order]
+    assert blocks == sorted(blocks) or blocks == sorted(blocks, reverse=True)  # each block is contiguous
+
+
+def test_top_pairs_match_pandas():
+    dataset = make_blocks()
+    engine = corr.CorrelationEngine(dataset)
+    top = engine.top_pairs(k=5)
+    expected = dataset.corr().where(np.triu(np.ones((8, 8), dtype=bool), k=1)).stack()
+    expected = expected.reindex(expected.abs().sort_values(ascending=False).index)[:5]
+    assert list(zip(top.x, top.y)) == list(expected.index)
+    np.testing.assert_allclose(top.correlation, expected.values)
+    assert list(top.n) == [dataset[[x, y]].dropna().shape[0] for x, y in zip(top.x, top.y)]
+    assert engine.top_pairs(k=5) is not engine.top_pairs(k=5)  # copies of the cached index
+
+    engine.append(dataset.iloc[:10].set_axis(range(300, 310)))  # new rows invalidate the index
+    assert not engine._summaries
+
+
+def test_clustered_corr_matrix_reduced_and_reordered():
+    dataset = make_blocks().assign(noise=np.random.default_rng(1).normal(0, 1, 300), Date='2020-08-01')
+    matrix = utilities.clustered_corr_matrix(dataset, date_column='Date', max_columns=8)
+    assert 'noise' not in matrix.columns and list(matrix.index) == list(matrix.columns)
+    pd.testing.assert_frame_equal(matrix, dataset.drop(columns=['Date']).corr().loc[matrix.index, matrix.columns],
+                                  atol=1e-10)
+    pairs = utilities.top_correlated_pairs(dataset, date_column='Date', k=3)
+    assert len(pairs) == 3 and pairs.correlation.abs().is_monotonic_decreasing
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from src import downsample as ds
+from tests.test_glucose import make_glucose
+
+
+def reference_lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> list:
+    """Reference LTTB, one point at a time."""
+    every = (len(x) - 2) / (threshold - 2)
+    selected, previous = [0], 0
+    for bucket in range(threshold - 2):
+        start, end = int(np.floor(bucket * every)) + 1, int(np.floor((bucket + 1) * every)) + 1
+        next_end = min(int(np.floor((bucket + 2) * every)) + 1, len(x))
+        mean_x, mean_y = np.mean(x[end:next_end]), np.mean(y[end:next_end])
+        areas = [abs((x[previous] - mean_x) * (y[i] - y[previous]) - (x[previous] - x[i]) * (mean_y - y[previous]))
+                 for i in range(start, end)]
+        previous = start + int(np.argmax(areas))
+        selected.append(previous)
+    return selected + [len(x) - 1]
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(1, 2, 1000))
+    y = np.cumsum(rng.normal(0, 1, 1000))
+    for threshold in [3, 10, 99, 500]:
+        np.testing.assert_array_equal(ds.lttb_indices(x, y, threshold), reference_lttb(x, y, threshold))
+    np.testing.assert_array_equal(ds.lttb_indices(x, y, 2000), np.arange(1000))
+
+
+def test_minmax_keeps_bucket_extremes():
+    rng = np.random.default_rng(0)
+    y = rng.normal(100, 15, 10_001)
+    selected = ds.minmax_indices(y, 100)
+    assert len(selected) <= 200 and np.all(np.diff(selected) > 0)
+    assert y.argmax() in selected and y.argmin() in selected
+    edges = np.linspace(0, len(y), 101).astype(int)
+    np.testing.assert_array_equal(np.unique(np.digitize(selected, edges[1:-1])), np.arange(100))
+
+
+def test_downsample_range_and_gaps():
+    glucose = make_glucose(days=60)
+    points = ds.downsample(glucose, max_points=500)
+    assert len(points) <= 500 + glucose.isna().sum() and points.index.is_monotonic_increasing
+    assert glucose.idxmax() in points.index and glucose.idxmin() in points.index
+
+    gappy = glucose.reindex(pd.date_range(glucose.index[0], glucose.index[-1], freq='15min'))
+    points = ds.downsample(gappy, max_points=500, method='lttb')
+    assert points.isna().sum() == (gappy.isna() & gappy.shift(fill_value=0).notna()).sum()  # one break per gap
+
+    start, end = glucose.index[100], glucose.index[300]
+    zoomed = ds.downsample(glucose, max_points=500, start=start, end=end)
+    pd.testing.assert_series_equal(zoomed, glucose[start:end])
@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import fingerprint as fp
+from src import levels
+from src import upload_cache as uc
+from src import utilities
+from src import whoop
+from src import zero
+from tests.test_batch import write_exports
+
+
+def test_loaded_frames_are_fingerprinted_once(tmp_path, monkeypatch):
+    write_exports(tmp_path / 'user', days=30)
+    fasts = zero.load_zero_data(tmp_path / 'user' / 'zero.csv')
+    whoop_summary = whoop.load_whoop_data(tmp_path / 'user' / 'whoop.csv')
+    metabolic_scores = levels.load_levels_data(tmp_path / 'user' / 'levels.csv')
+    assert fp.fingerprint(fasts) == fp.content_fingerprint(fasts)
+
+    # derived frames are stamped from their inputs, the data is not hashed again
+    monkeypatch.setattr(zero.fp, 'content_fingerprint', lambda data: pytest.fail('content hashed'))
+    stats = zero.all_fasts_stats(fasts)
+    assert zero.fp.fingerprint(stats) == zero.fp.fingerprint(zero.all_fasts_stats(fasts))
+    assert zero.fp.fingerprint(zero.fasts_binned(stats)) != zero.fp.fingerprint(stats)
+    metrics = utilities.create_metrics_dataset(sleep_scores=whoop.sleep_metrics(whoop_summary),
+                                               metabolic_scores=metabolic_scores,
+                                               fasting_scores=stats)
+    utilities.corr_matrix(metrics, date_column='Date')
+
+
+def test_fingerprint_ignores_propagated_attrs():
+    dataset = fp.attach(pd.DataFrame({'a': np.arange(10.0), 'b': np.arange(10.0) ** 2}))
+    assert dataset.iloc[1:].attrs  # pandas propagates attrs to derived frames
+    assert fp.fingerprint(dataset.iloc[1:]) == fp.content_fingerprint(dataset.iloc[1:])
+    assert fp.fingerprint(dataset / 2) == fp.content_fingerprint(dataset / 2)
+    assert fp.fingerprint(dataset.copy()) == fp.fingerprint(dataset)
+
+    without = fp.without_columns(dataset, ['b'])
+    assert list(without.columns) == ['a']
+    assert fp.fingerprint(without) != fp.content_fingerprint(without)
+    assert fp.fingerprint(without) == fp.fingerprint(fp.without_columns(dataset.copy(), ['b']))
+
+
+def test_upload_cache_fingerprints_with_key(tmp_path):
+    cache = uc.UploadCache(path=tmp_path)
+    raw = b"Date,Metabolic Score\n2020-08-01,55.1\n2020-08-02,64.6\n"
+    first = cache.load(pd.read_csv, io.BytesIO(raw))
+    second = cache.load(pd.read_csv, io.BytesIO(raw))
+    assert fp.fingerprint(first) == fp.fingerprint(second) == uc.UploadCache.key(raw, pd.read_csv)
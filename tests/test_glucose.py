@@ -0,0 +1,128 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from src import glucose as gc
+
+
+def make_glucose(days: int = 10, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2020-08-01', periods=days * 96, freq='15min', name='Timestamp')
+    index = index[rng.random(len(index)) > 0.1]  # drop samples to create gaps
+    return pd.Series(rng.normal(100, 15, len(index)), index=index, name='Glucose (mg/dL)')
+
+
+def make_sleep(days: int = 10) -> pd.DataFrame:
+    dates = pd.date_range('2020-07-30', periods=days + 4, freq='1D')
+    sleep_start = dates + pd.Timedelta(hours=23)
+    sleep = pd.DataFrame({'Sleep Start': sleep_start,
+                          'Sleep End': sleep_start + pd.Timedelta(hours=8)},
+                         index=dates)
+    sleep.iloc[3, 0] = pd.NaT
+    return sleep
+
+
+def masked_sleep_groups(glucose: pd.Series, sleep: pd.DataFrame) -> dict:
+    groups = {}
+    for day in sleep.index[sleep.index.isin(glucose.index.floor('D'))]:
+        period = (glucose.index >= sleep.loc[day]['Sleep Start']) & (glucose.index <= sleep.loc[day]['Sleep End'])
+        if period.any():
+            groups[day] = glucose[period]
+    return groups
+
+
+def test_window_offsets_inclusive_bounds():
+    glucose = make_glucose(days=1)
+    left, right = gc.window_offsets(glucose, start=[glucose.index[2], pd.NaT], end=[glucose.index[5], glucose.index[9]])
+    assert list(left[:1]) == [2] and list(right[:1]) == [6]
+    assert left[1] == right[1]
+
+
+def test_segment_positions():
+    positions, codes = gc.segment_positions(left=np.array([2, 0, 5]), right=np.array([4, 3, 5]))
+    assert list(positions) == [2, 3, 0, 1, 2]
+    assert list(codes) == [0, 0, 1, 1, 1]
+
+
+def test_create_glucose_sleep_groups_matches_masking():
+    glucose = make_glucose()
+    sleep = make_sleep()
+    for upload in [glucose, glucose.sample(frac=1, random_state=1)]:  # sorted and unsorted uploads
+        expected = masked_sleep_groups(upload, sleep)
+        groups = gc.create_glucose_sleep_groups(glucose=upload, sleep=sleep)
+        assert list(groups) == list(expected)
+        for day, sleeping_glucose in expected.items():
+            pd.testing.assert_series_equal(groups[day], sleeping_glucose)
+
+
+def test_label_sleep_periods():
+    glucose = make_glucose()
+    sleep = make_sleep()
+    labels = gc.label_sleep_periods(glucose=glucose, sleep=sleep)
+    for day, sleeping_glucose in masked_sleep_groups(glucose, sleep).items():
+        assert labels.index[labels == day].equals(sleeping_glucose.index)
+
+
+def test_glucose_stats_labels():
+    stats = gc.glucose_stats(make_glucose(days=1), time_label='Day')
+    assert list(stats.index) == ['Glucose Mean (Day)', 'Glucose Volatility (Day)',
+                                 'Glucose Minimum (Day)', 'Glucose Maximum (Day)']
+
+
+def test_grouped_glucose_stats_matches_per_group_stats():
+    day_groups = gc.create_glucose_day_groups(make_glucose())
+    expected = pd.DataFrame.from_dict({day: gc.glucose_stats(glucose, time_label='Day')
+                                       for day, glucose in day_groups.items()}, orient='index')
+    pd.testing.assert_frame_equal(gc.grouped_glucose_stats(day_groups, time_label='Day'), expected)
+
+
+def test_grouped_glucose_stats_custom_statistics():
+    day_groups = gc.create_glucose_day_groups(make_glucose())
+    stats = gc.grouped_glucose_stats(day_groups, statistics={'Glucose Median': 'median', 'Samples': 'count'})
+    assert list(stats.columns) == ['Glucose Median', 'Samples']
+    assert stats['Samples'].sum() == sum(len(glucose) for glucose in day_groups.values())
+
+
+def test_day_and_sleep_glucose_stats_match_groups():
+    glucose = make_glucose()
+    sleep = make_sleep()
+    pd.testing.assert_frame_equal(gc.day_glucose_stats(glucose),
+                                  gc.grouped_glucose_stats(gc.create_glucose_day_groups(glucose), time_label='Day'))
+    pd.testing.assert_frame_equal(gc.sleep_glucose_stats(glucose, sleep),
+                                  gc.grouped_glucose_stats(gc.create_glucose_sleep_groups(glucose, sleep),
+                                                           time_label='Sleep'))
+
+
+def test_stream_glucose_data_matches_read_csv():
+    export = pd.DataFrame({'Device': 'FreeStyle LibreLink',
+                           'Device Timestamp': pd.date_range('2020-11-01', periods=40, freq='15min')
+                                                 .strftime('%m-%d-%Y %I:%M %p'),
+                           'Record Type': [0, 1, 0, 6] * 10,
+                           'Historic Glucose mg/dL': np.arange(40.0)})
+    raw = 'Glucose Data,Generated on,11-02-2020\n' + export.to_csv(index=False)
+    glucose = gc.load_glucose_data(io.StringIO(raw), timezone='US/Eastern')
+    streamed = gc.load_glucose_data(io.StringIO(raw), timezone='US/Eastern', chunksize=7)
+    assert streamed.dtype == np.float32
+    pd.testing.assert_series_equal(streamed, glucose, check_dtype=False, check_index_type=False)
+
+
+def test_period_glucose_stats_overlapping_windows():
+    glucose = make_glucose()
+    meals = pd.Series(pd.to_datetime(['2020-08-02 08:00', '2020-08-02 09:00', '2020-08-05 12:30', '2020-09-01 12:00']),
+                      index=['breakfast', 'snack', 'lunch', 'no data'])
+    windows = gc.set_duration_start_end(meals, duration_minutes=120)
+    assert (windows.end_dt - windows.start_dt == pd.Timedelta('2h')).all()
+
+    stats = gc.period_glucose_stats(glucose.sample(frac=1, random_state=0), windows, time_label='Meal')
+    groups = gc.period_group_glucose(glucose, windows)
+    assert list(groups) == ['breakfast', 'snack', 'lunch']
+    for key, window in windows.iterrows():
+        masked = glucose[(glucose.index >= window.start_dt) & (glucose.index <= window.end_dt)]
+        if masked.empty:
+            assert gc.sub_period_glucose(glucose, window.start_dt, window.end_dt) is None
+            assert stats.loc[key].isna().all()
+            continue
+        pd.testing.assert_series_equal(groups[key], masked)
+        pd.testing.assert_series_equal(gc.sub_period_glucose(glucose, window.start_dt, window.end_dt), masked)
+        pd.testing.assert_series_equal(stats.loc[key], gc.glucose_stats(masked, time_label='Meal'), check_names=False)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from src import glucose as gc
+from src import glucose_grid as gg
+from tests.test_glucose import make_glucose, make_sleep
+
+
+def test_from_series_snaps_and_interpolates():
+    index = pd.to_datetime(['2020-08-01 00:01', '2020-08-01 00:14', '2020-08-01 00:29',
+                            '2020-08-01 01:00', '2020-08-01 02:00'])
+    glucose = pd.Series([100.0, 110.0, 120.0, 150.0, 90.0], index=index)
+    grid = gg.GlucoseGrid.from_series(glucose, step='15min', interpolation_limit=1)
+    assert grid.values.dtype == np.float32
+    assert grid.index[0] == pd.Timestamp('2020-08-01 00:00')
+    # 00:01 -> 00:00, 00:14 -> 00:15, 00:29 -> 00:30, one missing slot at 00:45 is interpolated
+    np.testing.assert_allclose(grid.values[:5], [100, 110, 120, 135, 150])
+    assert np.isnan(grid.values[5:8]).all() and grid.values[8] == 90  # 3 missing slots, above the limit
+    assert grid.interpolated == 1
+
+    summary = grid.summary()
+    assert summary['slots'] == 9 and summary['measured'] == 5 and summary['gaps'] == 1
+    assert summary['longest_gap'] == pd.Timedelta('45min')
+
+
+def test_offsets_match_window_offsets():
+    glucose = make_glucose()
+    grid = gg.GlucoseGrid.from_series(glucose, interpolation_limit=0)
+    sleep = make_sleep()
+    left, right = grid.offsets(sleep['Sleep Start'], sleep['Sleep End'])
+    expected = gc.window_offsets(grid.to_series(), start=sleep['Sleep Start'], end=sleep['Sleep End'])
+    np.testing.assert_array_equal(left, expected[0])
+    np.testing.assert_array_equal(right, expected[1])
+
+    window = grid.window(sleep['Sleep Start'].iloc[5], sleep['Sleep End'].iloc[5])
+    assert np.shares_memory(window, grid.values) and len(window) == 33
+
+
+def test_coverage_stats():
+    glucose = make_glucose(days=2)
+    grid = gg.GlucoseGrid.from_series(glucose, interpolation_limit=0)
+    days = pd.date_range('2020-08-01', periods=2)
+    left, right = grid.offsets(days, days + pd.Timedelta('1D') - pd.Timedelta('1ns'))
+    stats = grid.coverage_stats(left, right, keys=days)
+    assert list(stats.Slots) == [96, 96]
+    for day, row in stats.iterrows():
+        day_glucose = grid.to_series()[day:day + pd.Timedelta('1D') - pd.Timedelta('1ns')]
+        assert row['Glucose Slots'] == day_glucose.notna().sum()
+        runs = day_glucose.isna().groupby(day_glucose.notna().cumsum()).sum()
+        assert row['Longest Gap (minutes)'] == runs.max() * 15
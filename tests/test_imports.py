@@ -0,0 +1,7 @@
+from benchmarks.bench_import_time import COMPUTE_MODULES, import_times
+
+
+def test_compute_modules_do_not_import_streamlit():
+    imported = import_times(COMPUTE_MODULES + ['batch'])
+    assert 'streamlit' not in imported
+    assert 'pandas_profiling' not in imported
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from src import correlation as corr
+from tests.test_correlation import make_dataset
+
+
+def make_daily_dataset(days: int = 120) -> pd.DataFrame:
+    dataset = make_dataset(rows=days).drop(columns=['label'])
+    dataset['lagged'] = dataset.a.shift(3).fillna(1000) * 2  # follows 'a' three days later
+    dataset.insert(0, 'Date', pd.date_range('2020-08-01', periods=days).date)
+    return dataset.drop(index=[10, 11, 50])  # missing days
+
+
+def shifted_correlations(dataset: pd.DataFrame, max_lag: int) -> pd.DataFrame:
+    daily = dataset.set_index(pd.to_datetime(dataset.Date)).drop(columns=['Date']).asfreq('D')
+    rows = []
+    with np.errstate(invalid='ignore', divide='ignore'):  # constant columns have no correlation
+        for lag in range(-max_lag, max_lag + 1):
+            for x in daily:
+                for y in daily:
+                    pair = pd.concat([daily[x].shift(lag), daily[y]], axis=1, keys=['x', 'y']).dropna()
+                    rows.append((x, y, lag, pair.x.corr(pair.y), len(pair)))
+    return pd.DataFrame(rows, columns=['x', 'y', 'lag', 'correlation', 'n'])
+
+
+def test_lagged_correlations_match_shifted_corr():
+    dataset = make_daily_dataset()
+    lagged = corr.lagged_correlations(dataset, date_column='Date', max_lag=5)
+    expected = shifted_correlations(dataset, max_lag=5)
+    pd.testing.assert_frame_equal(lagged.sort_values(['x', 'y', 'lag']).reset_index(drop=True),
+                                  expected.sort_values(['x', 'y', 'lag']).reset_index(drop=True),
+                                  atol=1e-8, check_dtype=False)
+
+
+def test_lagged_correlations_find_lead():
+    lagged = corr.lagged_correlations(make_daily_dataset(), date_column='Date')
+    assert lagged.lag.min() == -corr.MAX_LAG and lagged.lag.max() == corr.MAX_LAG
+    pair = lagged[(lagged.x == 'a') & (lagged.y == 'lagged')].set_index('lag').correlation
+    assert pair.idxmax() == 3
+    np.testing.assert_allclose(pair[3], 1.0)
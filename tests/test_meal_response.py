@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from src import meal_response as mr
+from tests.test_glucose import make_glucose
+
+
+def sliced_curve(glucose: pd.Series, event: pd.Timestamp, minutes: int, step_minutes: int, max_gap: str) -> np.ndarray:
+    """Reference: slice the samples around one event, and interpolate each offset between its neighbours."""
+    curve = []
+    for offset in range(0, minutes + 1, step_minutes):
+        target = event + pd.Timedelta(minutes=offset)
+        before = glucose[glucose.index <= target]
+        after = glucose[glucose.index >= target]
+        if before.empty or after.empty or after.index[0] - before.index[-1] > pd.Timedelta(max_gap):
+            curve.append(np.nan)
+        elif after.index[0] == before.index[-1]:
+            curve.append(after.iloc[0])
+        else:
+            weight = (target - before.index[-1]) / (after.index[0] - before.index[-1])
+            curve.append(before.iloc[-1] + weight * (after.iloc[0] - before.iloc[-1]))
+    return np.array(curve)
+
+
+def test_response_curves_match_sliced_events():
+    glucose = make_glucose()
+    rng = np.random.default_rng(1)
+    times = glucose.index[0] - pd.Timedelta(hours=1) + pd.to_timedelta(rng.integers(0, 11 * 24 * 60, 40), 'min')
+    events = pd.Series(times, index=[f'meal {i}' for i in range(40)])
+    events.iloc[3] = glucose.index[5]  # on a sample
+    curves = mr.response_curves(glucose.sample(frac=1, random_state=0), events, max_gap='20min')
+
+    assert list(curves.index) == list(events.index)
+    assert list(curves.columns) == list(range(0, mr.RESPONSE_MINUTES + 1, mr.RESPONSE_STEP_MINUTES))
+    expected = np.array([sliced_curve(glucose, event, mr.RESPONSE_MINUTES, mr.RESPONSE_STEP_MINUTES, '20min')
+                         for event in events])
+    np.testing.assert_allclose(curves.to_numpy(), expected)
+    assert np.isnan(expected).any() and not np.isnan(expected).all()
+
+
+def test_response_metrics_and_summary():
+    index = pd.date_range('2020-08-01', periods=24, freq='15min')
+    values = np.full(len(index), 100.0)
+    values[4:9] = [100, 120, 140, 120, 100]  # meal at 01:00, peaks 30 minutes later
+    glucose = pd.Series(values, index=index)
+    events = pd.DatetimeIndex(['2020-08-01 01:00', '2020-08-01 05:00', pd.NaT])
+    curves = mr.response_curves(glucose, events, minutes=60, step_minutes=15)
+
+    metrics = mr.response_metrics(curves)
+    np.testing.assert_allclose(metrics['Baseline Glucose (mg/dL)'], [100, 100, np.nan])
+    np.testing.assert_allclose(metrics['Peak Delta (mg/dL)'], [40, 0, np.nan])
+    np.testing.assert_allclose(metrics['Time to Peak (minutes)'], [30, 0, np.nan])
+    # triangle of 40 mg/dL over 60 minutes, the second meal runs past the end of the data
+    np.testing.assert_allclose(metrics['iAUC (mg/dL*h)'], [20, np.nan, np.nan])
+
+    summary = mr.response_summary(curves)
+    np.testing.assert_allclose(summary.Median, [0, 10, 20, 10, 0])
+    np.testing.assert_allclose(summary.Mean, [0, 10, 20, 10, 0])
+    np.testing.assert_allclose(summary.P75, [0, 15, 30, 15, 0])
+    np.testing.assert_array_equal(summary.Events, [2, 2, 2, 2, 1])
@@ -0,0 +1,36 @@
+import numpy as np
+from scipy import stats
+
+from src import correlation as corr
+from src import regression as reg
+from tests.test_correlation import make_dataset
+
+
+def test_all_pairs_ols_matches_linregress():
+    dataset = make_dataset()
+    fits = reg.all_pairs_ols(dataset)
+    assert len(fits) == 5 ** 2
+    for x, y in [('a', 'b'), ('b', 'a'), ('c', 'd'), ('a', 'a')]:
+        pair = dataset[[x, y]].dropna() if x != y else dataset[[x]].dropna()
+        expected = stats.linregress(pair[x], pair[y] if x != y else pair[x])
+        fit = reg.pair_fit(fits, x, y)
+        assert fit.n == len(pair)
+        np.testing.assert_allclose([fit.slope, fit.intercept, fit.r_squared],
+                                   [expected.slope, expected.intercept, expected.rvalue ** 2], rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(fit.p_value, expected.pvalue, rtol=1e-6, atol=1e-300)
+
+
+def test_all_pairs_ols_undefined_fits():
+    fits = reg.all_pairs_ols(make_dataset().iloc[:1], date_column='label')
+    assert fits[['slope', 'intercept', 'r_squared', 'p_value']].isna().all().all()
+    constant = reg.pair_fit(reg.all_pairs_ols(make_dataset()), 'constant', 'a')
+    assert np.isnan(constant.slope) and np.isnan(constant.p_value)
+
+
+def test_all_pairs_ols_shares_correlation_engine():
+    dataset = make_dataset()
+    engine = corr.correlation_engine(dataset)
+    fits = reg.engine_fits(engine, columns=['b', 'a'])
+    assert list(zip(fits.x, fits.y)) == [('b', 'b'), ('b', 'a'), ('a', 'b'), ('a', 'a')]
+    r = engine.matrix().loc['a', 'b']
+    np.testing.assert_allclose(reg.pair_fit(fits, 'a', 'b').r_squared, r ** 2)
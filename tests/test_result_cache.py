@@ -0,0 +1,48 @@
+import pandas as pd
+
+from src import batch
+from src import result_cache as rc
+from src import utilities
+from tests.test_batch import write_exports
+from tests.test_glucose import make_glucose, make_sleep
+
+
+def test_result_cache_round_trips_metrics_dataset(tmp_path):
+    write_exports(tmp_path / 'user', days=30)
+    metrics = batch.user_metrics(tmp_path / 'user')
+    inputs = {'sleep_scores': metrics[['Sleep Score']], 'metabolic_scores': metrics[['Metabolic Score']],
+              'fasting_scores': metrics[['Fast (cumulative hours)', 'Fast']]}
+    cache = rc.ResultCache(path=tmp_path / 'results')
+    first = cache.compute(utilities.create_metrics_dataset, **inputs)
+    second = rc.ResultCache(path=tmp_path / 'results').compute(utilities.create_metrics_dataset, **inputs)
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(first, utilities.create_metrics_dataset(**inputs))
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_result_cache_keys_on_inputs(tmp_path):
+    glucose, sleep = make_glucose(), make_sleep()
+    cache = rc.ResultCache(path=tmp_path)
+    first = cache.compute(utilities.create_raw_analysis_dataset, sleep=sleep, glucose=glucose)
+    second = cache.compute(utilities.create_raw_analysis_dataset, sleep=sleep.copy(), glucose=glucose.copy())
+    pd.testing.assert_frame_equal(first, second)
+    changed = glucose.copy()
+    changed.iloc[0] += 1
+    cache.compute(utilities.create_raw_analysis_dataset, sleep=sleep, glucose=changed)
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+    assert stats['hit_ratio'] == 1 / 3
+    assert 0 < stats['bytes_saved'] < stats['bytes']
+    assert list(tmp_path.glob('*.tmp')) == []
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    glucose, sleep = make_glucose(), make_sleep()
+    cache = rc.ResultCache(path=tmp_path)
+    cache.compute(utilities.create_raw_analysis_dataset, sleep=sleep, glucose=glucose)
+    cache.max_bytes = cache.stats()['bytes'] * 3 // 2  # room for one result
+    cache.compute(utilities.create_raw_analysis_dataset, sleep=sleep, glucose=glucose * 2)
+    assert len(list(tmp_path.glob('*.feather'))) == 1
+    cache.compute(utilities.create_raw_analysis_dataset, sleep=sleep, glucose=glucose * 2)
+    assert cache.hits == 1
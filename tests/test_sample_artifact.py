@@ -0,0 +1,65 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from src import fingerprint
+from src import regression
+from src import sample_artifact as sa
+from src import utilities
+
+
+def test_analyze_matches_app_computations():
+    sample = sa.parse_sample()
+    analysis = sa.analyze(sample, figures=False)
+    assert analysis['figures'] == {}
+    pd.testing.assert_frame_equal(analysis['corr_matrix'],
+                                  utilities.clustered_corr_matrix(sample, date_column='Date').round(2))
+    pd.testing.assert_frame_equal(analysis['fits'], regression.all_pairs_ols(sample, date_column='Date'))
+
+
+def test_load_rejects_missing_and_stale_artifacts(tmp_path):
+    assert sa.load(tmp_path / 'missing.pickle') is None
+    (tmp_path / 'empty.pickle').touch()
+    assert sa.load(tmp_path / 'empty.pickle') is None
+    with open(tmp_path / 'stale.pickle', 'wb') as file:
+        pickle.dump({'source': 'another sample', 'sample': sa.parse_sample()}, file)
+    assert sa.load(tmp_path / 'stale.pickle') is None
+
+
+def test_build_round_trips(tmp_path):
+    pytest.importorskip('altair')  # the figures are built with the plot module
+    path = sa.build(tmp_path / 'sample.pickle')
+    assert list(tmp_path.glob('*.tmp')) == []
+    artifact = sa.load(path)
+    sample = sa.parse_sample()
+    pd.testing.assert_frame_equal(artifact['sample'], sample)
+    assert fingerprint.fingerprint(artifact['sample']) == fingerprint.content_fingerprint(sample)
+    heatmap = sa.decode_figure(artifact['figures'][('heatmap',)])
+    assert list(heatmap.data[0].x) == list(artifact['corr_matrix'].columns)
+
+
+def test_source_digest_covers_analysis_modules(tmp_path, monkeypatch):
+    digest = sa.source_digest()
+    monkeypatch.setattr(sa, 'SOURCE_MODULES', sa.SOURCE_MODULES[:-1])
+    assert sa.source_digest() != digest
+    monkeypatch.undo()
+    monkeypatch.setattr(sa.plotly, '__version__', '0.0.0')
+    assert sa.source_digest() != digest
+
+
+def test_load_or_build(tmp_path, monkeypatch):
+    path = tmp_path / 'sample.pickle'
+    built = []
+    monkeypatch.setattr(sa, 'build', lambda path, sample_path: built.append(path) or path.touch())
+    assert sa.load_or_build(path) is None and built == [path]  # the (empty) artifact could not be loaded
+
+    def read_only(path, sample_path):
+        raise PermissionError(path)
+    monkeypatch.setattr(sa, 'build', read_only)
+    assert sa.load_or_build(tmp_path / 'missing.pickle') is None
+
+    pytest.importorskip('altair')
+    monkeypatch.undo()
+    artifact = sa.load_or_build(path)
+    assert artifact['source'] == sa.source_digest() and path.stat().st_size > 0
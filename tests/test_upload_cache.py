@@ -0,0 +1,36 @@
+import io
+
+import pandas as pd
+
+from src import upload_cache as uc
+
+
+def load_csv(file, index_col: str = None) -> pd.DataFrame:
+    return pd.read_csv(file, parse_dates=['Date'], index_col=index_col)
+
+
+def test_upload_cache_hits_on_same_bytes(tmp_path):
+    cache = uc.UploadCache(path=tmp_path)
+    raw = b"Date,Metabolic Score\n2020-08-01,55.1\n2020-08-02,64.6\n"
+    first = cache.load(load_csv, io.BytesIO(raw), 'Date')
+    second = cache.load(load_csv, io.BytesIO(raw), 'Date')
+    pd.testing.assert_frame_equal(first, second)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.load(load_csv, io.BytesIO(raw))  # different loader arguments
+    cache.load(load_csv, io.BytesIO(raw + b"2020-08-03,72.2\n"), 'Date')  # different bytes
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_upload_cache_series_round_trip(tmp_path):
+    cache = uc.UploadCache(path=tmp_path)
+    raw = b"Date,Metabolic Score\n2020-08-01,55.1\n2020-08-02,64.6\n"
+    first = cache.load(lambda file: load_csv(file, 'Date')['Metabolic Score'], io.BytesIO(raw))
+    second = cache.load(lambda file: load_csv(file, 'Date')['Metabolic Score'], io.BytesIO(raw))
+    pd.testing.assert_series_equal(first, second)
+
+
+def test_upload_cache_evicts_least_recently_used(tmp_path):
+    cache = uc.UploadCache(path=tmp_path, max_bytes=0)
+    cache.load(load_csv, io.BytesIO(b"Date,Score\n2020-08-01,1\n"))
+    assert list(tmp_path.glob('*.feather')) == []
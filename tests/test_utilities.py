@@ -1,4 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from src import batch
 from src import utilities
+from tests.test_batch import write_exports
+
+
+def test_create_metrics_dataset_compact_schema(tmp_path):
+    write_exports(tmp_path / 'user', days=30)
+    metrics = batch.user_metrics(tmp_path / 'user')
+    assert metrics.Date.dtype.kind == 'M'  # datetime64, not python dates
+    assert (metrics[['Metabolic Score', 'Sleep Score', 'Fast (cumulative hours)']].dtypes == np.float32).all()
+    assert isinstance(metrics['Fast'].dtype, pd.CategoricalDtype)
+    assert len(metrics) == 30
 
 
 
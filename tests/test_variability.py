@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from src import glucose as gc
+from src import variability as vb
+from tests.test_glucose import make_glucose, make_sleep
+
+
+def sequential_mage(values: np.ndarray) -> float:
+    """Reference MAGE: remove the smallest excursion below one standard deviation, one at a time."""
+    std = values.std(ddof=1)
+    changes = np.diff(values)
+    steps = np.flatnonzero(changes)
+    peaks = [values[0]] + [values[b] for a, b in zip(steps[:-1], steps[1:])
+                           if np.sign(changes[a]) != np.sign(changes[b])] + [values[-1]]
+    while True:
+        amplitudes = np.abs(np.diff(peaks))
+        if len(amplitudes) == 0 or amplitudes.min() >= std:
+            break
+        k = int(amplitudes.argmin())
+        if k == 0:
+            del peaks[0]
+        elif k + 2 == len(peaks):
+            del peaks[-1]
+        else:
+            extreme, opposite = (min, max) if peaks[k + 1] < peaks[k] else (max, min)
+            peaks[k - 1] = extreme(peaks[k - 1], peaks[k + 1])
+            peaks[k + 2] = opposite(peaks[k + 2], peaks[k])
+            del peaks[k:k + 2]
+    return np.abs(np.diff(peaks)).mean() if len(peaks) > 1 else np.nan
+
+
+def test_mage_matches_sequential_removal():
+    rng = np.random.default_rng(0)
+    windows = [np.round(np.cumsum(rng.normal(0, 10, length)) + 120, -1 if length % 3 == 0 else 1)
+               for length in rng.integers(2, 60, 50)]
+    codes = np.repeat(np.arange(len(windows)), [len(window) for window in windows])
+    values = np.concatenate(windows)
+    mage = vb.mage(values, codes, vb.segment_std(values, codes, len(windows)))
+    np.testing.assert_allclose(mage, [sequential_mage(window) for window in windows])
+
+
+def test_window_variability_matches_per_window_metrics():
+    glucose = make_glucose(days=5) + 40
+    glucose.iloc[::7] = np.nan  # missing values are ignored
+    days = gc.day_offsets(glucose)
+    variability = vb.day_variability(glucose, time_label=None)
+    assert list(variability.columns) == vb.VARIABILITY_METRICS
+    for day, (left, right) in days.iterrows():
+        window = glucose.iloc[left:right].dropna()
+        metrics = variability.loc[day]
+        np.testing.assert_allclose(metrics['Glucose CV (%)'], window.std() / window.mean() * 100)
+        np.testing.assert_allclose(metrics['Time in Range (%)'], window.between(70, 180).mean() * 100)
+        np.testing.assert_allclose(metrics['Time Above Range (%)'], (window > 180).mean() * 100)
+        np.testing.assert_allclose(metrics['GMI (%)'], 3.31 + 0.02392 * window.mean())
+        np.testing.assert_allclose(metrics['MAGE (mg/dL)'], sequential_mage(window.values))
+
+        risk = 1.509 * (np.log(window) ** 1.084 - 5.381)
+        np.testing.assert_allclose(metrics['LBGI'], (10 * risk ** 2).where(risk < 0, 0).mean())
+        np.testing.assert_allclose(metrics['HBGI'], (10 * risk ** 2).where(risk > 0, 0).mean())
+
+        earlier = window.reindex(window.index - pd.Timedelta('1h'))
+        np.testing.assert_allclose(metrics['CONGA (mg/dL)'], (window.values - earlier.values)[earlier.notna()].std(ddof=1))
+
+
+def test_conga_matches_closest_earlier_sample():
+    # 5-minute samples: several fall within the tolerance of one hour earlier, the closest one is compared
+    index = pd.date_range('2020-08-01', periods=2 * 288, freq='5min', name='Timestamp')
+    glucose = pd.Series(120 + 40 * np.sin(np.arange(len(index)) / 20), index=index, name='Glucose (mg/dL)')
+    glucose = glucose.drop(glucose.index[100:110])
+    variability = vb.day_variability(glucose, time_label=None)
+    for day, window in glucose.groupby(glucose.index.floor('D')):
+        window = window.rename_axis('Timestamp').reset_index()
+        earlier = pd.merge_asof(window.assign(Timestamp=window['Timestamp'] - pd.Timedelta(hours=vb.CONGA_HOURS)),
+                                window, on='Timestamp', direction='nearest', tolerance=pd.Timedelta(vb.CONGA_TOLERANCE),
+                                suffixes=('', ' Earlier'))
+        differences = earlier['Glucose (mg/dL)'] - earlier['Glucose (mg/dL) Earlier']
+        np.testing.assert_allclose(variability.loc[day, 'CONGA (mg/dL)'], differences.std())
+
+
+def test_sleep_variability_labels_and_overlapping_windows():
+    glucose = make_glucose()
+    sleep = make_sleep()
+    variability = vb.sleep_variability(glucose, sleep)
+    assert list(variability.index) == list(gc.sleep_glucose_stats(glucose, sleep).index)
+    assert variability.columns[0] == 'Glucose CV (%) (Sleep)'
+
+    starts = pd.to_datetime(['2020-08-02 00:00', '2020-08-02 06:00', '2020-08-20 00:00'])
+    fasts = pd.DataFrame({'start_dt': starts, 'end_dt': starts + pd.Timedelta('12h')})
+    overlapping = vb.fast_variability(glucose, fasts)
+    pd.testing.assert_series_equal(overlapping.iloc[1], vb.fast_variability(glucose, fasts.iloc[[1]]).iloc[0])
+    assert overlapping.iloc[2].isna().all()  # no glucose data
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from src import zero as zo
+
+
+def make_fasts(count: int = 60, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2020-08-01', periods=count, freq='1D')
+    dates = dates[rng.random(count) > 0.2]  # skip some days
+    start = dates + pd.to_timedelta(rng.integers(17 * 60, 24 * 60, len(dates)), 'min')
+    hours = rng.uniform(8, 22, len(dates)).round(2)
+    end = start + pd.to_timedelta(hours * 60, 'min').round('min')
+    return pd.DataFrame({'Date': dates,
+                         'Start': start.strftime('%H:%M'),
+                         'End': end.strftime('%H:%M'),
+                         'Hours': hours,
+                         'Night Eating': 'No'})
+
+
+def looped_cumulative_consecutive(details: pd.DataFrame) -> pd.DataFrame:
+    first_date = details.start_dt[0].date()
+    last_date = details.end_dt.iat[-1].date()
+    all_fast_dates = pd.date_range(start=first_date, end=last_date, freq='1D').date
+    stats = pd.DataFrame({'Fast (cumulative hours)': 0, 'Fast (consecutive hours)': 0}, index=all_fast_dates,
+                         dtype=float)
+    for index, fast in details.iterrows():
+        start_date = fast["start_dt"].date()
+        end_date = fast["end_dt"].date()
+        stats.at[start_date, 'Fast (cumulative hours)'] += fast['start_hours']
+        stats.at[start_date, 'Fast (consecutive hours)'] = max(fast['start_hours'],
+                                                               stats.at[start_date, 'Fast (consecutive hours)'])
+        stats.at[end_date, 'Fast (cumulative hours)'] += fast['end_hours']
+        stats.at[end_date, 'Fast (consecutive hours)'] = max(fast['total_hours'],
+                                                             stats.at[end_date, 'Fast (consecutive hours)'])
+    return stats
+
+
+def test_fast_cumulative_consecutive_matches_loop():
+    details = zo.fasts_details(make_fasts())
+    expected = looped_cumulative_consecutive(details).astype(np.float32)
+    expected.index = pd.DatetimeIndex(expected.index, freq='D')
+    pd.testing.assert_frame_equal(zo.fast_cumulative_consecutive(details), expected, check_index_type=False)
+
+
+def test_all_fasts_stats_columns():
+    stats = zo.all_fasts_stats(make_fasts())
+    assert list(stats.columns) == ['Fast (cumulative hours)', 'Fast (consecutive hours)',
+                                   'Fast Binned (consecutive hours)', 'Fast Binned (cumulative hours)', 'Fast']
+
+
+def test_split_fasts_by_day_multi_day_fasts():
+    start_end = pd.DataFrame({'start_dt': pd.to_datetime(['2020-08-01 20:00', '2020-08-05 08:00']),
+                              'end_dt': pd.to_datetime(['2020-08-03 08:00', '2020-08-08 08:00'])})
+    days = zo.split_fasts_by_day(start_end)
+    assert list(days.fast) == [0, 0, 0, 1, 1, 1, 1]
+    assert list(days.hours) == [4, 24, 8, 16, 24, 24, 8]
+    assert list(days.elapsed_hours) == [4, 28, 36, 16, 40, 64, 72]
+
+    durations = zo.date_durations(start_end)
+    assert list(durations.start_hours) == [4, 16]
+    assert list(durations.end_hours) == [8, 8]
+    assert list(durations.total_hours) == [36, 72]
+
+
+def test_fast_cumulative_consecutive_multi_day_fast():
+    details = pd.DataFrame({'start_dt': pd.to_datetime(['2020-08-01 20:00', '2020-08-03 18:00']),
+                            'end_dt': pd.to_datetime(['2020-08-03 08:00', '2020-08-04 10:00'])})
+    stats = zo.fast_cumulative_consecutive(details)
+    assert list(stats['Fast (cumulative hours)']) == [4, 24, 14, 10]
+    assert list(stats['Fast (consecutive hours)']) == [4, 28, 36, 16]
+    binned = zo.fasts_binned(stats)
+    assert list(binned['Fast Binned (consecutive hours)']) == ['0-12 hours', '18+ hours', '18+ hours', '16-18 hours']
+
+
+def strftime_start_end(fasts: pd.DataFrame) -> pd.DataFrame:
+    start_times_duration = pd.to_timedelta(pd.to_datetime(fasts['Start']).dt.strftime('%H:%M:%S'))
+    end_times_duration = pd.to_timedelta(pd.to_datetime(fasts['End']).dt.strftime('%H:%M:%S'))
+    start_dt = (fasts.Date + start_times_duration).rename('start_dt')
+    end_dates = (start_dt + pd.to_timedelta(fasts.Hours, 'h')).dt.date
+    end_dt = (pd.to_datetime(end_dates) + end_times_duration).rename('end_dt')
+    return pd.concat([start_dt, end_dt], axis=1)
+
+
+def test_fasts_start_end_matches_strftime_parsing():
+    fasts = make_fasts()
+    pd.testing.assert_frame_equal(zo.fasts_start_end(fasts), strftime_start_end(fasts), check_dtype=False)
+    fasts['Start'] = pd.to_datetime(fasts.Start, format='%H:%M').dt.strftime('%I:%M %p')  # 12 hour clock export
+    pd.testing.assert_frame_equal(zo.fasts_start_end(fasts), strftime_start_end(fasts), check_dtype=False)
+
+
+def test_time_of_day():
+    durations = zo.time_of_day(pd.Series(['19:15', None, '07:05', '19:15']))
+    assert list(durations.dropna()) == [pd.Timedelta('19:15:00'), pd.Timedelta('07:05:00'), pd.Timedelta('19:15:00')]
+    assert pd.isna(durations[1])